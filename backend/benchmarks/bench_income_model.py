@@ -0,0 +1,70 @@
+"""
+Piecewise-linear income model versus repeated calculate_net_income calls
+
+Draws the same income -> net curve both ways for a handful of household
+profiles and reports the time per curve and the largest per-field deviation
+from the scalar path (expected: a few cents of rounding at most).
+
+Usage (from backend/):
+    python -m benchmarks.bench_income_model
+"""
+
+import argparse
+import time
+from decimal import Decimal
+
+from src.rules_engine.calculator import calculate_net_income
+from src.rules_engine.piecewise import HouseholdProfile, IncomeModel, MODEL_FIELDS
+from src.rules_engine.parameters import get_parameters
+
+PROFILES = {
+    "single": HouseholdProfile(pension_contribution_pct=5.0, housing_costs=Decimal(600)),
+    "couple, 2 children": HouseholdProfile(
+        pension_contribution_pct=7.5, housing_costs=Decimal(900),
+        household_members=2, children_count=2, is_partner=True
+    ),
+    "lump sum": HouseholdProfile(pension_contribution_pct=10.0, lump_sum_percentage=10.0),
+}
+
+
+def run(max_income: int, step: int) -> None:
+    low, high = Decimal(0), Decimal(max_income)
+    print(f"{'profile':>20} {'points':>7} {'scalar ms':>10} {'compile ms':>11} {'sweep ms':>9} {'max dev':>8}")
+    for name, profile in PROFILES.items():
+        start = time.perf_counter()
+        scalar = [
+            calculate_net_income(
+                Decimal(gross), profile.pension_contribution_pct, profile.housing_costs,
+                profile.household_members, profile.children_count, profile.is_partner,
+                profile.lump_sum_percentage, profile.tax_year
+            )
+            for gross in range(0, max_income + 1, step)
+        ]
+        scalar_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        model = IncomeModel(profile, get_parameters(profile.tax_year))
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        points = model.sweep(low, high, Decimal(step))
+        sweep_ms = (time.perf_counter() - start) * 1000
+
+        deviation = max(
+            abs(point[field] - expected[field])
+            for point, expected in zip(points, scalar)
+            for field in MODEL_FIELDS
+        )
+        print(f"{name:>20} {len(points):>7} {scalar_ms:>10.1f} {compile_ms:>11.2f} {sweep_ms:>9.1f} {deviation:>8.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-income", type=int, default=150000)
+    parser.add_argument("--step", type=int, default=50)
+    args = parser.parse_args()
+    run(args.max_income, args.step)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+RulesEngine scaling benchmark on diamond-shaped rule graphs
+
+Each layer holds two rules that both depend on the two rules of the
+previous layer, so every rule is reachable through 2^depth paths. With
+the compiled execution plan, evaluate_all runs each rule once and the
+time per rule should stay flat as the graph grows.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rules_engine
+"""
+
+import argparse
+import time
+from decimal import Decimal
+from typing import Dict
+
+from src.rules_engine.calculator import RulesEngine, RuleResult
+from src.rules_engine.tracing import TRACE_MODES
+
+
+def build_diamond_engine(layers: int, trace_mode: str = "off", cache_size: int = 0) -> RulesEngine:
+    """Engine with `layers` layers of two rules, each depending on the whole previous layer"""
+    definitions: Dict[str, Dict] = {}
+    previous = ["gross_income"]
+    for layer in range(layers):
+        current = [f"r{layer}_a", f"r{layer}_b"]
+        for rule_id in current:
+            definitions[rule_id] = {
+                "dependencies": list(previous),
+                "inputs": [],
+                "calculate": _make_sum_rule(rule_id, list(previous)),
+            }
+        previous = current
+
+    engine = RulesEngine(trace_mode=trace_mode, cache_size=cache_size)
+    engine.register_rules(definitions)
+    return engine
+
+
+def _make_sum_rule(rule_id: str, deps):
+    def calculate(context):
+        total = Decimal(0)
+        for dep in deps:
+            value = context[dep]
+            total += value.value if isinstance(value, RuleResult) else value
+        return RuleResult(rule_id, rule_id, total / len(deps), "mean(deps)", "benchmark", {})
+    return calculate
+
+
+def run(sizes, repeat: int, trace_mode: str, cache_size: int) -> None:
+    print(f"{'rules':>8} {'compile ms':>11} {'evaluate_all ms':>16} {'us / rule':>10}")
+    for layers in sizes:
+        start = time.perf_counter()
+        engine = build_diamond_engine(layers, trace_mode, cache_size)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        best = float("inf")
+        for _ in range(repeat):
+            engine.clear_trace()
+            start = time.perf_counter()
+            engine.evaluate_all({"gross_income": Decimal(50000)})
+            best = min(best, time.perf_counter() - start)
+
+        n_rules = len(engine.rules)
+        print(f"{n_rules:>8} {compile_ms:>11.2f} {best * 1000:>16.3f} {best / n_rules * 1e6:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="number of diamond layers (two rules per layer)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--trace", default="off", choices=TRACE_MODES)
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="memoization entries (0 measures raw plan execution)")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.trace, args.cache_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Parity check and speed comparison: integer fixed-point path versus the Decimal reference
+
+Runs calculate_net_income and calculate_net_income_fixed on the same
+randomized households (including sub-cent amounts and three-decimal
+percentages, which take the reference fallback) and requires identical
+result dicts. Exits non-zero on any mismatch.
+
+Usage (from backend/):
+    python -m benchmarks.check_fixed_point --cases 50000
+"""
+
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+from src.rules_engine.calculator import calculate_net_income
+from src.rules_engine.fixed_point import calculate_net_income_fixed
+from src.rules_engine.parameters import available_years, get_parameters
+
+
+def random_case(rng: random.Random, years: List[int]) -> Tuple[Any, ...]:
+    roll = rng.random()
+    if roll < 0.05:
+        gross = Decimal(rng.randint(0, 20000000)) / 1000  # Sub-cent: reference fallback
+    elif roll < 0.15:
+        gross = Decimal(rng.choice([10000, 20000, 25000, 35000, 40000, 60000, 115000]))  # Round thresholds
+    else:
+        gross = Decimal(rng.randint(0, 25000000)) / 100
+    pension = rng.choice([0, 0.0, 5, 5.0, 7.5, 12.25, 33.33, rng.randint(0, 3000) / 100, rng.randint(0, 3000) / 1000])
+    lump = rng.choice([0, 0, 2.5, 10, rng.randint(0, 1000) / 100])
+    housing = Decimal(rng.randint(0, 150000)) / 100
+    return (
+        gross, pension, housing, rng.randint(1, 4), rng.randint(0, 4),
+        rng.random() < 0.5, lump, rng.choice(years)
+    )
+
+
+def compare(cases: List[Tuple[Any, ...]]) -> List[Tuple[Tuple[Any, ...], str, Any, Any]]:
+    mismatches = []
+    for case in cases:
+        expected = calculate_net_income(*case)
+        actual = calculate_net_income_fixed(*case)
+        if actual != expected:
+            for key in expected:
+                if actual.get(key) != expected[key]:
+                    mismatches.append((case, key, expected[key], actual.get(key)))
+    return mismatches
+
+
+def timed(function, cases: List[Tuple[Any, ...]]) -> float:
+    start = time.perf_counter()
+    for case in cases:
+        function(*case)
+    return (time.perf_counter() - start) / len(cases) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+
+    get_parameters()
+    rng = random.Random(args.seed)
+    cases = [random_case(rng, available_years()) for _ in range(args.cases)]
+
+    mismatches = compare(cases)
+    for case, key, expected, actual in mismatches[:10]:
+        print(f"MISMATCH {key}: reference={expected!r} fixed={actual!r} for {case}")
+    print(f"{len(cases)} cases, {len(mismatches)} mismatching fields")
+
+    decimal_us = timed(calculate_net_income, cases)
+    fixed_us = timed(calculate_net_income_fixed, cases)
+    print(f"decimal: {decimal_us:.1f} us/call   fixed: {fixed_us:.1f} us/call   speedup: {decimal_us / fixed_us:.2f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Parity check and speed comparison: incremental session updates versus full recalculation
+
+Applies random sequences of input changes to IncrementalNetIncome and
+requires its result to equal a fresh NetIncomeResult for the same inputs
+after every step, then times single-input updates against a full
+recalculation. Sessions always compute in Decimal, so their results are
+also compared with the fixed-point calculator. Also checks session idle
+expiry and the session cap.
+Exits non-zero on any mismatch.
+
+Usage (from backend/):
+    python -m benchmarks.check_sessions --cases 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from src.rules_engine.calculator import ARITHMETIC_FIXED, NET_INCOME_INPUTS, NetIncomeResult, net_income_calculator
+from src.rules_engine.incremental import IncrementalNetIncome
+from src.rules_engine.parameters import available_years, get_parameters
+from src.services.sessions import SessionStore
+
+
+def random_inputs(rng: random.Random, years: List[int]) -> Dict[str, Callable[[], Any]]:
+    return {
+        "gross_income": lambda: Decimal(rng.randint(0, 25000000)) / 100,
+        "pension_contribution_pct": lambda: rng.choice([0, 5, 7.5, 12.25, rng.randint(0, 3000) / 100]),
+        "housing_costs": lambda: Decimal(rng.randint(0, 150000)) / 100,
+        "household_members": lambda: rng.randint(1, 4),
+        "children_count": lambda: rng.randint(0, 4),
+        "is_partner": lambda: rng.random() < 0.5,
+        "lump_sum_percentage": lambda: rng.choice([0, 2.5, 10]),
+        "tax_year": lambda: rng.choice(years),
+    }
+
+
+def check_parity(cases: int, steps: int, rng: random.Random) -> int:
+    draw = random_inputs(rng, available_years())
+    calculate_fixed = net_income_calculator(ARITHMETIC_FIXED)
+    mismatches = 0
+    for _ in range(cases):
+        household = {name: draw[name]() for name in NET_INCOME_INPUTS}
+        fields = rng.choice([None, None, ["net_income", "huurtoeslag", "lump_sum_impact"], ["benefit_steps", "breakdown"]])
+        include_trace = rng.random() < 0.7
+        session = IncrementalNetIncome(household, fields, include_trace)
+        for _ in range(steps):
+            changes = {name: draw[name]() for name in rng.sample(NET_INCOME_INPUTS, rng.randint(1, 3))}
+            before = dict(session.result)
+            changed, _, _ = session.update(changes)
+            household = {**household, **changes}
+            expected = NetIncomeResult(**household).to_dict(fields, include_trace)
+            reported = {name: value for name, value in expected.items() if value != before[name]}
+            fixed = calculate_fixed(**household)
+            fixed_differs = any(fixed[name] != value for name, value in session.result.items() if name in fixed)
+            if session.result != expected or changed != reported or fixed_differs:
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"MISMATCH after {changes}: {household}")
+    return mismatches
+
+
+def check_store() -> bool:
+    clock = [0.0]
+    store = SessionStore(max_sessions=3, idle_timeout=10, clock=lambda: clock[0])
+    household = {name: value for name, value in zip(NET_INCOME_INPUTS, (Decimal(40000), 5, Decimal(600), 1, 0, False, 0, 2025))}
+    sessions = [store.create({}, IncrementalNetIncome(household)) for _ in range(4)]
+    ok = store.get(sessions[0].id) is None and store.evicted == 1  # Cap: the oldest was evicted
+    clock[0] = 8
+    store.get(sessions[1].id)  # Used: stays alive
+    clock[0] = 15
+    ok = ok and store.get(sessions[2].id) is None and store.get(sessions[1].id) is not None
+    ok = ok and len(store) == 1 and store.expired == 2
+    return ok
+
+
+def timed(update: Callable[[int], Any], rounds: int) -> float:
+    start = time.perf_counter()
+    for i in range(rounds):
+        update(i)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+
+    get_parameters()
+    mismatches = check_parity(args.cases, args.steps, random.Random(args.seed))
+    print(f"{args.cases * args.steps} updates, {mismatches} mismatching")
+    store_ok = check_store()
+    print(f"session expiry and cap: {'ok' if store_ok else 'FAILED'}")
+
+    household = dict(zip(NET_INCOME_INPUTS, (Decimal(45000), 5, Decimal(600), 1, 1, False, 0, 2025)))
+    session = IncrementalNetIncome(household)
+    full_us = timed(lambda i: NetIncomeResult(**{**household, "gross_income": Decimal(40000 + i)}).to_dict(), 5000)
+    print(f"full recalculation: {full_us:.1f} us")
+    for name, value in (
+        ("housing_costs", lambda i: Decimal(500 + i % 50)),
+        ("children_count", lambda i: i % 4),
+        ("gross_income", lambda i: Decimal(40000 + i)),
+    ):
+        update_us = timed(lambda i: session.update({name: value(i)}), 5000)
+        print(f"update {name}: {update_us:.1f} us ({full_us / update_us:.2f}x)")
+
+    sys.exit(1 if mismatches or not store_ok else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""
+Benchmark suite: calculator functions, RulesEngine graphs, the rule graph index, API routes and startup
+
+Every benchmark reports throughput, p50/p99 latency per call and peak
+traced memory (tracemalloc, measured in a separate pass so tracing does
+not distort the timings). Results are written as JSON; pass an earlier
+file with --compare to see the change per benchmark.
+
+Routes are called in-process through httpx's ASGI transport with the app
+lifespan running. Inputs vary per call so result caches are mostly missed.
+Startup is measured in fresh interpreters (peak memory there is max RSS).
+
+Usage (from backend/):
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --quick --compare bench.json --filter calculator
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from src.rules_engine.calculator import (
+    calculate_income_tax_2025, calculate_huurtoeslag, calculate_zorgtoeslag,
+    calculate_kindgebonden_budget, calculate_net_income
+)
+from src.rules_engine.fixed_point import calculate_net_income_fixed
+from src.rules_engine.graph import RuleGraph
+from benchmarks.bench_rules_engine import build_diamond_engine
+
+REGRESSION_THRESHOLD = 0.10  # p50 slower by more than this is flagged by --compare
+
+
+# ============ MEASUREMENT ============
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summary(group: str, name: str, timings: List[float], peak_bytes: int) -> Dict[str, Any]:
+    timings.sort()
+    total = sum(timings)
+    return {
+        "group": group,
+        "name": name,
+        "iterations": len(timings),
+        "ops_per_sec": round(len(timings) / total, 1) if total else None,
+        "mean_us": round(total / len(timings) * 1e6, 2),
+        "p50_us": round(_percentile(timings, 0.50) * 1e6, 2),
+        "p99_us": round(_percentile(timings, 0.99) * 1e6, 2),
+        "peak_memory_kb": round(peak_bytes / 1024, 1)
+    }
+
+
+def measure(group: str, name: str, function: Callable[[int], Any], iterations: int, warmup: int) -> Dict[str, Any]:
+    """Time function(i) per call, then trace its peak allocation over a few calls"""
+    for i in range(warmup):
+        function(i)
+    timings = []
+    clock = time.perf_counter
+    for i in range(iterations):
+        start = clock()
+        function(i)
+        timings.append(clock() - start)
+
+    tracemalloc.start()
+    for i in range(min(iterations, 20)):
+        function(i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _summary(group, name, timings, peak)
+
+
+async def measure_async(group: str, name: str, function: Callable[[int], Awaitable[Any]], iterations: int, warmup: int) -> Dict[str, Any]:
+    for i in range(warmup):
+        await function(i)
+    timings = []
+    clock = time.perf_counter
+    for i in range(iterations):
+        start = clock()
+        await function(i)
+        timings.append(clock() - start)
+
+    tracemalloc.start()
+    for i in range(min(iterations, 10)):
+        await function(i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _summary(group, name, timings, peak)
+
+
+# ============ CALCULATOR FUNCTIONS ============
+
+def _income(i: int) -> Decimal:
+    """Spread of incomes across all tax brackets and benefit thresholds"""
+    return Decimal((i * 7919) % 15000000) / 100
+
+
+CALCULATOR_CASES = {
+    "calculate_income_tax_2025": lambda i: calculate_income_tax_2025(_income(i)),
+    "calculate_huurtoeslag": lambda i: calculate_huurtoeslag(_income(i) / 4, 1 + i % 2, Decimal(7200)),
+    "calculate_zorgtoeslag": lambda i: calculate_zorgtoeslag(_income(i) / 4, 1 + i % 2, i % 2 == 1),
+    "calculate_kindgebonden_budget": lambda i: calculate_kindgebonden_budget(i % 4, _income(i)),
+    "calculate_net_income": lambda i: calculate_net_income(
+        _income(i), 5.0, Decimal(600), 1 + i % 2, i % 4, i % 2 == 1, (i % 3) * 2.5
+    ),
+    "calculate_net_income_fixed": lambda i: calculate_net_income_fixed(
+        _income(i), 5.0, Decimal(600), 1 + i % 2, i % 4, i % 2 == 1, (i % 3) * 2.5
+    ),
+}
+
+
+def run_calculator(iterations: int, warmup: int) -> List[Dict[str, Any]]:
+    return [
+        measure("calculator", name, function, iterations, warmup)
+        for name, function in CALCULATOR_CASES.items()
+    ]
+
+
+# ============ RULES ENGINE ============
+
+def run_rules_engine(sizes: List[int], iterations: int, warmup: int) -> List[Dict[str, Any]]:
+    """evaluate (deepest rule) and evaluate_all on diamond graphs of 2 * layers rules"""
+    results = []
+    for layers in sizes:
+        engine = build_diamond_engine(layers)
+        target = f"r{layers - 1}_a"
+        rounds = max(5, iterations // layers)
+
+        def evaluate(i: int) -> Any:
+            return engine.evaluate(target, {"gross_income": _income(i)})
+
+        def evaluate_all(i: int) -> Any:
+            engine.clear_trace()
+            return engine.evaluate_all({"gross_income": _income(i)})
+
+        results.append(measure("rules_engine", f"evaluate[{2 * layers} rules]", evaluate, rounds, 2))
+        results.append(measure("rules_engine", f"evaluate_all[{2 * layers} rules]", evaluate_all, rounds, 2))
+    return results
+
+
+# ============ RULE GRAPH INDEX ============
+
+def _diamond_dependencies(layers: int) -> Dict[str, List[str]]:
+    dependencies: Dict[str, List[str]] = {}
+    previous: List[str] = []
+    for layer in range(layers):
+        current = [f"r{layer}_a", f"r{layer}_b"]
+        for rule_id in current:
+            dependencies[rule_id] = list(previous)
+        previous = current
+    return dependencies
+
+
+def run_rule_graph(sizes: List[int], iterations: int, warmup: int) -> List[Dict[str, Any]]:
+    """RuleGraph build time and query latency on diamond graphs; queries should not grow with size"""
+    results = []
+    for layers in sizes:
+        dependencies = _diamond_dependencies(layers)
+        graph = RuleGraph(dependencies)
+        first, last = "r0_a", f"r{layers - 1}_b"
+
+        def build(i: int) -> Any:
+            return RuleGraph(dependencies)
+
+        def depends_on(i: int) -> Any:
+            return graph.depends_on(last, first)
+
+        def level(i: int) -> Any:
+            return graph.level(last)
+
+        results.append(measure("rule_graph", f"build[{2 * layers} rules]", build, max(5, iterations // layers), 1))
+        results.append(measure("rule_graph", f"depends_on[{2 * layers} rules]", depends_on, iterations, warmup))
+        results.append(measure("rule_graph", f"level[{2 * layers} rules]", level, iterations, warmup))
+    return results
+
+
+# ============ API ROUTES ============
+
+def _scenario(i: int) -> Dict[str, Any]:
+    return {
+        "gross_income": float(_income(i)),
+        "pension_contribution_percentage": 5.0,
+        "housing_costs": 600,
+        "children_count": i % 3,
+        "marital_status": "single" if i % 2 else "married"
+    }
+
+
+def _scenario_request(i: int) -> Dict[str, Any]:
+    return {"name": f"bench {i}", "user_id": "bench", "base_income": float(_income(i)), "pension_contribution_percentage": 5.0}
+
+
+_CSV_HEADER = "name,user_id,base_income,pension_contribution_percentage,housing_costs,children_count,marital_status\n"
+
+# name -> (method, path, request kwargs for call i)
+# GET /api/v1/rules/impact-analysis is left out: /rules/{rule_id} is declared first and answers it with a 404
+ROUTE_CASES: Dict[str, Any] = {
+    "GET /health": ("GET", "/health", lambda i: {}),
+    "GET /api/v1/rules/": ("GET", "/api/v1/rules/", lambda i: {}),
+    "GET /api/v1/rules/{rule_id}": ("GET", "/api/v1/rules/income_tax", lambda i: {}),
+    "GET /api/v1/rules/trace/{rule_id}": (
+        "GET", "/api/v1/rules/trace/income_tax", lambda i: {"params": {"gross_income": float(_income(i))}}
+    ),
+    "GET /api/v1/rules/dependencies/{rule_id}": ("GET", "/api/v1/rules/dependencies/huurtoeslag", lambda i: {}),
+    "GET /api/v1/rules/graph/{rule_id}": ("GET", "/api/v1/rules/graph/income_tax", lambda i: {}),
+    "GET /api/v1/rules/graph/impact": ("GET", "/api/v1/rules/graph/impact", lambda i: {"params": {"changed": "aow_premium,ww_premium"}}),
+    "POST /api/v1/scenarios/": ("POST", "/api/v1/scenarios/", lambda i: {"json": _scenario_request(i)}),
+    "GET /api/v1/scenarios/": ("GET", "/api/v1/scenarios/", lambda i: {"params": {"user_id": "nobody"}}),
+    "POST /api/v1/scenarios/compare": (
+        "POST", "/api/v1/scenarios/compare", lambda i: {"json": {"scenarios": [_scenario_request(i)]}}
+    ),
+    "POST /api/v1/calculations/scenario": ("POST", "/api/v1/calculations/scenario", lambda i: {"json": _scenario(i)}),
+    "POST /api/v1/calculations/scenario [fields=net_income]": (
+        "POST", "/api/v1/calculations/scenario", lambda i: {"json": {**_scenario(i), "fields": ["net_income"]}}
+    ),
+    "POST /api/v1/calculations/batch [100]": (
+        "POST", "/api/v1/calculations/batch", lambda i: {"json": [_scenario(i * 100 + n) for n in range(100)]}
+    ),
+    "POST /api/v1/calculations/ingest [100 rows]": (
+        "POST", "/api/v1/calculations/ingest", lambda i: {
+            "content": _CSV_HEADER + "".join(
+                f"h{n},bench,{_income(i * 100 + n)},5,600,{n % 3},single\n" for n in range(100)
+            ),
+            "headers": {"Content-Type": "text/csv"}
+        }
+    ),
+    "POST /api/v1/calculations/income-sweep": (
+        "POST", "/api/v1/calculations/income-sweep", lambda i: {"json": {**_scenario(i), "housing_costs": 400 + i}}
+    ),
+    "POST /api/v1/calculations/inverse": (
+        "POST", "/api/v1/calculations/inverse", lambda i: {"json": {**_scenario(i), "target_net_income": 20000 + i}}
+    ),
+    "POST /api/v1/calculations/optimize-pension": (
+        "POST", "/api/v1/calculations/optimize-pension", lambda i: {"json": {**_scenario(i), "pension_step": 0.5, "lump_sum_step": 0.5}}
+    ),
+    "POST /api/v1/calculations/tax-analysis": (
+        "POST", "/api/v1/calculations/tax-analysis", lambda i: {"params": {"gross_income": float(_income(i))}}
+    ),
+    "POST /api/v1/calculations/benefits-analysis": (
+        "POST", "/api/v1/calculations/benefits-analysis", lambda i: {"params": {"gross_income": float(_income(i)) / 4, "children": i % 3}}
+    ),
+    "POST /api/v1/calculations/threshold-analysis": (
+        "POST", "/api/v1/calculations/threshold-analysis", lambda i: {"params": {"gross_income": float(_income(i))}}
+    ),
+    "GET /api/v1/calculations/cliff-analysis": ("GET", "/api/v1/calculations/cliff-analysis", lambda i: {}),
+    "POST /api/v1/calculations/scenario-delta": (
+        "POST", "/api/v1/calculations/scenario-delta",
+        lambda i: {"json": {"base_params": _scenario(i), "modified_params": _scenario(i + 1)}}
+    ),
+    "GET /api/v1/calculations/rule-catalog": ("GET", "/api/v1/calculations/rule-catalog", lambda i: {}),
+    "GET /api/v1/jobs/": ("GET", "/api/v1/jobs/", lambda i: {}),
+    "GET /stats": ("GET", "/stats", lambda i: {}),
+}
+
+
+async def _run_routes(iterations: int, warmup: int, name_filter: Optional[str]) -> List[Dict[str, Any]]:
+    from src.main import app
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, (method, path, request) in ROUTE_CASES.items():
+                if name_filter and name_filter not in f"routes {name}":
+                    continue
+
+                async def call(i: int, method=method, path=path, request=request) -> None:
+                    response = await client.request(method, path, **request(i))
+                    if response.status_code >= 400:
+                        raise RuntimeError(f"{method} {path} returned {response.status_code}: {response.text[:200]}")
+
+                heavy = "batch" in name or "ingest" in name or "optimize" in name or "compare" in name
+                rounds = max(10, iterations // 20) if heavy else iterations
+                results.append(await measure_async("routes", name, call, rounds, warmup))
+    return results
+
+
+def run_routes(iterations: int, warmup: int, name_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+    return asyncio.run(_run_routes(iterations, warmup, name_filter))
+
+
+# ============ STARTUP ============
+
+# Run in a fresh interpreter per round: import time, lifespan until serving,
+# time until /health/ready passes, max RSS and which optional backend libraries
+# were already imported when the app started serving (they should load in the background)
+_STARTUP_SCRIPT = """
+import asyncio, json, resource, sys, time
+started = time.perf_counter()
+from src.main import app
+from src.services.backends import readiness
+imported = time.perf_counter()
+
+async def main():
+    async with app.router.lifespan_context(app):
+        serving = time.perf_counter()
+        optional = [name for name in ("sqlalchemy", "asyncpg", "redis") if name in sys.modules]
+        deadline = serving + 30
+        while not readiness()[0] and time.perf_counter() < deadline:
+            await asyncio.sleep(0.001)
+        ready = time.perf_counter()
+    return serving, ready, optional
+
+serving, ready, optional = asyncio.run(main())
+print(json.dumps({
+    "import": imported - started,
+    "startup": serving - imported,
+    "ready": ready - started,
+    "maxrss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "optional_imported": optional
+}))
+"""
+
+STARTUP_CASES = ("import src.main", "lifespan startup", "process start to ready")
+
+
+def run_startup(rounds: int) -> List[Dict[str, Any]]:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples = []
+    for _ in range(rounds):
+        completed = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT], cwd=backend_dir, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    imported = sorted({name for sample in samples for name in sample["optional_imported"]})
+    if imported:
+        print(f"⚠️ Optional backend libraries imported before serving: {', '.join(imported)}")
+    peak = max(sample["maxrss_kb"] for sample in samples) * 1024
+    return [
+        _summary("startup", name, [sample[key] for sample in samples], peak)
+        for name, key in zip(STARTUP_CASES, ("import", "startup", "ready"))
+    ]
+
+
+# ============ REPORTING ============
+
+def _metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform()
+    }
+
+
+def print_results(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None) -> int:
+    """Print a table (with p50 change against baseline); returns the number of regressions"""
+    previous = {
+        (entry["group"], entry["name"]): entry for entry in (baseline or {}).get("results", [])
+    }
+    regressions = 0
+    print(f"{'group':<13} {'benchmark':<55} {'ops/s':>10} {'p50 us':>10} {'p99 us':>10} {'peak KB':>9} {'p50 vs base':>12}")
+    for entry in results:
+        change = ""
+        before = previous.get((entry["group"], entry["name"]))
+        if before:
+            delta = entry["p50_us"] / before["p50_us"] - 1 if before["p50_us"] else 0.0
+            flag = " ⚠️" if delta > REGRESSION_THRESHOLD else ""
+            regressions += bool(flag)
+            change = f"{delta:+.1%}{flag}"
+        print(
+            f"{entry['group']:<13} {entry['name'][:55]:<55} {entry['ops_per_sec'] or 0:>10.1f} "
+            f"{entry['p50_us']:>10.2f} {entry['p99_us']:>10.2f} {entry['peak_memory_kb']:>9.1f} {change:>12}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier JSON results to compare p50 latency against")
+    parser.add_argument("--filter", help="only run benchmarks whose 'group name' contains this text")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000],
+                        help="diamond layers for the RulesEngine graphs (two rules per layer)")
+    parser.add_argument("--quick", action="store_true", help="a tenth of the iterations")
+    args = parser.parse_args()
+
+    iterations = max(10, args.iterations // 10) if args.quick else args.iterations
+    warmup = max(2, args.warmup // 10) if args.quick else args.warmup
+
+    def wanted(group: str, names) -> bool:
+        return not args.filter or any(args.filter in f"{group} {name}" for name in names)
+
+    results: List[Dict[str, Any]] = []
+    if wanted("calculator", CALCULATOR_CASES):
+        results += run_calculator(iterations, warmup)
+    if wanted("rules_engine", ["evaluate", "evaluate_all"]):
+        results += run_rules_engine(args.sizes, iterations, warmup)
+    if wanted("rule_graph", ["build", "depends_on", "level"]):
+        results += run_rule_graph(args.sizes, iterations, warmup)
+    if wanted("routes", ROUTE_CASES):
+        results += run_routes(iterations // 4, warmup, args.filter)
+    if wanted("startup", STARTUP_CASES):
+        results += run_startup(max(3, iterations // 200))
+    if args.filter:
+        results = [entry for entry in results if args.filter in f"{entry['group']} {entry['name']}"]
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+    regressions = print_results(results, baseline)
+    if baseline is not None:
+        print(f"{regressions} benchmark(s) more than {REGRESSION_THRESHOLD:.0%} slower at p50 than {args.compare}")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"metadata": _metadata(), "results": results}, handle, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
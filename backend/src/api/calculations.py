@@ -1,77 +1,633 @@
 """API endpoints for detailed calculations and traceability"""
 
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Request, WebSocket
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
+import asyncio
 from decimal import Decimal
+import codecs
+import json
+import re
 
+from ..config import settings
 from ..rules_engine.calculator import (
-    calculate_net_income, calculate_income_tax_2025,
+    ARITHMETIC_FIXED, NetIncomeResult, net_income_calculator, calculate_income_tax,
     calculate_huurtoeslag, calculate_zorgtoeslag,
     calculate_kindgebonden_budget, calculate_aow_premium, calculate_ww_premium
 )
+from ..rules_engine.parameters import DEFAULT_TAX_YEAR, get_parameters, available_years
+from ..rules_engine.piecewise import HouseholdProfile, compile_income_model
+from ..rules_engine.inverse import solve_gross_income
+from ..rules_engine.incremental import IncrementalNetIncome
+from ..rules_engine.optimizer import (
+    DEFAULT_MAX_PENSION_PCT, DEFAULT_GRID_STEP, DEFAULT_FRONTIER_POINTS, optimize_pension
+)
+from ..rules_engine.cliffs import (
+    DEFAULT_MARGINAL_RATE_LIMIT, DEFAULT_PENSION_PCT, DEFAULT_HOUSING_COSTS, cliff_report_json
+)
+from ..services.cache import (
+    result_cache_key, get_cached_result, set_cached_result, get_cached_results, set_cached_results
+)
+from ..services.singleflight import scenario_flights
+from ..services.precomputed import catalog_responses
+from ..services.executor import PoolSaturated, calculation_pool
+from ..services.ingest import IngestError, Record, iter_csv_records, process_chunk
+from ..services.sessions import CalculationSession, session_store, live_channels
 
 router = APIRouter()
 
+calculate_net_income = net_income_calculator(settings.calculation_arithmetic)
+# NetIncomeResult is Decimal-only; with fixed-point arithmetic /scenario field
+# selections come from the full integer result instead. Sessions and the live
+# channel need its incremental updates and stay Decimal (identical results).
+_FIXED_ARITHMETIC = settings.calculation_arithmetic == ARITHMETIC_FIXED
+
 @router.post("/scenario")
 async def calculate_scenario(params: Dict[str, Any]) -> Dict[str, Any]:
     """
     Complete scenario calculation with full transparency
+
+    Optional "fields" (list or comma-separated names, "trace" included)
+    limits the response to those fields; "include_trace": false leaves out
+    the tax bracket details and the calculation trace.
     """
+    try:
+        inputs = _scenario_inputs(params)
+        fields, include_trace = _result_options(params)
+        cache_key = result_cache_key("scenario", {**inputs, "fields": fields, "include_trace": include_trace})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+    
+    async def compute() -> Dict[str, Any]:
+        cached = await get_cached_result(cache_key)
+        if cached is not None:
+            return cached
+        try:
+            result = await calculation_pool.run(_calculate_scenario_inputs, inputs, fields, include_trace)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+        await set_cached_result(cache_key, result)
+        return result
+    
+    # Identical concurrent requests share one lookup/computation
+    return await scenario_flights.do(cache_key, compute)
+
+def _scenario_inputs(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize raw scenario params (applying defaults) into calculation inputs"""
+    return {
+        "gross_income": Decimal(str(params.get("gross_income", 50000))),
+        "pension_pct": params.get("pension_contribution_percentage", 5.0),
+        "lump_sum_pct": params.get("lump_sum_percentage", 0),
+        "housing_costs": Decimal(str(params.get("housing_costs", 400))),
+        "children": params.get("children_count", 0),
+        "marital_status": params.get("marital_status", "single"),
+        "tax_year": get_parameters(params.get("tax_year", DEFAULT_TAX_YEAR)).year
+    }
+
+SCENARIO_TRACE_FIELD = "trace"
+
+def _result_options(params: Dict[str, Any]) -> Tuple[Optional[List[str]], bool]:
+    """Requested result fields (None for all) and whether traces are included"""
+    fields = params.get("fields")
+    if isinstance(fields, str):
+        fields = [name.strip() for name in fields.split(",") if name.strip()]
+    if fields is not None:
+        if not isinstance(fields, list) or not all(isinstance(name, str) for name in fields):
+            raise ValueError("fields must be a list of field names")
+        fields = sorted(set(fields))
+    include_trace = params.get("include_trace", True)
+    if not isinstance(include_trace, bool):
+        raise ValueError("include_trace must be a boolean")
+    return fields, include_trace
+
+def _calculate_scenario(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Scenario calculation shared by the single and batch endpoints"""
+    return _calculate_scenario_inputs(_scenario_inputs(params), *_result_options(params))
+
+def _calculate_scenario_inputs(
+    inputs: Dict[str, Any],
+    fields: Optional[List[str]] = None,
+    include_trace: bool = True
+) -> Dict[str, Any]:
+    household = _household(inputs)
+    result_fields = None if fields is None else [name for name in fields if name != SCENARIO_TRACE_FIELD]
     
-    gross_income = Decimal(str(params.get("gross_income", 50000)))
-    pension_pct = params.get("pension_contribution_percentage", 5.0)
-    lump_sum_pct = params.get("lump_sum_percentage", 0)
-    housing_costs = Decimal(str(params.get("housing_costs", 400)))
-    children = params.get("children_count", 0)
-    marital_status = params.get("marital_status", "single")
+    if fields is None and include_trace:
+        result = calculate_net_income(**household)
+        amount = result.__getitem__
+    elif _FIXED_ARITHMETIC and not set(result_fields or ()).intersection(NetIncomeResult.OPTIONAL_FIELDS):
+        # The selected fields of the full fixed-point result, so the arithmetic
+        # never depends on the request shape (benefit_steps is lazy-only)
+        full_result = calculate_net_income(**household)
+        result = {name: full_result[name] for name in NetIncomeResult.field_names(result_fields, include_trace)}
+        amount = full_result.__getitem__
+    else:
+        # Lazy result: only the requested fields (and what they depend on) are computed
+        calculation = NetIncomeResult(**household)
+        result = calculation.to_dict(result_fields, include_trace)
+        amount = calculation.field
     
+    if include_trace and (fields is None or SCENARIO_TRACE_FIELD in fields):
+        result[SCENARIO_TRACE_FIELD] = _scenario_trace(inputs, amount)
+    
+    return result
+
+def _household(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Net income calculation arguments for normalized scenario inputs"""
+    marital_status = inputs["marital_status"]
+    return {
+        "gross_income": inputs["gross_income"],
+        "pension_contribution_pct": inputs["pension_pct"],
+        "lump_sum_percentage": inputs["lump_sum_pct"],
+        "housing_costs": inputs["housing_costs"],
+        "household_members": 1 if marital_status == "single" else 2,
+        "children_count": inputs["children"],
+        "is_partner": marital_status != "single",
+        "tax_year": inputs["tax_year"]
+    }
+
+def _scenario_trace(inputs: Dict[str, Any], amount: Callable[[str], Any]) -> Dict[str, Any]:
+    """Step-by-step calculation trace; amount(name) returns a result field"""
+    gross_income = inputs["gross_income"]
+    pension_pct = inputs["pension_pct"]
+    return {
+        "calculation_steps": [
+            {"step": 1, "description": "Gross income", "amount": float(gross_income)},
+            {"step": 2, "description": f"Minus pension contribution ({pension_pct}%)", "amount": float(gross_income) * (pension_pct/100), "rule": "Pension Scheme"},
+            {"step": 3, "description": "Taxable income", "amount": float(gross_income - (gross_income * Decimal(str(pension_pct)) / Decimal(100))), "rule": "Income Tax Rule"},
+            {"step": 4, "description": "Minus income tax", "amount": amount("income_tax"), "rule": f"Tax Brackets {inputs['tax_year']}"},
+            {"step": 5, "description": "Minus social security (AOW+WW)", "amount": amount("aow_premium") + amount("ww_premium"), "rule": "AOW & WW Premiums"},
+            {"step": 6, "description": "Plus benefits (housing+healthcare+children)", "amount": amount("total_benefits"), "rule": "Benefits Rules"},
+            {"step": 7, "description": "Final net income", "amount": amount("net_income"), "rule": "Net Income Calculation"}
+        ]
+    }
+
+class BatchParseError(ValueError):
+    """Raised (or yielded per item) when a batch body cannot be parsed"""
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator may still be reading the request
+
+    The stock response listens for http.disconnect on receive() while
+    streaming, which would swallow the request body chunks we are parsing.
+    Here the body iterator owns receive(); a disconnect surfaces through it.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+@router.post("/batch")
+async def calculate_batch(request: Request) -> StreamingResponse:
+    """
+    Batch scenario calculation, streamed back as NDJSON
+
+    Accepts a JSON array of scenario params, or NDJSON (one params object
+    per line) with Content-Type application/x-ndjson. Each input yields one
+    output line with its index, so results arrive while the body is still
+    being read and a failing item does not abort the batch.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        groups = _iter_ndjson_items(request.stream())
+    else:
+        groups = _iter_json_array_items(request.stream())
+
+    return DuplexStreamingResponse(_stream_batch_results(groups), media_type="application/x-ndjson")
+
+async def _stream_batch_results(groups: AsyncIterator[List[Any]]) -> AsyncIterator[bytes]:
+    """
+    Calculate each parsed item and encode it as one NDJSON line. Items arrive
+    in groups (those parsed from one body chunk); each group's results are
+    looked up in the result cache together and stored back together.
+    """
+    index = 0
+    try:
+        async for group in groups:
+            keys: List[Optional[str]] = []
+            for item in group:
+                try:
+                    keys.append(_batch_cache_key(item) if isinstance(item, dict) else None)
+                except Exception:
+                    keys.append(None)  # Reported by the calculation below
+            cached = await get_cached_results([key for key in keys if key is not None])
+            fresh: Dict[str, Dict[str, Any]] = {}
+            for item, key in zip(group, keys):
+                if isinstance(item, BatchParseError):
+                    line = {"index": index, "status": "error", "error": str(item)}
+                elif not isinstance(item, dict):
+                    line = {"index": index, "status": "error", "error": "Scenario params must be a JSON object"}
+                elif key in cached or key in fresh:
+                    line = {"index": index, "status": "ok", "result": cached[key] if key in cached else fresh[key]}
+                else:
+                    try:
+                        result = await calculation_pool.run(_calculate_scenario, item)
+                        line = {"index": index, "status": "ok", "result": result}
+                        if key is not None:
+                            fresh[key] = result
+                    except PoolSaturated as e:
+                        line = {"index": index, "status": "error", "error": e.detail, "retry_after": int(e.headers["Retry-After"])}
+                    except Exception as e:
+                        line = {"index": index, "status": "error", "error": f"Calculation error: {str(e)}"}
+                index += 1
+                yield (json.dumps(line) + "\n").encode()
+            await set_cached_results(fresh)
+    except BatchParseError as e:
+        # The body itself is unreadable; report it as a final line instead of truncating silently
+        yield (json.dumps({"index": index, "status": "error", "error": str(e)}) + "\n").encode()
+
+def _batch_cache_key(params: Dict[str, Any]) -> str:
+    """Result cache key of a batch item; the same key as /scenario with these params"""
+    fields, include_trace = _result_options(params)
+    return result_cache_key("scenario", {**_scenario_inputs(params), "fields": fields, "include_trace": include_trace})
+
+async def _iter_ndjson_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[Any]]:
+    """
+    Yield the decoded values of the complete NDJSON lines in each body chunk.
+    Only the new bytes are searched for newlines; a line longer than
+    BATCH_MAX_ITEM_SIZE becomes a BatchParseError item and is not kept.
+    """
+    limit = settings.batch_max_item_size
+    parts: List[bytes] = []
+    size = 0
+
+    def finish_line() -> Any:
+        nonlocal parts, size
+        line, too_long = b"".join(parts), size > limit
+        parts, size = [], 0
+        if too_long:
+            return BatchParseError(f"NDJSON line exceeds {limit} bytes")
+        return _decode_ndjson_line(line) if line.strip() else None
+
+    def take(data: bytes) -> None:
+        nonlocal parts, size
+        size += len(data)
+        if size > limit:
+            parts = []
+        elif data:
+            parts.append(data)
+
+    async for chunk in chunks:
+        group = []
+        start = 0
+        newline = chunk.find(b"\n")
+        while newline >= 0:
+            take(chunk[start:newline])
+            item = finish_line()
+            if item is not None:
+                group.append(item)
+            start = newline + 1
+            newline = chunk.find(b"\n", start)
+        take(chunk[start:])
+        if group:
+            yield group
+    item = finish_line()
+    if item is not None:
+        yield [item]
+
+def _decode_ndjson_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return BatchParseError(f"Invalid JSON line: {e}")
+
+async def _iter_json_array_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[Any]]:
+    """Incrementally decode the elements of a top-level JSON array, one group per body chunk"""
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    splitter = _JsonArraySplitter(settings.batch_max_item_size)
+    async for chunk in chunks:
+        group: List[Any] = []
+        error: Optional[BatchParseError] = None
+        try:
+            splitter.feed(utf8.decode(chunk), group)
+        except BatchParseError as e:
+            error = e
+        # Items parsed before an error are still calculated
+        if group:
+            yield group
+        if error is not None:
+            raise error
+    splitter.feed(utf8.decode(b"", final=True), [])
+    splitter.finish()
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_NON_SPACE = re.compile(r"\S")
+_JSON_STRUCTURE = re.compile(r'["\[\]{},]')
+_JSON_STRING_SPECIAL = re.compile(r'["\\]')
+
+class _JsonArraySplitter:
+    """
+    Splits a streamed top-level JSON array into its elements.
+
+    An element that lies complete in the current text is decoded directly.
+    Otherwise (split across chunks, or malformed) its boundary is found by
+    scanning for commas and brackets outside strings, with the nesting state
+    carried across chunks, so no text is scanned twice per chunk and nothing
+    is buffered beyond the current element. The element is then decoded on
+    its own: an invalid,
+    missing (e.g. "[1,,2]") or over-long element becomes a BatchParseError
+    item and parsing resumes at the next top-level separator. An element
+    longer than max_item_size is not kept in memory.
+    """
+
+    def __init__(self, max_item_size: int):
+        self.max_item_size = max_item_size
+        self._state = "before"  # before "[", "element" (inside or expecting one), "done" after "]"
+        self._elements = 0
+        self._parts: List[str] = []
+        self._size = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._too_long = False
+
+    def feed(self, text: str, items: List[Any]) -> None:
+        """Append the elements completed by text to items; raises BatchParseError if the body is not an array"""
+        pos = 0
+        while pos < len(text):
+            if self._state == "element":
+                if not self._parts and not self._too_long:
+                    decoded = self._decode_element(text, pos, items)
+                    if decoded is not None:
+                        pos = decoded
+                        continue
+                pos = self._scan_element(text, pos, items)
+                continue
+            char = text[pos]
+            if not char.isspace():
+                if self._state == "done":
+                    raise BatchParseError("Unexpected data after JSON array")
+                if char != "[":
+                    raise BatchParseError("Batch body must be a JSON array")
+                self._state = "element"
+            pos += 1
+
+    def finish(self) -> None:
+        if self._state == "before":
+            raise BatchParseError("Batch body must be a JSON array")
+        if self._state != "done":
+            raise BatchParseError("Unterminated JSON array")
+
+    def _decode_element(self, text: str, pos: int, items: List[Any]) -> Optional[int]:
+        """Decode a whole element followed by its separator; returns the position after it, or None"""
+        start = _JSON_NON_SPACE.search(text, pos)
+        if start is None:
+            return len(text)
+        try:
+            item, end = _JSON_DECODER.raw_decode(text, start.start())
+        except ValueError:
+            return None
+        separator = _JSON_NON_SPACE.search(text, end)
+        if separator is None or separator.group() not in ",]":
+            return None
+        items.append(item)
+        self._elements += 1
+        if separator.group() == "]":
+            self._state = "done"
+        return separator.end()
+
+    def _scan_element(self, text: str, pos: int, items: List[Any]) -> int:
+        """Consume text of the current element; returns the position after its separator or len(text)"""
+        end = len(text)
+        while pos < end:
+            if self._escaped:
+                self._take(text, pos, pos + 1)
+                self._escaped = False
+                pos += 1
+                continue
+            if self._in_string:
+                match = _JSON_STRING_SPECIAL.search(text, pos)
+                if match is None:
+                    self._take(text, pos, end)
+                    return end
+                if match.group() == "\\":
+                    self._escaped = True
+                else:
+                    self._in_string = False
+                self._take(text, pos, match.end())
+                pos = match.end()
+                continue
+            match = _JSON_STRUCTURE.search(text, pos)
+            if match is None:
+                self._take(text, pos, end)
+                return end
+            char, start = match.group(), match.start()
+            if self._depth == 0 and char in ",]":
+                self._take(text, pos, start)
+                if char == "]":
+                    self._state = "done"
+                    if self._elements == 0 and not "".join(self._parts).strip():
+                        return start + 1  # "[]"
+                items.append(self._finish_element())
+                return start + 1
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}" and self._depth > 0:
+                self._depth -= 1
+            self._take(text, pos, start + 1)
+            pos = start + 1
+        return end
+
+    def _take(self, text: str, start: int, end: int) -> None:
+        if self._too_long or start == end:
+            return
+        self._size += end - start
+        if self._size > self.max_item_size:
+            self._too_long = True
+            self._parts = []
+        else:
+            self._parts.append(text[start:end])
+
+    def _finish_element(self) -> Any:
+        element = "".join(self._parts).strip()
+        too_long = self._too_long
+        self._parts, self._size, self._depth, self._too_long = [], 0, 0, False
+        self._elements += 1
+        if too_long:
+            return BatchParseError(f"Array element exceeds {self.max_item_size} characters")
+        if not element:
+            return BatchParseError("Missing JSON array element")
+        try:
+            return json.loads(element)
+        except ValueError as e:
+            return BatchParseError(f"Invalid JSON array element: {e}")
+
+@router.post("/ingest")
+async def ingest_households(request: Request) -> StreamingResponse:
+    """
+    Streaming CSV ingestion, results streamed back as NDJSON
+
+    The body is CSV with a header row of ScenarioRequest fields (name,
+    user_id and base_income required). Rows are validated and calculated a
+    chunk at a time; each yields an "ok" line with the input columns plus
+    results, or a "rejected" line with its errors. A final "summary" line
+    confirms the whole body was read.
+    """
+    return DuplexStreamingResponse(_stream_ingest(request.stream()), media_type="application/x-ndjson")
+
+async def _stream_ingest(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    counts = {"accepted": 0, "rejected": 0}
+    header: List[str] = []
+    pending: List[Record] = []
+    try:
+        async for header, record in iter_csv_records(chunks):
+            pending.append(record)
+            if len(pending) >= settings.ingest_chunk_size:
+                yield await _ingest_chunk(header, pending, counts)
+                pending = []
+        if pending:
+            yield await _ingest_chunk(header, pending, counts)
+    except IngestError as e:
+        yield (json.dumps({"status": "error", "error": str(e), **counts}) + "\n").encode()
+        return
+    summary = {"status": "summary", "rows": counts["accepted"] + counts["rejected"], **counts}
+    yield (json.dumps(summary) + "\n").encode()
+
+async def _ingest_chunk(header: List[str], records: List[Record], counts: Dict[str, int]) -> bytes:
+    """Validate and calculate one chunk in the pool; a full pool delays the upload instead of failing it"""
+    while True:
+        try:
+            enriched, rejects = await calculation_pool.run(process_chunk, header, records)
+            break
+        except PoolSaturated:
+            await asyncio.sleep(0.05)
+    counts["accepted"] += len(enriched)
+    counts["rejected"] += len(rejects)
+    lines = [{"row": row.pop("row"), "status": "ok", "result": row} for row in enriched]
+    lines += [{"row": reject["row"], "status": "rejected", "errors": reject["errors"], "raw": reject["raw"]} for reject in rejects]
+    lines.sort(key=lambda line: line["row"])
+    return "".join(json.dumps(line) + "\n" for line in lines).encode()
+
+@router.post("/income-sweep")
+async def calculate_income_sweep(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Net income (and every intermediate field) as a function of gross income
+    Returns the compiled piecewise-linear curve over [min_income, max_income],
+    plus evaluated points every `step` euros when a step is given
+    """
     try:
-        result = calculate_net_income(
-            gross_income=gross_income,
-            pension_contribution_pct=pension_pct,
-            lump_sum_percentage=lump_sum_pct,
-            housing_costs=housing_costs,
-            household_members=1 if marital_status == "single" else 2,
-            children_count=children,
-            is_partner=marital_status != "single"
+        return await calculation_pool.run(_income_sweep, params)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+
+def _income_sweep(params: Dict[str, Any]) -> Dict[str, Any]:
+    inputs = _scenario_inputs(params)
+    low = Decimal(str(params.get("min_income", 0)))
+    high = Decimal(str(params.get("max_income", 150000)))
+    if low < 0 or high < low:
+        raise ValueError("Income range must satisfy 0 <= min_income <= max_income")
+    model = compile_income_model(_household_profile(inputs))
+    step = params.get("step")
+    points = model.sweep(low, high, Decimal(str(step))) if step is not None else None
+    
+    result = {
+        "tax_year": inputs["tax_year"],
+        "min_income": float(low),
+        "max_income": float(high),
+        "breakpoints": [
+            {
+                "gross_income": float(breakpoint.gross_income),
+                "causes": list(breakpoint.causes),
+                "values": {name: float(value) for name, value in breakpoint.values.items()}
+            }
+            for breakpoint in model.breakpoints_between(low, high)
+        ],
+        "segments": [segment.to_dict() for segment in model.segments_between(low, high)]
+    }
+    if points is not None:
+        result["points"] = points
+    return result
+
+@router.post("/inverse")
+async def calculate_required_gross(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Gross income needed for a target net income
+    Reports every crossing of the target (benefit cut-offs make net income
+    non-monotone) and the gross income ranges whose net income reaches it
+    """
+    try:
+        if "target_net_income" not in params:
+            raise ValueError("target_net_income is required")
+        inputs = _scenario_inputs(params)
+        target = Decimal(str(params["target_net_income"]))
+        return await calculation_pool.run(solve_gross_income, _household_profile(inputs), target)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+
+@router.post("/optimize-pension")
+async def optimize_pension_choice(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Search every (pension %, lump-sum %) combination for a household
+    Returns the Pareto frontier of cash now versus pension retained, and the
+    combination with the lowest tax and premiums net of benefits
+    """
+    try:
+        inputs = _scenario_inputs(params)
+        is_single = inputs["marital_status"] == "single"
+        return await calculation_pool.run(
+            optimize_pension,
+            gross_income=inputs["gross_income"],
+            housing_costs=inputs["housing_costs"],
+            household_members=1 if is_single else 2,
+            children_count=inputs["children"],
+            is_partner=not is_single,
+            tax_year=inputs["tax_year"],
+            max_pension_pct=float(params.get("max_pension_percentage", DEFAULT_MAX_PENSION_PCT)),
+            pension_step=float(params.get("pension_step", DEFAULT_GRID_STEP)),
+            lump_sum_step=float(params.get("lump_sum_step", DEFAULT_GRID_STEP)),
+            frontier_points=int(params.get("frontier_points", DEFAULT_FRONTIER_POINTS))
         )
-        
-        # Add calculation trace
-        result["trace"] = {
-            "calculation_steps": [
-                {"step": 1, "description": "Gross income", "amount": float(gross_income)},
-                {"step": 2, "description": f"Minus pension contribution ({pension_pct}%)", "amount": float(gross_income) * (pension_pct/100), "rule": "Pension Scheme"},
-                {"step": 3, "description": "Taxable income", "amount": float(gross_income - (gross_income * Decimal(str(pension_pct)) / Decimal(100))), "rule": "Income Tax Rule"},
-                {"step": 4, "description": "Minus income tax", "amount": result["income_tax"], "rule": "Tax Brackets 2025"},
-                {"step": 5, "description": "Minus social security (AOW+WW)", "amount": result["aow_premium"] + result["ww_premium"], "rule": "AOW & WW Premiums"},
-                {"step": 6, "description": "Plus benefits (housing+healthcare+children)", "amount": result["total_benefits"], "rule": "Benefits Rules"},
-                {"step": 7, "description": "Final net income", "amount": result["net_income"], "rule": "Net Income Calculation"}
-            ]
-        }
-        
-        return result
-        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
 
+def _household_profile(inputs: Dict[str, Any]) -> HouseholdProfile:
+    """Scenario inputs minus gross income, as calculate_scenario applies them"""
+    is_single = inputs["marital_status"] == "single"
+    return HouseholdProfile(
+        pension_contribution_pct=inputs["pension_pct"],
+        lump_sum_percentage=inputs["lump_sum_pct"],
+        housing_costs=inputs["housing_costs"],
+        household_members=1 if is_single else 2,
+        children_count=inputs["children"],
+        is_partner=not is_single,
+        tax_year=inputs["tax_year"]
+    )
+
 @router.post("/tax-analysis")
-async def analyze_tax_impact(gross_income: float) -> Dict[str, Any]:
+async def analyze_tax_impact(gross_income: float, tax_year: int = DEFAULT_TAX_YEAR) -> Dict[str, Any]:
     """
     Deep dive into tax calculation with bracket details
     """
+    try:
+        tax_params = get_parameters(tax_year)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
     income = Decimal(str(gross_income))
-    tax, brackets = calculate_income_tax_2025(income)
+    tax, brackets = calculate_income_tax(income, tax_params)
     
     return {
+        "tax_year": tax_params.year,
         "gross_income": float(income),
         "tax_brackets": brackets,
         "total_tax": float(tax),
         "effective_tax_rate": float(tax / income * 100) if income > 0 else 0,
         "marginal_tax_rate": float(brackets[-1]["rate"] * 100) if brackets else 0,
         "explanation": {
-            "general_allowance": 3107,
-            "labour_allowance": 1800,
-            "total_allowances": 4907,
+            "general_allowance": float(tax_params.general_tax_allowance),
+            "labour_allowance": float(tax_params.labour_tax_allowance),
+            "total_allowances": float(tax_params.total_tax_allowance),
             "note": "These allowances reduce your taxable income before brackets are applied"
         }
     }
@@ -82,20 +638,26 @@ async def analyze_benefits_impact(
     household_members: int = 1,
     housing_costs: float = 400,
     children: int = 0,
-    is_partner: bool = False
+    is_partner: bool = False,
+    tax_year: int = DEFAULT_TAX_YEAR
 ) -> Dict[str, Any]:
     """
     Analyze eligibility and amounts for all benefits
     """
+    try:
+        tax_params = get_parameters(tax_year)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
     income = Decimal(str(gross_income))
     housing_annual = Decimal(str(housing_costs * 12))
     
     # Calculate each benefit
-    huurtoeslag, huurtoeslag_trace = calculate_huurtoeslag(income, household_members, housing_annual)
-    zorgtoeslag, zorgtoeslag_trace = calculate_zorgtoeslag(income, household_members, is_partner)
-    kindgebonden, kindgebonden_trace = calculate_kindgebonden_budget(children, income)
+    huurtoeslag, huurtoeslag_trace = calculate_huurtoeslag(income, household_members, housing_annual, tax_params)
+    zorgtoeslag, zorgtoeslag_trace = calculate_zorgtoeslag(income, household_members, is_partner, tax_params)
+    kindgebonden, kindgebonden_trace = calculate_kindgebonden_budget(children, income, tax_params)
     
     return {
+        "tax_year": tax_params.year,
         "income": float(income),
         "benefits": {
             "huurtoeslag": {
@@ -160,6 +722,27 @@ async def analyze_thresholds(gross_income: float) -> Dict[str, Any]:
     
     return analysis
 
+@router.get("/cliff-analysis")
+async def analyze_cliffs(
+    marginal_rate_limit: float = DEFAULT_MARGINAL_RATE_LIMIT,
+    pension_contribution_percentage: float = DEFAULT_PENSION_PCT,
+    housing_costs: float = float(DEFAULT_HOUSING_COSTS),
+    tax_year: int = DEFAULT_TAX_YEAR
+) -> Response:
+    """
+    Every benefit cliff and every income interval whose effective marginal rate
+    exceeds the limit, for all household types (members x children x partner)
+    Precomputed per ruleset version; repeated queries are served from cache
+    """
+    try:
+        get_parameters(tax_year)
+        body = cliff_report_json(
+            marginal_rate_limit, pension_contribution_percentage, Decimal(str(housing_costs)), tax_year
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+    return Response(content=body, media_type="application/json")
+
 @router.post("/scenario-delta")
 async def calculate_scenario_delta(
     base_params: Dict[str, Any],
@@ -169,7 +752,9 @@ async def calculate_scenario_delta(
     Calculate the delta between two scenarios
     Shows exactly what changed and why
     """
-    
+    return await calculation_pool.run(_scenario_delta, base_params, modified_params)
+
+def _scenario_delta(base_params: Dict[str, Any], modified_params: Dict[str, Any]) -> Dict[str, Any]:
     # Calculate both scenarios
     base_result = calculate_net_income(
         gross_income=Decimal(str(base_params.get("gross_income", 50000))),
@@ -215,13 +800,205 @@ async def calculate_scenario_delta(
         }
     }
 
+# ============ CALCULATION SESSIONS ============
+
+# Scenario params a session accepts in PATCH; fields/include_trace are fixed at creation
+SESSION_INPUTS = (
+    "gross_income", "pension_contribution_percentage", "lump_sum_percentage",
+    "housing_costs", "children_count", "marital_status", "tax_year"
+)
+
+def _get_session(session_id: str) -> CalculationSession:
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found or expired")
+    return session
+
+@router.post("/sessions", status_code=201)
+async def create_session(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Start a calculation session for slider-driven UIs
+    Takes /scenario params (without the "trace" field); PATCH then returns
+    only the outputs an input change affects. Sessions are small, incremental
+    updates take tens of microseconds, so they run on the event loop.
+    """
+    try:
+        unknown = set(params).difference(SESSION_INPUTS, ("fields", "include_trace"))
+        if unknown:
+            raise ValueError(f"Unknown session input(s): {', '.join(sorted(unknown))}")
+        fields, include_trace = _result_options(params)
+        state = IncrementalNetIncome(_household(_scenario_inputs(params)), fields, include_trace)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+    session = session_store.create(dict(params), state)
+    return _session_response(session, {"result": state.result})
+
+@router.get("/sessions/{session_id}")
+async def get_session(session_id: str) -> Dict[str, Any]:
+    """Current inputs and full result of a session"""
+    session = _get_session(session_id)
+    return _session_response(session, {"result": session.state.result})
+
+@router.patch("/sessions/{session_id}")
+async def update_session(session_id: str, changes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Change one or more inputs; recomputes only the rules downstream of them
+    and returns only the outputs whose values changed
+    """
+    session = _get_session(session_id)
+    try:
+        unknown = set(changes).difference(SESSION_INPUTS)
+        if unknown:
+            raise ValueError(f"Unknown or fixed session input(s): {', '.join(sorted(unknown))}")
+        params = {**session.params, **changes}
+        changed, changed_inputs, recomputed = session.state.update(_household(_scenario_inputs(params)))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+    session.params = params
+    session.updates += 1
+    return _session_response(session, {
+        "changed_inputs": changed_inputs,
+        "recomputed": recomputed,
+        "changed": changed
+    })
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str) -> Dict[str, Any]:
+    """End a session before it expires"""
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found or expired")
+    return {"status": "deleted", "session_id": session_id}
+
+def _session_response(session: CalculationSession, body: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "session_id": session.id,
+        "inputs": {name: session.params[name] for name in SESSION_INPUTS if name in session.params},
+        "updates": session.updates,
+        "expires_in_seconds": session_store.expires_in(session),
+        **body
+    }
+
+# ============ LIVE RECALCULATION ============
+
+@router.websocket("/live")
+async def live_recalculation(websocket: WebSocket) -> None:
+    """
+    Live recalculation over one WebSocket per client
+    The first message holds session params (see POST /sessions); later ones
+    hold changed inputs, optionally with a "seq" number that is echoed back.
+    Updates arriving within one tick are merged (latest value wins) and
+    answered with one delta of the changed outputs.
+    """
+    await websocket.accept()
+    live_channels.active += 1
+    live_channels.connections += 1
+    try:
+        await _LiveChannel(websocket).run()
+    finally:
+        live_channels.active -= 1
+
+class _LiveChannel:
+    """
+    One connection: a receiver merges incoming updates into a single pending
+    change set, a pusher applies it at most once per tick. A client that
+    sends faster than it reads therefore never queues more than one pending
+    update on the server, and one that stops reading is disconnected.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.params: Dict[str, Any] = {}
+        self.state: Optional[IncrementalNetIncome] = None
+        self.pending: Dict[str, Any] = {}
+        self.pending_seq: Any = None
+        self.errors: List[Dict[str, Any]] = []
+        self.ready = asyncio.Event()
+
+    async def run(self) -> None:
+        tasks = [asyncio.create_task(self._receive()), asyncio.create_task(self._push())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _receive(self) -> None:
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            seq = None
+            try:
+                update = json.loads(message.get("text") or message.get("bytes") or b"")
+                if not isinstance(update, dict):
+                    raise ValueError("Update must be a JSON object")
+                seq = update.pop("seq", None)
+                # Checked here so one bad update is not merged with (and does not sink) valid ones
+                allowed = SESSION_INPUTS if self.state is not None else SESSION_INPUTS + ("fields", "include_trace")
+                unknown = set(update).difference(allowed)
+                if unknown:
+                    raise ValueError(f"Unknown or fixed session input(s): {', '.join(sorted(unknown))}")
+            except ValueError as e:
+                self.errors.append({"type": "error", "seq": seq, "error": f"Invalid message: {e}"})
+                self.ready.set()
+                continue
+            live_channels.received += 1
+            if self.pending or self.pending_seq is not None:
+                live_channels.coalesced += 1
+            self.pending_seq = seq
+            self.pending.update(update)
+            self.ready.set()
+
+    async def _push(self) -> None:
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            messages, self.errors = self.errors, []
+            if self.pending or self.pending_seq is not None:
+                changes, seq = self.pending, self.pending_seq
+                self.pending, self.pending_seq = {}, None
+                messages.append(self._apply(changes, seq))
+            for message in messages:
+                try:
+                    await asyncio.wait_for(self.websocket.send_text(json.dumps(message)), settings.live_send_timeout)
+                except asyncio.TimeoutError:
+                    live_channels.dropped += 1
+                    return
+                live_channels.pushed += 1
+            # Updates arriving until the next tick are merged into one
+            await asyncio.sleep(settings.live_tick_interval)
+
+    def _apply(self, changes: Dict[str, Any], seq: Any) -> Dict[str, Any]:
+        """
+        Calculate one merged change set (the first one starts the calculation);
+        a set that fails is rejected as a whole and the state stays as it was
+        """
+        try:
+            if self.state is None:
+                fields, include_trace = _result_options(changes)
+                self.state = IncrementalNetIncome(_household(_scenario_inputs(changes)), fields, include_trace)
+                self.params = {name: value for name, value in changes.items() if name in SESSION_INPUTS}
+                return {"type": "result", "seq": seq, "result": self.state.result}
+            params = {**self.params, **changes}
+            changed, changed_inputs, _ = self.state.update(_household(_scenario_inputs(params)))
+            self.params = params
+            return {"type": "delta", "seq": seq, "changed_inputs": changed_inputs, "changed": changed}
+        except Exception as e:
+            return {"type": "error", "seq": seq, "error": f"Calculation error: {str(e)}"}
+
 @router.get("/rule-catalog")
-async def get_rule_catalog() -> Dict[str, Any]:
+async def get_rule_catalog(request: Request) -> Response:
     """
     Get complete catalog of all rules with legal references
+    Precomputed per ruleset version and served with an ETag
     """
+    return catalog_responses.respond("rule-catalog", request)
+
+def _rule_catalog() -> Dict[str, Any]:
     return {
-        "year": 2025,
+        "year": DEFAULT_TAX_YEAR,
+        "available_years": available_years(),
         "rules": [
             {
                 "id": "income_tax",
@@ -267,3 +1044,5 @@ async def get_rule_catalog() -> Dict[str, Any]:
             }
         ]
     }
+
+catalog_responses.register("rule-catalog", _rule_catalog)
@@ -0,0 +1,96 @@
+"""API endpoints for asynchronous population run jobs"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from typing import Dict, Any, Optional
+import os
+
+from ..services.jobs import (
+    MAX_RESULT_PAGE, RESULT_COLUMNS, ACTIVE_STATUSES, Job, job_manager
+)
+
+router = APIRouter()
+
+def _get_job(job_id: str) -> Job:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.post("/", status_code=202)
+async def submit_job(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Submit a population run
+    Households are drawn per chunk from the spec (constants, choice lists or
+    min/max ranges per input) and calculated in the background
+    """
+    try:
+        job = job_manager.submit(spec)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid job: {str(e)}")
+    return job.to_dict()
+
+@router.get("/")
+async def list_jobs() -> Dict[str, Any]:
+    """All known jobs with their progress"""
+    return {"jobs": [job.to_dict() for job in job_manager.jobs.values()]}
+
+@router.get("/{job_id}")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    """Job status and progress"""
+    return _get_job(job_id).to_dict()
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str) -> Dict[str, Any]:
+    """Stop a job after the chunk in progress; finished chunks stay readable"""
+    _get_job(job_id)
+    return job_manager.cancel(job_id).to_dict()
+
+@router.delete("/{job_id}")
+async def delete_job(job_id: str) -> Dict[str, Any]:
+    """Cancel a job and remove its results from disk"""
+    _get_job(job_id)
+    await job_manager.delete(job_id)
+    return {"status": "deleted", "job_id": job_id}
+
+@router.get("/{job_id}/results")
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=MAX_RESULT_PAGE),
+    columns: Optional[str] = Query(None, description="Comma-separated column names (default: all)")
+) -> Dict[str, Any]:
+    """
+    Page through finished rows, column by column
+    Rows become available chunk by chunk while the job runs
+    """
+    job = _get_job(job_id)
+    names = [name.strip() for name in columns.split(",") if name.strip()] if columns else list(RESULT_COLUMNS)
+    unknown = [name for name in names if name not in RESULT_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown column(s): {', '.join(unknown)}")
+
+    available = job.rows_available()
+    rows = job.read_rows(offset, limit, names)
+    returned = len(rows[names[0]]) if names else 0
+    return {
+        "job_id": job_id,
+        "status": job.state["status"],
+        "offset": offset,
+        "count": returned,
+        "rows_available": available,
+        "complete": job.state["status"] not in ACTIVE_STATUSES,
+        "next_offset": offset + returned if offset + returned < available else None,
+        "columns": rows
+    }
+
+@router.get("/{job_id}/chunks/{index}/{column}")
+async def download_chunk_column(job_id: str, index: int, column: str) -> FileResponse:
+    """One finished chunk column as a .npy file (np.load(path, mmap_mode="r") on the client)"""
+    job = _get_job(job_id)
+    if column not in RESULT_COLUMNS:
+        raise HTTPException(status_code=404, detail=f"Unknown column {column}")
+    if not 0 <= index < job.state["chunks_done"]:
+        raise HTTPException(status_code=404, detail=f"Chunk {index} is not finished")
+    path = job.chunk_path(index, column)
+    return FileResponse(path, media_type="application/octet-stream", filename=os.path.basename(path))
@@ -1,7 +1,8 @@
 """API endpoints for rules and rule traceability"""
 
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from typing import List, Dict, Any, Optional
 from decimal import Decimal
 
 from ..rules_engine.calculator import (
@@ -9,6 +10,8 @@ from ..rules_engine.calculator import (
     calculate_income_tax_2025, calculate_aow_premium, calculate_ww_premium,
     calculate_huurtoeslag, calculate_zorgtoeslag, calculate_kindgebonden_budget
 )
+from ..rules_engine.graph import RuleGraph
+from ..services.precomputed import catalog_responses
 
 router = APIRouter()
 
@@ -103,21 +106,95 @@ RULE_DEPENDENCIES = {
     "kindgebonden_budget": ["income_tax"]
 }
 
+# Dependency index (closure, levels, reverse dependencies), built once at import;
+# an unknown or circular dependency fails loading instead of the first request
+RULE_GRAPH = RuleGraph({rule_id: RULE_DEPENDENCIES.get(rule_id, []) for rule_id in RULES_CATALOG})
+
 @router.get("/")
-async def list_rules() -> Dict[str, Any]:
-    """List all available rules"""
+async def list_rules(request: Request) -> Response:
+    """List all available rules (precomputed, ETag-cached)"""
+    return catalog_responses.respond("rules", request)
+
+# ============ RULE GRAPH ============
+# Declared before /{rule_id}, which would otherwise match /graph
+
+@router.get("/graph")
+async def get_rule_graph(request: Request) -> Response:
+    """
+    Evaluation order, topological levels and direct dependencies/dependents
+    of every rule (precomputed, ETag-cached)
+    """
+    return catalog_responses.respond("graph", request)
+
+@router.get("/graph/impact")
+async def get_rule_impact(changed: str) -> Dict[str, Any]:
+    """
+    Rules whose results can change when the given rules (comma-separated ids)
+    change, and the order to recalculate them in
+    """
+    changed_ids = list(dict.fromkeys(rule_id.strip() for rule_id in changed.split(",") if rule_id.strip()))
+    for rule_id in changed_ids:
+        if rule_id not in RULE_GRAPH:
+            raise HTTPException(status_code=404, detail=f"Rule {rule_id} not found")
+    impacted = RULE_GRAPH.impacted(changed_ids)
+    recalculate = set(changed_ids).union(impacted)
     return {
-        "total_rules": len(RULES_CATALOG),
-        "year": 2025,
-        "rules": list(RULES_CATALOG.values())
+        "changed": changed_ids,
+        "impacted_rules": impacted,
+        "recalculation_order": [rule_id for rule_id in RULE_GRAPH.order if rule_id in recalculate]
+    }
+
+@router.get("/graph/{rule_id}")
+async def get_rule_graph_entry(rule_id: str, request: Request) -> Response:
+    """
+    Direct and transitive dependencies, direct dependents and impact set
+    of one rule (precomputed, ETag-cached)
+    """
+    if rule_id not in RULE_GRAPH:
+        raise HTTPException(status_code=404, detail=f"Rule {rule_id} not found")
+    return catalog_responses.respond(f"graph:{rule_id}", request)
+
+def _graph_summary() -> Dict[str, Any]:
+    return {
+        "total_rules": len(RULE_GRAPH),
+        "evaluation_order": RULE_GRAPH.order,
+        "levels": RULE_GRAPH.levels,
+        "rules": {
+            rule_id: {
+                "level": RULE_GRAPH.level(rule_id),
+                "depends_on": RULE_GRAPH.dependencies(rule_id),
+                "dependents": RULE_GRAPH.dependents(rule_id)
+            }
+            for rule_id in RULE_GRAPH.order
+        }
+    }
+
+def _graph_entry(rule_id: str) -> Dict[str, Any]:
+    return {
+        "rule_id": rule_id,
+        "rule_name": RULES_CATALOG[rule_id].get("name", rule_id),
+        "level": RULE_GRAPH.level(rule_id),
+        "depends_on": RULE_GRAPH.dependencies(rule_id),
+        "all_dependencies": RULE_GRAPH.dependencies(rule_id, transitive=True),
+        "dependents": RULE_GRAPH.dependents(rule_id),
+        "impacted_rules": RULE_GRAPH.dependents(rule_id, transitive=True)
     }
 
 @router.get("/{rule_id}")
-async def get_rule(rule_id: str) -> Dict[str, Any]:
-    """Get detailed information about a specific rule"""
+async def get_rule(rule_id: str, request: Request) -> Response:
+    """Get detailed information about a specific rule (precomputed, ETag-cached)"""
     if rule_id not in RULES_CATALOG:
         raise HTTPException(status_code=404, detail=f"Rule {rule_id} not found")
-    
+    return catalog_responses.respond(f"rule:{rule_id}", request)
+
+def _rule_list() -> Dict[str, Any]:
+    return {
+        "total_rules": len(RULES_CATALOG),
+        "year": 2025,
+        "rules": list(RULES_CATALOG.values())
+    }
+
+def _rule_detail(rule_id: str) -> Dict[str, Any]:
     rule = RULES_CATALOG[rule_id]
     dependencies = RULE_DEPENDENCIES.get(rule_id, [])
     
@@ -176,30 +253,37 @@ async def trace_rule_calculation(rule_id: str, gross_income: float) -> Dict[str,
     return trace
 
 @router.get("/dependencies/{rule_id}")
-async def get_rule_dependencies(rule_id: str) -> Dict[str, Any]:
+async def get_rule_dependencies(rule_id: str, request: Request) -> Response:
     """
     Get the dependency graph for a rule
     Shows which other rules must be calculated first
     """
     if rule_id not in RULES_CATALOG:
         raise HTTPException(status_code=404, detail=f"Rule {rule_id} not found")
-    
-    def build_dependency_tree(rid: str, visited=None) -> Dict:
-        if visited is None:
-            visited = set()
-        if rid in visited:
-            return {"rule_id": rid, "circular": True}
-        
-        visited.add(rid)
-        deps = RULE_DEPENDENCIES.get(rid, [])
-        
-        return {
-            "rule_id": rid,
-            "rule_name": RULES_CATALOG[rid].get("name", rid),
-            "depends_on": [build_dependency_tree(dep_id, visited.copy()) for dep_id in deps]
-        }
-    
-    return build_dependency_tree(rule_id)
+    return catalog_responses.respond(f"dependencies:{rule_id}", request)
+
+def _dependency_tree(rule_id: str, trees: Optional[Dict[str, Dict]] = None) -> Dict:
+    """
+    Nested dependency tree; each rule's subtree is built once and shared,
+    so diamond-shaped graphs take linear time to build
+    """
+    if trees is None:
+        trees = {}
+        for rid in RULE_GRAPH.order:
+            trees[rid] = {
+                "rule_id": rid,
+                "rule_name": RULES_CATALOG[rid].get("name", rid),
+                "depends_on": [trees[dep_id] for dep_id in RULE_DEPENDENCIES.get(rid, [])]
+            }
+    return trees[rule_id]
+
+# Catalog responses are encoded once per ruleset version (see services/precomputed.py)
+catalog_responses.register("rules", _rule_list)
+catalog_responses.register("graph", _graph_summary)
+for _rule_id in RULES_CATALOG:
+    catalog_responses.register(f"rule:{_rule_id}", lambda rule_id=_rule_id: _rule_detail(rule_id))
+    catalog_responses.register(f"dependencies:{_rule_id}", lambda rule_id=_rule_id: _dependency_tree(rule_id))
+    catalog_responses.register(f"graph:{_rule_id}", lambda rule_id=_rule_id: _graph_entry(rule_id))
 
 @router.get("/impact-analysis")
 async def analyze_rule_impacts(gross_income: float, pension_pct: float) -> Dict[str, Any]:
@@ -1,7 +1,7 @@
 """API endpoints for scenarios management"""
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from decimal import Decimal
 import uuid
 from datetime import datetime
@@ -10,10 +10,16 @@ from ..models.schemas import (
     ScenarioRequest, ScenarioResponse, ComparisonRequest, ComparisonResponse,
     ScenarioDelta, ScenarioInsight
 )
-from ..rules_engine.calculator import calculate_net_income
+from ..config import settings
+from ..rules_engine.calculator import net_income_calculator
+from ..services.cache import result_cache_key, get_cached_result, set_cached_result
+from ..services.singleflight import comparison_flights
+from ..services.executor import calculation_pool
 
 router = APIRouter()
 
+calculate_net_income = net_income_calculator(settings.calculation_arithmetic)
+
 # In-memory storage (would use database in production)
 scenarios_db = {}
 
@@ -23,15 +29,12 @@ async def create_scenario(request: ScenarioRequest) -> ScenarioResponse:
     scenario_id = str(uuid.uuid4())
     
     try:
-        # Calculate net income and all impacts
-        calculations = calculate_net_income(
-            gross_income=request.base_income,
-            pension_contribution_pct=request.pension_contribution_percentage,
-            housing_costs=request.housing_costs,
-            household_members=1,  # From marital_status
-            children_count=request.children_count,
-            is_partner=request.marital_status != "single"
-        )
+        # Calculate net income and all impacts (identical inputs are served from cache)
+        cache_key = result_cache_key("scenario_calculations", _calculation_inputs(request))
+        calculations = await get_cached_result(cache_key)
+        if calculations is None:
+            calculations = await calculation_pool.run(calculate_net_income, **_calculation_inputs(request))
+            await set_cached_result(cache_key, calculations)
         
         scenario = {
             "id": scenario_id,
@@ -51,9 +54,23 @@ async def create_scenario(request: ScenarioRequest) -> ScenarioResponse:
         scenarios_db[scenario_id] = scenario
         return ScenarioResponse(**scenario)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
 
+def _calculation_inputs(request: ScenarioRequest) -> Dict[str, Any]:
+    """calculate_net_income arguments for a scenario request"""
+    return {
+        "gross_income": request.base_income,
+        "pension_contribution_pct": request.pension_contribution_percentage,
+        "housing_costs": request.housing_costs,
+        "household_members": 1,  # From marital_status
+        "children_count": request.children_count,
+        "is_partner": request.marital_status != "single",
+        "tax_year": request.tax_year
+    }
+
 @router.get("/{scenario_id}", response_model=ScenarioResponse)
 async def get_scenario(scenario_id: str) -> ScenarioResponse:
     """Retrieve a saved scenario"""
@@ -76,6 +93,13 @@ async def list_scenarios(user_id: Optional[str] = Query(None)) -> List[ScenarioR
 async def compare_scenarios(request: ComparisonRequest) -> ComparisonResponse:
     """Compare multiple scenarios side-by-side"""
     
+    async def compute() -> ComparisonResponse:
+        return await calculation_pool.run(_compare_scenarios, request)
+    
+    # Identical concurrent comparisons share one computation
+    return await comparison_flights.do(result_cache_key("compare", request.dict()), compute)
+
+def _compare_scenarios(request: ComparisonRequest) -> ComparisonResponse:
     # Create scenarios
     created_scenarios = []
     for scenario_req in request.scenarios:
@@ -86,7 +110,8 @@ async def compare_scenarios(request: ComparisonRequest) -> ComparisonResponse:
                 housing_costs=scenario_req.housing_costs,
                 household_members=1,
                 children_count=scenario_req.children_count,
-                is_partner=scenario_req.marital_status != "single"
+                is_partner=scenario_req.marital_status != "single",
+                tax_year=scenario_req.tax_year
             )
             
             scenario = {
@@ -0,0 +1,79 @@
+"""
+Command-line entry points
+
+Usage (from backend/):
+    python -m src.cli ingest households.csv -o enriched.csv --rejects rejects.csv
+"""
+
+import argparse
+import csv
+import sys
+from typing import List, Optional
+
+from .config import settings
+from .services.ingest import RESULT_FIELDS, IngestError, chunked, iter_csv_file, process_chunk
+
+
+def _open(path: str, mode: str):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="", encoding="utf-8-sig" if "r" in mode else "utf-8")
+
+
+def ingest(args: argparse.Namespace) -> int:
+    """Stream a household CSV through the calculator; returns the number of rejected rows"""
+    source = _open(args.input, "r")
+    output = _open(args.output, "w")
+    rejects_file = _open(args.rejects, "w") if args.rejects else None
+    try:
+        header, records = iter_csv_file(source)
+        writer = csv.DictWriter(output, ["row", *header, *RESULT_FIELDS], extrasaction="ignore")
+        writer.writeheader()
+        reject_writer = None
+        if rejects_file is not None:
+            reject_writer = csv.DictWriter(rejects_file, ["row", "errors", *header], extrasaction="ignore")
+            reject_writer.writeheader()
+
+        accepted = rejected = 0
+        for chunk in chunked(records, args.chunk_size):
+            enriched, rejects = process_chunk(header, chunk)
+            writer.writerows(enriched)
+            accepted += len(enriched)
+            rejected += len(rejects)
+            if reject_writer is not None:
+                reject_writer.writerows(
+                    {"row": reject["row"], "errors": "; ".join(reject["errors"]), **reject["raw"]}
+                    for reject in rejects
+                )
+            else:
+                for reject in rejects:
+                    print(f"⚠️ Row {reject['row']} rejected: {'; '.join(reject['errors'])}", file=sys.stderr)
+        print(f"✅ {accepted} rows calculated, {rejected} rejected", file=sys.stderr)
+        return rejected
+    finally:
+        for handle in (source, output, rejects_file):
+            if handle is not None and handle not in (sys.stdin, sys.stdout):
+                handle.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Rules-as-Code Platform tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="Calculate every household in a CSV file")
+    ingest_parser.add_argument("input", help="CSV with ScenarioRequest columns ('-' for stdin)")
+    ingest_parser.add_argument("-o", "--output", default="-", help="Enriched CSV ('-' for stdout)")
+    ingest_parser.add_argument("--rejects", help="CSV for rejected rows (default: report on stderr)")
+    ingest_parser.add_argument("--chunk-size", type=int, default=settings.ingest_chunk_size)
+    ingest_parser.set_defaults(handler=ingest)
+
+    args = parser.parse_args(argv)
+    try:
+        args.handler(args)
+    except IngestError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
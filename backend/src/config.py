@@ -17,6 +17,63 @@ class Settings(BaseSettings):
     
     # Redis
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    # Connection pool size and per-command timeout in seconds; after REDIS_BREAKER_THRESHOLD
+    # consecutive failures Redis is skipped, and probed again every REDIS_BREAKER_RESET_TIMEOUT
+    # seconds. Cached values at least REDIS_COMPRESS_THRESHOLD bytes are zlib-compressed (0 = never).
+    redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "20"))
+    redis_socket_timeout: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+    redis_breaker_threshold: int = int(os.getenv("REDIS_BREAKER_THRESHOLD", "5"))
+    redis_breaker_reset_timeout: float = float(os.getenv("REDIS_BREAKER_RESET_TIMEOUT", "10"))
+    redis_compress_threshold: int = int(os.getenv("REDIS_COMPRESS_THRESHOLD", "1024"))
+    
+    # Database and Redis connect in the background at startup: per-attempt timeout and
+    # retry backoff in seconds; READINESS_BACKENDS (e.g. "database,redis") must be
+    # connected before /health/ready passes. An empty URL disables that backend.
+    backend_connect_timeout: float = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "2"))
+    backend_retry_initial_delay: float = float(os.getenv("BACKEND_RETRY_INITIAL_DELAY", "0.5"))
+    backend_retry_max_delay: float = float(os.getenv("BACKEND_RETRY_MAX_DELAY", "30"))
+    readiness_backends: str = os.getenv("READINESS_BACKENDS", "")
+    
+    # Result cache (in-process L1 in front of Redis L2)
+    result_cache_l1_size: int = int(os.getenv("RESULT_CACHE_L1_SIZE", "2048"))
+    result_cache_l1_ttl: int = int(os.getenv("RESULT_CACHE_L1_TTL", "300"))
+    result_cache_ttl: int = int(os.getenv("RESULT_CACHE_TTL", "3600"))
+    
+    # Cache-Control max-age (seconds) of the precomputed rule catalog responses
+    catalog_max_age: int = int(os.getenv("CATALOG_MAX_AGE", "300"))
+    
+    # Net income arithmetic: "decimal" (reference) or "fixed" (integer cents, opt-in); results are identical
+    calculation_arithmetic: str = os.getenv("CALCULATION_ARITHMETIC", "decimal")
+    
+    # Calculation pool: "thread", "process" or "inline"; workers 0 = one per CPU
+    calculation_pool: str = os.getenv("CALCULATION_POOL", "thread")
+    calculation_workers: int = int(os.getenv("CALCULATION_WORKERS", "0"))
+    calculation_queue_size: int = int(os.getenv("CALCULATION_QUEUE_SIZE", "64"))
+    
+    # Population run jobs (results are written in chunks under jobs_dir)
+    jobs_dir: str = os.getenv("JOBS_DIR", "data/jobs")
+    job_chunk_size: int = int(os.getenv("JOB_CHUNK_SIZE", "100000"))
+    job_max_households: int = int(os.getenv("JOB_MAX_HOUSEHOLDS", "50000000"))
+    job_concurrency: int = int(os.getenv("JOB_CONCURRENCY", "1"))
+    
+    # Batch endpoint: longest JSON array element (characters) before it is rejected unread
+    batch_max_item_size: int = int(os.getenv("BATCH_MAX_ITEM_SIZE", "65536"))
+    
+    # CSV ingestion: rows validated and calculated together
+    ingest_chunk_size: int = int(os.getenv("INGEST_CHUNK_SIZE", "5000"))
+    
+    # Calculation sessions (incremental re-evaluation): idle expiry in seconds and the
+    # most sessions kept (least recently used beyond that are evicted)
+    session_idle_timeout: float = float(os.getenv("SESSION_IDLE_TIMEOUT", "900"))
+    session_max_count: int = int(os.getenv("SESSION_MAX_COUNT", "10000"))
+    
+    # Live recalculation WebSocket: at most one push per tick (seconds); clients that
+    # do not read a push within the send timeout (seconds) are disconnected
+    live_tick_interval: float = float(os.getenv("LIVE_TICK_INTERVAL", "0.05"))
+    live_send_timeout: float = float(os.getenv("LIVE_SEND_TIMEOUT", "5"))
+    
+    # Prometheus metrics at /metrics and Server-Timing headers
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
     
     # CORS - define as string to prevent JSON parsing, parse in method
     cors_origins_str: str = "http://localhost:3000,http://localhost:8000"
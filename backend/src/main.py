@@ -1,25 +1,46 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import os
 from contextlib import asynccontextmanager
 
 from .config import settings
-from .api import scenarios, rules, calculations
-from .services.cache import init_cache
-from .services.database import init_db
+from .api import scenarios, rules, calculations, jobs
+from .services.cache import result_cache, get_redis_stats
+from .services.singleflight import get_coalescing_stats
+from .services.precomputed import catalog_responses
+from .services.sessions import session_store, live_channels
+from .services.executor import start_execution, stop_execution, get_execution_stats
+from .services.jobs import job_manager
+from .services.metrics import MetricsMiddleware, PROMETHEUS_CONTENT_TYPE, render_metrics
+from .services.backends import (
+    start_backends, stop_backends, mark_started, mark_stopping, readiness, liveness
+)
 from .rules_engine.loader import load_rules
+from .rules_engine.cliffs import precompute_cliff_analysis
 
 # Lifespan event handler for startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting Rules-as-Code Platform")
-    await init_db()
-    await init_cache()
+    # Database and Redis connect in the background; /health/ready reports their state
+    start_backends()
+    await start_execution()
+    resumed_jobs = await job_manager.start()
+    if resumed_jobs:
+        print(f"🔁 Resumed {resumed_jobs} unfinished population jobs")
     load_rules()
+    print(f"✅ Cliff analysis precomputed for {precompute_cliff_analysis()} household types")
+    print(f"✅ Catalog responses precomputed: {catalog_responses.precompute()}")
+    mark_started()
     yield
     # Shutdown
     print("🛑 Shutting down Rules-as-Code Platform")
+    mark_stopping()
+    await job_manager.stop()
+    await stop_execution()
+    await stop_backends()
 
 # Create FastAPI app
 app = FastAPI(
@@ -41,6 +62,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms and Server-Timing headers (outermost, so CORS is included)
+app.add_middleware(MetricsMiddleware)
+
 # Health check endpoint
 @app.get("/health")
 async def health():
@@ -51,10 +75,41 @@ async def health():
         "cors_origins": settings.get_cors_origins()
     }
 
+# Liveness: the process and its event loop respond
+@app.get("/health/live")
+async def health_live():
+    return liveness()
+
+# Readiness: startup finished and required backends connected (503 otherwise)
+@app.get("/health/ready")
+async def health_ready():
+    ready, report = readiness()
+    return JSONResponse(report, status_code=200 if ready else 503)
+
+# Cache, request-coalescing and execution counters
+@app.get("/stats")
+async def stats():
+    return {
+        "result_cache": result_cache.stats(),
+        "redis": get_redis_stats(),
+        "catalog_responses": catalog_responses.stats(),
+        "coalescing": get_coalescing_stats(),
+        "execution": get_execution_stats(),
+        "jobs": job_manager.stats(),
+        "sessions": session_store.stats(),
+        "live": live_channels.stats()
+    }
+
+# Prometheus metrics: per-rule timings, benefit outcomes, route latency, cache hits
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 # Include routers
 app.include_router(scenarios.router, prefix="/api/v1/scenarios", tags=["Scenarios"])
 app.include_router(rules.router, prefix="/api/v1/rules", tags=["Rules"])
 app.include_router(calculations.router, prefix="/api/v1/calculations", tags=["Calculations"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Jobs"])
 
 # Root endpoint
 @app.get("/")
@@ -15,6 +15,7 @@ class ScenarioRequest(BaseModel):
     housing_costs: Decimal = Field(0, description="Monthly housing costs")
     children_count: int = Field(0, description="Number of dependent children")
     marital_status: str = Field("single", description="single | married | partnership")
+    tax_year: int = Field(2025, description="Tax year whose parameter tables apply")
     parameters: Dict[str, Any] = Field(default_factory=dict)
 
 class ScenarioResponse(BaseModel):
@@ -3,10 +3,17 @@ Rules Engine - Dutch Pension, Tax & Benefits Calculations
 Implements transparent, traceable rule evaluation
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Iterable, Optional, Set, Tuple
 from decimal import Decimal, ROUND_HALF_UP
 from dataclasses import dataclass, field
-from datetime import datetime
+import time
+
+from .tracing import TraceBuffer, TraceView, RecordingContext, TRACE_FULL
+from .memo import LRUCache, canonical
+from .metrics import metrics, timed_rule
+from .parameters import (
+    TaxBracket, TaxYearParameters, DEFAULT_TAX_YEAR, get_parameters, parameters_fingerprint
+)
 
 @dataclass
 class RuleResult:
@@ -20,113 +27,412 @@ class RuleResult:
     dependencies: List[str] = field(default_factory=list)
     explanation: str = ""
 
+ARITHMETIC_DECIMAL = "decimal"
+ARITHMETIC_FIXED = "fixed"
+ARITHMETIC_MODES = (ARITHMETIC_DECIMAL, ARITHMETIC_FIXED)
+
+def net_income_calculator(arithmetic: str = ARITHMETIC_DECIMAL) -> Callable[..., Dict[str, Any]]:
+    """calculate_net_income or its integer fixed-point equivalent (identical results)"""
+    if arithmetic == ARITHMETIC_DECIMAL:
+        return calculate_net_income
+    if arithmetic == ARITHMETIC_FIXED:
+        from .fixed_point import calculate_net_income_fixed
+        return calculate_net_income_fixed
+    raise ValueError(f"Unknown arithmetic '{arithmetic}' (expected one of {ARITHMETIC_MODES})")
+
 class RulesEngine:
-    """Central rules evaluation engine"""
+    """
+    Central rules evaluation engine
+
+    Rule definitions hold a "calculate" callable and may declare:
+    - "dependencies": rule ids (or context inputs) evaluated first
+    - "inputs": the other context keys the rule reads ([] for none)
+    - "memoize": False to always re-run the rule
+
+    Only rules that declare "inputs" are memoized, keyed on the values of
+    their dependencies (a rule dependency by its RuleResult.value) and
+    inputs. Without that declaration the engine cannot know which context
+    keys a rule reads, so it is re-run on every evaluation.
+
+    arithmetic selects the net income implementation exposed as
+    self.calculate_net_income: the Decimal reference or the integer fixed-point path.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        trace_mode: str = TRACE_FULL,
+        trace_sample_rate: int = 1,
+        trace_capacity: int = 1024,
+        cache_size: int = 4096,
+        cache_ttl: Optional[float] = None,
+        arithmetic: str = ARITHMETIC_DECIMAL
+    ):
+        self.arithmetic = arithmetic
+        self.calculate_net_income = net_income_calculator(arithmetic)
         self.rules: Dict[str, Dict] = {}
-        self.evaluation_cache: Dict = {}
-        self.trace_log: List = []
+        self.parameters: Dict[str, Any] = {}
+        self.evaluation_cache = LRUCache(cache_size, cache_ttl)
+        self.trace = TraceBuffer(trace_mode, trace_sample_rate, trace_capacity)
+        self._execution_order: List[str] = []
+        self._external_inputs: Dict[str, List[str]] = {}
+        self._plans: Dict[str, List[str]] = {}
+        self._memo_reads: Dict[str, Optional[Tuple[str, ...]]] = {}  # Keys each rule's memoized results depend on, None if not memoized
+        self._dependents: Dict[str, Set[str]] = {}  # Dependency id -> registered rules that list it
+        self._compiled = True
+    
+    @property
+    def trace_log(self) -> TraceView:
+        """Read-only live view of the buffered trace entries as dicts (see self.trace to drain or reconfigure)"""
+        return TraceView(self.trace)
+    
+    def clear_trace(self) -> None:
+        """Discard all buffered trace entries"""
+        self.trace.clear()
         
-    def register_rule(self, rule_id: str, rule_definition: Dict) -> None:
-        """Register a new rule"""
-        self.rules[rule_id] = rule_definition
-    
-    def evaluate(self, rule_id: str, context: Dict[str, Any]) -> RuleResult:
-        """Evaluate a single rule with full trace"""
-        if rule_id not in self.rules:
-            raise ValueError(f"Rule {rule_id} not found")
+    @property
+    def execution_order(self) -> List[str]:
+        """Every registered rule, dependencies first"""
+        self._ensure_compiled()
+        return self._execution_order
         
-        rule = self.rules[rule_id]
+    def register_rule(self, rule_id: str, rule_definition: Dict) -> None:
+        """
+        Register a new rule; the execution plan is recompiled on the next evaluation.
+        Raises ValueError (and keeps the previous rules) if it introduces a cycle.
+        """
+        dependencies = rule_definition.get("dependencies", [])
+        cycle = self._cycle_through(rule_id, dependencies)
+        if cycle is not None:
+            raise ValueError(f"Circular rule dependency: {' -> '.join(cycle)}")
         
-        # Check dependencies
-        dependencies = rule.get("dependencies", [])
+        previous = self.rules.get(rule_id)
+        if previous is not None:
+            for dep in previous.get("dependencies", []):
+                self._dependents[dep].discard(rule_id)
         for dep in dependencies:
-            if dep not in context:
-                context[dep] = self.evaluate(dep, context)
+            self._dependents.setdefault(dep, set()).add(rule_id)
+        self.rules[rule_id] = rule_definition
+        self._compiled = False
+        self.evaluation_cache.invalidate(lambda key: key[0] == rule_id)
+    
+    def _cycle_through(self, rule_id: str, dependencies: List[str]) -> Optional[List[str]]:
+        """
+        The cycle rule_id would close with these dependencies, if any. The
+        registered rules are acyclic, so only rules that (transitively) depend
+        on rule_id are searched, and none when it depends on no registered rule.
+        """
+        wanted = set(dependencies)
+        if rule_id in wanted:
+            return [rule_id, rule_id]
+        if not any(dep in self.rules for dep in wanted):
+            return None
+        parent: Dict[str, Optional[str]] = {rule_id: None}
+        pending = [rule_id]
+        while pending:
+            node = pending.pop()
+            for dependent in self._dependents.get(node, ()):
+                if dependent in parent:
+                    continue
+                parent[dependent] = node
+                if dependent in wanted:
+                    cycle = [rule_id, dependent]
+                    while cycle[-1] != rule_id:
+                        cycle.append(parent[cycle[-1]])
+                    return cycle
+                pending.append(dependent)
+        return None
+    
+    def register_rules(self, rule_definitions: Dict[str, Dict]) -> None:
+        """
+        Register several rules at once, compiling the execution plan a single time.
+        Raises ValueError (and keeps the previous rules) if they introduce a cycle.
+        """
+        previous = dict(self.rules)
+        self.rules.update(rule_definitions)
+        try:
+            self.compile()
+        except ValueError:
+            self.rules = previous
+            self.compile()
+            raise
+        
+        changed = set(rule_definitions)
+        self.evaluation_cache.invalidate(lambda key: key[0] in changed)
+    
+    def register_parameters(self, parameters: Dict[str, Any]) -> None:
+        """
+        Replace the engine-wide parameter set. Parameters are visible to every
+        rule as context defaults; all memoized results are invalidated.
+        """
+        self.parameters = dict(parameters)
+        self.evaluation_cache.clear()
+    
+    def compile(self) -> None:
+        """
+        Topologically sort the registered rules into a flat execution plan.
+        Dependencies that are not registered rules are treated as context inputs.
+        """
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = on the current path, 2 = done
         
-        # Evaluate rule
-        result = rule["calculate"](context)
+        for root in self.rules:
+            if root in state:
+                continue
+            # Iterative DFS so deep rule chains don't hit the recursion limit
+            path = [root]
+            stack = [(root, iter(self.rules[root].get("dependencies", [])))]
+            state[root] = 1
+            while stack:
+                rule_id, deps = stack[-1]
+                for dep in deps:
+                    if dep not in self.rules:
+                        continue
+                    if state.get(dep) == 1:
+                        cycle = path[path.index(dep):] + [dep]
+                        raise ValueError(f"Circular rule dependency: {' -> '.join(cycle)}")
+                    if dep not in state:
+                        state[dep] = 1
+                        path.append(dep)
+                        stack.append((dep, iter(self.rules[dep].get("dependencies", []))))
+                        break
+                else:
+                    stack.pop()
+                    path.pop()
+                    state[rule_id] = 2
+                    order.append(rule_id)
         
-        trace_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "rule_id": rule_id,
-            "context": context,
-            "result": result
+        self._execution_order = order
+        self._external_inputs = {
+            rule_id: [dep for dep in rule.get("dependencies", []) if dep not in self.rules]
+            for rule_id, rule in self.rules.items()
         }
-        self.trace_log.append(trace_entry)
+        self._memo_reads = {
+            rule_id: tuple(dict.fromkeys([*rule.get("dependencies", []), *rule["inputs"]]))
+            if "inputs" in rule and rule.get("memoize", True) else None
+            for rule_id, rule in self.rules.items()
+        }
+        self._dependents = {}
+        for rule_id, rule in self.rules.items():
+            for dep in rule.get("dependencies", []):
+                self._dependents.setdefault(dep, set()).add(rule_id)
+        self._plans = {}
+        self._compiled = True
+    
+    def _ensure_compiled(self) -> None:
+        if not self._compiled:
+            self.compile()
+    
+    def _plan_for(self, rule_id: str) -> List[str]:
+        """Transitive dependencies of a rule in execution order (excluding the rule itself)"""
+        plan = self._plans.get(rule_id)
+        if plan is None:
+            needed = set()
+            pending = [rule_id]
+            while pending:
+                for dep in self.rules[pending.pop()].get("dependencies", []):
+                    if dep in self.rules and dep not in needed:
+                        needed.add(dep)
+                        pending.append(dep)
+            plan = [rid for rid in self._execution_order if rid in needed]
+            self._plans[rule_id] = plan
+        return plan
+    
+    def _new_scope(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluation scope: parameters overlaid by the caller context"""
+        return {**self.parameters, **context}
+    
+    def _execute(self, rule_id: str, scope: Dict[str, Any]) -> RuleResult:
+        """Run a single rule whose dependencies are already in scope"""
+        rule = self.rules[rule_id]
+        for dep in self._external_inputs[rule_id]:
+            if dep not in scope:
+                raise ValueError(f"Rule {dep} not found")
         
+        memo_key = None
+        memo_reads = self._memo_reads[rule_id]
+        if memo_reads is not None and self.evaluation_cache.maxsize > 0:
+            memo_key = (rule_id,) + tuple(_memo_value(scope.get(key)) for key in memo_reads)
+            found, result = self.evaluation_cache.lookup(memo_key)
+            if metrics.enabled:
+                metrics.cache_lookup("rule_evaluation", found)
+            if found:
+                return result
+        
+        calculate = rule["calculate"]
+        started = time.perf_counter()
+        try:
+            if not self.trace.should_trace():
+                result = calculate(scope)
+            else:
+                reads: Dict[str, Any] = {}
+                writes: Dict[str, Any] = {}
+                start = time.monotonic_ns()
+                result = calculate(RecordingContext(scope, reads, writes))
+                self.trace.record(rule_id, reads, result, start, time.monotonic_ns(), writes)
+        except Exception:
+            if metrics.enabled:
+                metrics.rule_error(rule_id)
+            raise
+        if metrics.enabled:
+            metrics.observe_rule(rule_id, time.perf_counter() - started)
+        
+        if memo_key is not None:
+            self.evaluation_cache.set(memo_key, result)
         return result
     
+    def evaluate(self, rule_id: str, context: Dict[str, Any]) -> RuleResult:
+        """
+        Evaluate a single rule with full trace.
+        Dependencies already present in the context are used as given.
+        """
+        if rule_id not in self.rules:
+            raise ValueError(f"Rule {rule_id} not found")
+        
+        self._ensure_compiled()
+        scope = self._new_scope(context)
+        for dep in self._plan_for(rule_id):
+            if dep not in scope:
+                scope[dep] = self._execute(dep, scope)
+        
+        return self._execute(rule_id, scope)
+    
     def evaluate_all(self, context: Dict[str, Any]) -> Dict[str, RuleResult]:
-        """Evaluate all applicable rules"""
+        """Evaluate all applicable rules, each exactly once"""
+        self._ensure_compiled()
+        scope = self._new_scope(context)
         results = {}
-        for rule_id in self.rules.keys():
+        failed = set()
+        for rule_id in self.execution_order:
+            deps = self.rules[rule_id].get("dependencies", [])
+            if any(dep in failed and dep not in context for dep in deps):
+                results[rule_id] = None
+                failed.add(rule_id)
+                continue
             try:
-                results[rule_id] = self.evaluate(rule_id, context)
+                results[rule_id] = self._execute(rule_id, scope)
             except Exception as e:
                 results[rule_id] = None
-        return results
+                failed.add(rule_id)
+                continue
+            if rule_id not in context:
+                scope[rule_id] = results[rule_id]
+        return {rule_id: results[rule_id] for rule_id in self.rules}
+
 
+def _memo_value(value: Any) -> Any:
+    """Memo key part for one value a rule reads; rule results count by their value only"""
+    if isinstance(value, RuleResult):
+        value = value.value
+    return canonical(value)
 
-# ============ TAX CALCULATIONS (2025) ============
+
+# Bump whenever the rule logic changes; parameter changes are covered by their fingerprint
+RULESET_VERSION = "2025.1"
+
+def ruleset_version() -> str:
+    """Rule logic version plus the fingerprint of all loaded parameter tables"""
+    return f"{RULESET_VERSION}+{parameters_fingerprint()}"
+
+
+# ============ PARAMETERS (2025 defaults) ============
+
+# Parameters are loaded per tax year from rules_engine/data; the module-level
+# constants below are the 2025 values, kept for existing imports.
+_PARAMETERS_2025 = get_parameters(2025)
 
 TAX_BRACKETS_2025 = [
-    {"min": Decimal(0), "max": Decimal(36950), "rate": Decimal("0.1155")},
-    {"min": Decimal(36950), "max": Decimal(71900), "rate": Decimal("0.2385")},
-    {"min": Decimal(71900), "max": Decimal(96750), "rate": Decimal("0.405")},
-    {"min": Decimal(96750), "max": None, "rate": Decimal("0.495")},
+    {"min": bracket.min, "max": bracket.max, "rate": bracket.rate}
+    for bracket in _PARAMETERS_2025.brackets
 ]
 
-GENERAL_TAX_ALLOWANCE = Decimal("3107")  # 2025
-LABOUR_TAX_ALLOWANCE = Decimal("1800")   # 2025
-ELDERLY_TAX_ALLOWANCE = Decimal("1732")  # 2025
+GENERAL_TAX_ALLOWANCE = _PARAMETERS_2025.general_tax_allowance
+LABOUR_TAX_ALLOWANCE = _PARAMETERS_2025.labour_tax_allowance
+ELDERLY_TAX_ALLOWANCE = _PARAMETERS_2025.elderly_tax_allowance
 
-def calculate_income_tax_2025(gross_income: Decimal) -> Tuple[Decimal, List[Dict]]:
+AOW_PREMIUM_RATE = _PARAMETERS_2025.aow_premium_rate
+WW_PREMIUM_RATE = _PARAMETERS_2025.ww_premium_rate
+EMPLOYEE_INSURANCE_RATE = Decimal("0.0") # Paid by employer in NL
+
+HUURTOESLAG_INCOME_THRESHOLDS = dict(_PARAMETERS_2025.huurtoeslag_income_thresholds)
+HUURTOESLAG_MAX_HOUSING_COSTS = dict(_PARAMETERS_2025.huurtoeslag_max_housing_costs)  # Monthly
+HUURTOESLAG_COST_SHARE = _PARAMETERS_2025.huurtoeslag_cost_share
+
+ZORGTOESLAG_INCOME_THRESHOLDS = dict(_PARAMETERS_2025.zorgtoeslag_income_thresholds)
+ZORGTOESLAG_BASE_SUBSIDY = dict(_PARAMETERS_2025.zorgtoeslag_base_subsidy)
+ZORGTOESLAG_INCOME_FLOOR = _PARAMETERS_2025.zorgtoeslag_income_floor
+ZORGTOESLAG_REDUCTION_RATE = _PARAMETERS_2025.zorgtoeslag_reduction_rate
+
+KINDGEBONDEN_INCOME_THRESHOLD = _PARAMETERS_2025.kindgebonden_income_threshold
+KINDGEBONDEN_BUDGET_PER_CHILD = _PARAMETERS_2025.kindgebonden_budget_per_child  # Per child per year
+KINDGEBONDEN_SUPPLEMENT_INCOME_LIMIT = _PARAMETERS_2025.kindgebonden_supplement_income_limit
+KINDGEBONDEN_SUPPLEMENT_RATE = _PARAMETERS_2025.kindgebonden_supplement_rate
+
+
+def _granted(result: Tuple[Decimal, List[Dict]]) -> bool:
+    """Benefit outcome for metrics: any entitlement at all"""
+    return result[0] > 0
+
+
+# ============ TAX CALCULATIONS ============
+
+def _bracket_detail(bracket: TaxBracket, taxable_amount: Decimal, tax: Decimal) -> Dict:
+    return {
+        "bracket_min": float(bracket.min),
+        "bracket_max": float(bracket.max) if bracket.max else None,
+        "rate": float(bracket.rate),
+        "taxable_amount": float(taxable_amount),
+        "tax": float(tax)
+    }
+
+@timed_rule("income_tax")
+def calculate_income_tax(
+    gross_income: Decimal,
+    params: Optional[TaxYearParameters] = None,
+    with_details: bool = True
+) -> Tuple[Decimal, List[Dict]]:
     """
-    Calculate Dutch income tax for 2025 with bracket details
-    Returns (total_tax, bracket_details)
+    Calculate Dutch income tax for a tax year with bracket details
+    Returns (total_tax, bracket_details); details are [] when with_details is False
     
-    Reference: Belastingdienst - Inkomstenbelasting 2025
+    The bracket is found by bisection; the tax of all lower brackets is
+    precomputed at load time, so only the top bracket is multiplied here.
+    
+    Reference: Belastingdienst - Inkomstenbelasting
     """
+    params = params or _PARAMETERS_2025
+    
     # Apply tax allowances
-    taxable_income = max(Decimal(0), gross_income - GENERAL_TAX_ALLOWANCE - LABOUR_TAX_ALLOWANCE)
+    taxable_income = max(Decimal(0), gross_income - params.total_tax_allowance)
     
-    total_tax = Decimal(0)
-    bracket_details = []
+    index = params.bracket_index(taxable_income)
+    if index < 0:
+        return Decimal(0), []
     
-    for bracket in TAX_BRACKETS_2025:
-        bracket_min = bracket["min"]
-        bracket_max = bracket["max"]
-        rate = bracket["rate"]
-        
-        if taxable_income <= bracket_min:
-            break
-        
-        if bracket_max is None:
-            taxable_in_bracket = max(Decimal(0), taxable_income - bracket_min)
-        else:
-            taxable_in_bracket = min(bracket_max, taxable_income) - bracket_min
-        
-        tax_in_bracket = (taxable_in_bracket * rate).quantize(Decimal("0.01"), ROUND_HALF_UP)
-        total_tax += tax_in_bracket
-        
-        bracket_details.append({
-            "bracket_min": float(bracket_min),
-            "bracket_max": float(bracket_max) if bracket_max else None,
-            "rate": float(rate),
-            "taxable_amount": float(taxable_in_bracket),
-            "tax": float(tax_in_bracket)
-        })
+    top = params.brackets[index]
+    taxable_in_top = taxable_income - top.min
+    tax_in_top = (taxable_in_top * top.rate).quantize(Decimal("0.01"), ROUND_HALF_UP)
+    if not with_details:
+        return top.base_tax + tax_in_top, []
+    
+    bracket_details = [
+        _bracket_detail(bracket, bracket.max - bracket.min, bracket.full_tax)
+        for bracket in params.brackets[:index]
+    ]
+    bracket_details.append(_bracket_detail(top, taxable_in_top, tax_in_top))
     
-    return total_tax, bracket_details
+    return top.base_tax + tax_in_top, bracket_details
 
+def calculate_income_tax_2025(gross_income: Decimal) -> Tuple[Decimal, List[Dict]]:
+    """
+    Calculate Dutch income tax for 2025 with bracket details
+    Returns (total_tax, bracket_details)
+    
+    Reference: Belastingdienst - Inkomstenbelasting 2025
+    """
+    return calculate_income_tax(gross_income, _PARAMETERS_2025)
 
-# ============ PENSION CALCULATIONS ============
 
-AOW_PREMIUM_RATE = Decimal("0.1955")  # 2025
-WW_PREMIUM_RATE = Decimal("0.022")   # 2025
-EMPLOYEE_INSURANCE_RATE = Decimal("0.0") # Paid by employer in NL
+# ============ PENSION CALCULATIONS ============
 
 def calculate_pension_contribution(gross_income: Decimal, contribution_percentage: float) -> Decimal:
     """
@@ -138,54 +444,52 @@ def calculate_pension_contribution(gross_income: Decimal, contribution_percentag
         Decimal("0.01"), ROUND_HALF_UP
     )
 
-def calculate_aow_premium(gross_income: Decimal) -> Decimal:
+def calculate_aow_premium(gross_income: Decimal, params: Optional[TaxYearParameters] = None) -> Decimal:
     """
     Calculate AOW (state pension) premium
     
     Reference: Algemene Ouderdomswet (AOW)
     """
-    return (gross_income * AOW_PREMIUM_RATE).quantize(Decimal("0.01"), ROUND_HALF_UP)
+    params = params or _PARAMETERS_2025
+    return (gross_income * params.aow_premium_rate).quantize(Decimal("0.01"), ROUND_HALF_UP)
 
-def calculate_ww_premium(gross_income: Decimal) -> Decimal:
+def calculate_ww_premium(gross_income: Decimal, params: Optional[TaxYearParameters] = None) -> Decimal:
     """
     Calculate WW (unemployment) premium
     
     Reference: Werkloosheidswet (WW)
     """
-    return (gross_income * WW_PREMIUM_RATE).quantize(Decimal("0.01"), ROUND_HALF_UP)
+    params = params or _PARAMETERS_2025
+    return (gross_income * params.ww_premium_rate).quantize(Decimal("0.01"), ROUND_HALF_UP)
 
 
 # ============ BENEFITS CALCULATIONS ============
 
+@timed_rule("huurtoeslag", granted=_granted)
 def calculate_huurtoeslag(
     gross_income: Decimal,
     household_members: int,
-    housing_costs: Decimal
+    housing_costs: Decimal,
+    params: Optional[TaxYearParameters] = None
 ) -> Tuple[Decimal, List[Dict]]:
     """
-    Calculate housing allowance (Huurtoeslag) 2025
+    Calculate housing allowance (Huurtoeslag)
     
     Reference: Wet op de huurtoeslag 2014
     https://www.toeslagen.nl/huurtoeslag
     
     Returns: (allowance_amount, calculation_steps)
     """
+    params = params or _PARAMETERS_2025
     steps = []
     
-    # Income threshold for housing allowance eligibility
-    income_thresholds_single = Decimal("25000")
-    income_thresholds_couple = Decimal("35000")
-    
-    threshold = income_thresholds_couple if household_members >= 2 else income_thresholds_single
+    household_type = "couple" if household_members >= 2 else "single"
+    threshold = params.huurtoeslag_income_thresholds[household_type]
     
     if gross_income > threshold:
         return Decimal(0), [{"type": "rejected", "reason": "income_exceeds_threshold"}]
     
-    # Housing costs limits (2025)
-    max_housing_costs_single = Decimal("500")
-    max_housing_costs_couple = Decimal("600")
-    
-    max_costs = max_housing_costs_couple if household_members >= 2 else max_housing_costs_single
+    max_costs = params.huurtoeslag_max_housing_costs[household_type]
     
     if housing_costs > max_costs * 12:  # Annual
         eligible_costs = max_costs * 12
@@ -195,7 +499,7 @@ def calculate_huurtoeslag(
     # Calculation: percentage of costs based on income
     # Simplified model - actual calculation is more complex
     income_factor = (threshold - gross_income) / threshold
-    allowance = (eligible_costs * income_factor * Decimal("0.65")).quantize(
+    allowance = (eligible_costs * income_factor * params.huurtoeslag_cost_share).quantize(
         Decimal("0.01"), ROUND_HALF_UP
     )
     
@@ -211,38 +515,35 @@ def calculate_huurtoeslag(
     return allowance, steps
 
 
+@timed_rule("zorgtoeslag", granted=_granted)
 def calculate_zorgtoeslag(
     gross_income: Decimal,
     household_members: int,
-    is_partner: bool = False
+    is_partner: bool = False,
+    params: Optional[TaxYearParameters] = None
 ) -> Tuple[Decimal, List[Dict]]:
     """
-    Calculate healthcare subsidy (Zorgtoeslag) 2025
+    Calculate healthcare subsidy (Zorgtoeslag)
     
     Reference: Zorgverzekeringswet
     https://www.toeslagen.nl/zorgtoeslag
     """
+    params = params or _PARAMETERS_2025
     steps = []
     
-    # Income thresholds 2025
-    thresholds = {
-        "single": Decimal("23200"),
-        "partner": Decimal("31400"),
-        "couple": Decimal("47300")
-    }
-    
-    threshold = thresholds["partner"] if is_partner else thresholds["single"]
+    household_type = "partner" if is_partner else "single"
+    threshold = params.zorgtoeslag_income_thresholds[household_type]
     
     if gross_income > threshold:
         return Decimal(0), [{"type": "rejected", "reason": "income_exceeds_threshold"}]
     
     # Subsidy calculation (simplified)
     # Actual: complex tables based on age, income, family composition
-    base_subsidy = Decimal("2200") if not is_partner else Decimal("1100")
+    base_subsidy = params.zorgtoeslag_base_subsidy[household_type]
     
     # Reduce by 16% of income above minimum
-    excess_income = max(Decimal(0), gross_income - Decimal("15000"))
-    reduction = (excess_income * Decimal("0.16")).quantize(Decimal("0.01"), ROUND_HALF_UP)
+    excess_income = max(Decimal(0), gross_income - params.zorgtoeslag_income_floor)
+    reduction = (excess_income * params.zorgtoeslag_reduction_rate).quantize(Decimal("0.01"), ROUND_HALF_UP)
     
     subsidy = max(Decimal(0), base_subsidy - reduction)
     
@@ -258,33 +559,32 @@ def calculate_zorgtoeslag(
     return subsidy, steps
 
 
+@timed_rule("kindgebonden_budget", granted=_granted)
 def calculate_kindgebonden_budget(
     children_count: int,
-    gross_income: Decimal
+    gross_income: Decimal,
+    params: Optional[TaxYearParameters] = None
 ) -> Tuple[Decimal, List[Dict]]:
     """
-    Calculate child benefits (Kindgebonden budget) 2025
+    Calculate child benefits (Kindgebonden budget)
     
     Reference: Wet op het kindgebonden budget
     """
+    params = params or _PARAMETERS_2025
     steps = []
     
     if children_count == 0:
         return Decimal(0), steps
     
-    # Income threshold
-    income_threshold = Decimal("115000")
-    
-    if gross_income > income_threshold:
+    if gross_income > params.kindgebonden_income_threshold:
         return Decimal(0), [{"type": "rejected", "reason": "income_exceeds_threshold"}]
     
-    # Budget per child per year (2025)
-    budget_per_child = Decimal("220")
+    budget_per_child = params.kindgebonden_budget_per_child
     total_budget = Decimal(children_count) * budget_per_child
     
     # Additional benefit for lower incomes
-    if gross_income < Decimal("50000"):
-        supplementary = total_budget * Decimal("0.2")
+    if gross_income < params.kindgebonden_supplement_income_limit:
+        supplementary = total_budget * params.kindgebonden_supplement_rate
         total_budget += supplementary
     
     monthly_benefit = (total_budget / Decimal(12)).quantize(Decimal("0.01"), ROUND_HALF_UP)
@@ -302,28 +602,338 @@ def calculate_kindgebonden_budget(
 
 # ============ LUMP SUM RECOMMENDATION ENGINE ============
 
+LUMP_SUM_RECOMMENDATIONS = {
+    "none": "No lump sum withdrawal selected",
+    "high": "⚠️ HIGH TAX IMPACT: Effective tax rate exceeds 35%. Consider if the lump sum is necessary.",
+    "moderate": "📊 MODERATE TAX IMPACT: This will increase your taxes significantly. Evaluate if benefits outweigh costs.",
+    "lower": "✅ LOWER TAX IMPACT: Manageable tax burden for this withdrawal amount.",
+    "untaxed": "Consider comparing scenarios to see the full impact"
+}
+
 def _get_lump_sum_recommendation(lump_sum_pct: float, income_tax: Decimal, taxable_income: Decimal) -> str:
     """
     Provide recommendation on whether lump sum withdrawal is advisable
     """
     if lump_sum_pct == 0:
-        return "No lump sum withdrawal selected"
+        return LUMP_SUM_RECOMMENDATIONS["none"]
     
     # Tax impact analysis
     if income_tax > 0:
         effective_rate = (income_tax / taxable_income * 100) if taxable_income > 0 else 0
         if effective_rate > 35:
-            return "⚠️ HIGH TAX IMPACT: Effective tax rate exceeds 35%. Consider if the lump sum is necessary."
+            return LUMP_SUM_RECOMMENDATIONS["high"]
         elif effective_rate > 25:
-            return "📊 MODERATE TAX IMPACT: This will increase your taxes significantly. Evaluate if benefits outweigh costs."
+            return LUMP_SUM_RECOMMENDATIONS["moderate"]
         else:
-            return "✅ LOWER TAX IMPACT: Manageable tax burden for this withdrawal amount."
+            return LUMP_SUM_RECOMMENDATIONS["lower"]
     
-    return "Consider comparing scenarios to see the full impact"
+    return LUMP_SUM_RECOMMENDATIONS["untaxed"]
 
 
 # ============ NET INCOME CALCULATION ============
 
+class _lazy:
+    """Computed-once attribute (functools.cached_property without its per-access lock)"""
+
+    def __init__(self, function: Callable):
+        self.function = function
+        self.name = function.__name__
+        self.__doc__ = function.__doc__
+
+    def __get__(self, instance: Any, owner: type = None) -> Any:
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.function(instance)
+        return value
+
+_LUMP_SUM_BENEFIT_IMPACT = "May reduce housing allowance and healthcare allowance due to higher income"
+
+class NetIncomeResult:
+    """
+    Lazily evaluated net income calculation
+
+    Every intermediate amount is computed on first use and at most once;
+    to_dict() materializes only the requested fields. Trace fields (the
+    per-bracket tax details and the benefit calculation steps) are only
+    built when asked for.
+    """
+
+    FIELDS = (
+        "tax_year", "gross_income", "lump_sum_percentage", "lump_sum_amount",
+        "pension_contribution_pct", "pension_amount", "taxable_income",
+        "taxable_income_before_lump_sum", "taxable_income_with_lump_sum", "income_tax",
+        "tax_brackets", "aow_premium", "ww_premium", "total_deductions", "huurtoeslag",
+        "zorgtoeslag", "kindgebonden_budget", "total_benefits", "net_income",
+        "effective_tax_rate", "lump_sum_impact", "breakdown"
+    )
+    TRACE_FIELDS = ("tax_brackets", "benefit_steps")
+    OPTIONAL_FIELDS = ("benefit_steps",)  # Only materialized when named in fields
+
+    def __init__(
+        self,
+        gross_income: Decimal,
+        pension_contribution_pct: float,
+        housing_costs: Decimal,
+        household_members: int,
+        children_count: int,
+        is_partner: bool = False,
+        lump_sum_percentage: float = 0,
+        tax_year: int = DEFAULT_TAX_YEAR
+    ):
+        self.params = get_parameters(tax_year)
+        self.gross = gross_income
+        self.pension_contribution_pct = pension_contribution_pct
+        self.housing_costs = housing_costs
+        self.household_members = household_members
+        self.children_count = children_count
+        self.is_partner = is_partner
+        self.lump_sum_percentage = lump_sum_percentage
+        self._tax_details_wanted = False  # Compute the tax once, with details, when they will be shown
+
+    # ============ INTERMEDIATE AMOUNTS ============
+
+    @_lazy
+    def pension(self) -> Decimal:
+        return calculate_pension_contribution(self.gross, self.pension_contribution_pct)
+
+    @_lazy
+    def lump_sum(self) -> Decimal:
+        annual_pension = self.gross * Decimal(str(self.pension_contribution_pct)) / Decimal(100)
+        return annual_pension * Decimal(str(self.lump_sum_percentage)) / Decimal(10)  # Divided by 10 since max is 10%
+
+    @_lazy
+    def taxable(self) -> Decimal:
+        """Taxable income - lump sum is added in the withdrawal year"""
+        return self.gross - self.pension + self.lump_sum
+
+    @_lazy
+    def income_tax(self) -> Decimal:
+        if self._tax_details_wanted or "_tax_with_brackets" in self.__dict__:
+            return self._tax_with_brackets[0]
+        return calculate_income_tax(self.taxable, self.params, with_details=False)[0]
+
+    @_lazy
+    def _tax_with_brackets(self) -> Tuple[Decimal, List[Dict]]:
+        return calculate_income_tax(self.taxable, self.params)
+
+    @_lazy
+    def tax_brackets(self) -> List[Dict]:
+        return self._tax_with_brackets[1]
+
+    @_lazy
+    def tax_without_lump_sum(self) -> Decimal:
+        if not self.lump_sum:
+            return self.income_tax
+        return calculate_income_tax(self.gross - self.pension, self.params, with_details=False)[0]
+
+    @_lazy
+    def aow_premium(self) -> Decimal:
+        return calculate_aow_premium(self.taxable, self.params)
+
+    @_lazy
+    def ww_premium(self) -> Decimal:
+        return calculate_ww_premium(self.taxable, self.params)
+
+    @_lazy
+    def _huurtoeslag(self) -> Tuple[Decimal, List[Dict]]:
+        return calculate_huurtoeslag(self.taxable, self.household_members, self.housing_costs * 12, self.params)
+
+    @_lazy
+    def _zorgtoeslag(self) -> Tuple[Decimal, List[Dict]]:
+        return calculate_zorgtoeslag(self.taxable, self.household_members, self.is_partner, self.params)
+
+    @_lazy
+    def _kindgebonden_budget(self) -> Tuple[Decimal, List[Dict]]:
+        return calculate_kindgebonden_budget(self.children_count, self.taxable, self.params)
+
+    @_lazy
+    def total_deductions(self) -> Decimal:
+        return self.pension + self.income_tax + self.aow_premium + self.ww_premium
+
+    @_lazy
+    def total_benefits(self) -> Decimal:
+        return self._huurtoeslag[0] + self._zorgtoeslag[0] + self._kindgebonden_budget[0]
+
+    @_lazy
+    def net_income(self) -> Decimal:
+        after_social = self.gross - self.pension - self.income_tax - self.aow_premium - self.ww_premium
+        return after_social + self.total_benefits
+
+    # ============ FIELDS ============
+
+    def field(self, name: str) -> Any:
+        """JSON-ready value of one result field"""
+        getter = _RESULT_FIELD_GETTERS.get(name)
+        if getter is None:
+            raise ValueError(f"Unknown result field '{name}'")
+        return getter(self)
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None, include_trace: bool = True) -> Dict[str, Any]:
+        """
+        Materialize fields (all standard fields by default), in result order;
+        include_trace=False leaves out the trace fields
+        """
+        names = self.field_names(fields, include_trace)
+        self._tax_details_wanted = "tax_brackets" in names
+        return {name: _RESULT_FIELD_GETTERS[name](self) for name in names}
+
+    @classmethod
+    def field_names(cls, fields: Optional[Iterable[str]] = None, include_trace: bool = True) -> List[str]:
+        """Names to_dict materializes for these options, in result order; raises on unknown names"""
+        if fields is None:
+            names = list(cls.FIELDS)
+        else:
+            requested = set(fields)
+            unknown = requested.difference(cls.FIELDS, cls.OPTIONAL_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown result field(s): {', '.join(sorted(unknown))}")
+            names = [name for name in cls.FIELDS + cls.OPTIONAL_FIELDS if name in requested]
+        if not include_trace:
+            names = [name for name in names if name not in cls.TRACE_FIELDS]
+        return names
+
+    def _field_tax_year(self) -> int:
+        return self.params.year
+
+    def _field_gross_income(self) -> float:
+        return float(self.gross)
+
+    def _field_lump_sum_percentage(self) -> float:
+        return self.lump_sum_percentage
+
+    def _field_lump_sum_amount(self) -> float:
+        return float(self.lump_sum)
+
+    def _field_pension_contribution_pct(self) -> float:
+        return self.pension_contribution_pct
+
+    def _field_pension_amount(self) -> float:
+        return float(self.pension)
+
+    def _field_taxable_income(self) -> float:
+        return float(self.gross - self.pension)
+
+    _field_taxable_income_before_lump_sum = _field_taxable_income
+
+    def _field_taxable_income_with_lump_sum(self) -> float:
+        return float(self.taxable)
+
+    def _field_income_tax(self) -> float:
+        return float(self.income_tax)
+
+    def _field_tax_brackets(self) -> List[Dict]:
+        return self.tax_brackets
+
+    def _field_aow_premium(self) -> float:
+        return float(self.aow_premium)
+
+    def _field_ww_premium(self) -> float:
+        return float(self.ww_premium)
+
+    def _field_total_deductions(self) -> float:
+        return float(self.total_deductions)
+
+    def _field_huurtoeslag(self) -> float:
+        return float(self._huurtoeslag[0])
+
+    def _field_zorgtoeslag(self) -> float:
+        return float(self._zorgtoeslag[0])
+
+    def _field_kindgebonden_budget(self) -> float:
+        return float(self._kindgebonden_budget[0])
+
+    def _field_total_benefits(self) -> float:
+        return float(self.total_benefits)
+
+    def _field_net_income(self) -> float:
+        return float(self.net_income)
+
+    def _field_effective_tax_rate(self) -> float:
+        return float((self.income_tax / self.taxable * 100)) if self.taxable > 0 else 0.0
+
+    def _field_lump_sum_impact(self) -> Dict[str, Any]:
+        return {
+            "tax_increase": float(self.income_tax - self.tax_without_lump_sum),
+            "benefit_impact": _LUMP_SUM_BENEFIT_IMPACT,
+            "recommendation": _get_lump_sum_recommendation(self.lump_sum_percentage, self.income_tax, self.taxable)
+        }
+
+    def _field_breakdown(self) -> Dict[str, float]:
+        return {
+            "gross_income": float(self.gross),
+            "lump_sum_addition": float(self.lump_sum),
+            "minus_pension": float(self.pension),
+            "minus_tax": float(self.income_tax),
+            "minus_aow": float(self.aow_premium),
+            "minus_ww": float(self.ww_premium),
+            "plus_benefits": float(self.total_benefits),
+            "equals_net": float(self.net_income)
+        }
+
+    def _field_benefit_steps(self) -> Dict[str, List[Dict]]:
+        return {
+            "huurtoeslag": self._huurtoeslag[1],
+            "zorgtoeslag": self._zorgtoeslag[1],
+            "kindgebonden_budget": self._kindgebonden_budget[1]
+        }
+
+_RESULT_FIELD_GETTERS: Dict[str, Callable[[NetIncomeResult], Any]] = {
+    name: getattr(NetIncomeResult, f"_field_{name}")
+    for name in NetIncomeResult.FIELDS + NetIncomeResult.OPTIONAL_FIELDS
+}
+
+# What each lazily computed amount and each result field ("field:<name>") of
+# NetIncomeResult reads: constructor inputs, "params" (the tax year's parameter
+# tables) or other amounts. Lets sessions recompute only what an input change affects.
+NET_INCOME_INPUTS = (
+    "gross_income", "pension_contribution_pct", "housing_costs", "household_members",
+    "children_count", "is_partner", "lump_sum_percentage", "tax_year"
+)
+NET_INCOME_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "params": ("tax_year",),
+    "pension": ("gross_income", "pension_contribution_pct"),
+    "lump_sum": ("gross_income", "pension_contribution_pct", "lump_sum_percentage"),
+    "taxable": ("gross_income", "pension", "lump_sum"),
+    "_tax_with_brackets": ("taxable", "params"),
+    "income_tax": ("taxable", "params", "_tax_with_brackets"),
+    "tax_brackets": ("_tax_with_brackets",),
+    "tax_without_lump_sum": ("gross_income", "pension", "lump_sum", "income_tax", "params"),
+    "aow_premium": ("taxable", "params"),
+    "ww_premium": ("taxable", "params"),
+    "_huurtoeslag": ("taxable", "household_members", "housing_costs", "params"),
+    "_zorgtoeslag": ("taxable", "household_members", "is_partner", "params"),
+    "_kindgebonden_budget": ("children_count", "taxable", "params"),
+    "total_deductions": ("pension", "income_tax", "aow_premium", "ww_premium"),
+    "total_benefits": ("_huurtoeslag", "_zorgtoeslag", "_kindgebonden_budget"),
+    "net_income": ("gross_income", "pension", "income_tax", "aow_premium", "ww_premium", "total_benefits"),
+    "field:tax_year": ("params",),
+    "field:gross_income": ("gross_income",),
+    "field:lump_sum_percentage": ("lump_sum_percentage",),
+    "field:lump_sum_amount": ("lump_sum",),
+    "field:pension_contribution_pct": ("pension_contribution_pct",),
+    "field:pension_amount": ("pension",),
+    "field:taxable_income": ("gross_income", "pension"),
+    "field:taxable_income_before_lump_sum": ("gross_income", "pension"),
+    "field:taxable_income_with_lump_sum": ("taxable",),
+    "field:income_tax": ("income_tax",),
+    "field:tax_brackets": ("tax_brackets",),
+    "field:aow_premium": ("aow_premium",),
+    "field:ww_premium": ("ww_premium",),
+    "field:total_deductions": ("total_deductions",),
+    "field:huurtoeslag": ("_huurtoeslag",),
+    "field:zorgtoeslag": ("_zorgtoeslag",),
+    "field:kindgebonden_budget": ("_kindgebonden_budget",),
+    "field:total_benefits": ("total_benefits",),
+    "field:net_income": ("net_income",),
+    "field:effective_tax_rate": ("income_tax", "taxable"),
+    "field:lump_sum_impact": ("income_tax", "tax_without_lump_sum", "lump_sum_percentage", "taxable"),
+    "field:breakdown": (
+        "gross_income", "lump_sum", "pension", "income_tax", "aow_premium", "ww_premium", "total_benefits", "net_income"
+    ),
+    "field:benefit_steps": ("_huurtoeslag", "_zorgtoeslag", "_kindgebonden_budget"),
+}
+
+@timed_rule("net_income")
 def calculate_net_income(
     gross_income: Decimal,
     pension_contribution_pct: float,
@@ -331,80 +941,14 @@ def calculate_net_income(
     household_members: int,
     children_count: int,
     is_partner: bool = False,
-    lump_sum_percentage: float = 0
+    lump_sum_percentage: float = 0,
+    tax_year: int = DEFAULT_TAX_YEAR
 ) -> Dict[str, Any]:
     """
     Complete net income calculation with all deductions and benefits
     Includes lump sum withdrawal at retirement (taxable event)
     """
-    
-    # Calculate lump sum amount (if applicable)
-    annual_pension = gross_income * Decimal(str(pension_contribution_pct)) / Decimal(100)
-    lump_sum_amount = annual_pension * Decimal(str(lump_sum_percentage)) / Decimal(10)  # Divided by 10 since max is 10%
-    
-    # Tax calculation - lump sum is added to taxable income in withdrawal year
-    taxable_income = gross_income - calculate_pension_contribution(gross_income, pension_contribution_pct) + lump_sum_amount
-    income_tax, tax_brackets = calculate_income_tax_2025(taxable_income)
-    
-    # Pension contribution
-    pension_amount = calculate_pension_contribution(gross_income, pension_contribution_pct)
-    
-    # Social security
-    aow_premium = calculate_aow_premium(taxable_income)
-    ww_premium = calculate_ww_premium(taxable_income)
-    
-    # Benefits
-    huurtoeslag, huurtoeslag_steps = calculate_huurtoeslag(
-        taxable_income, household_members, housing_costs * 12
-    )
-    zorgtoeslag, zorgtoeslag_steps = calculate_zorgtoeslag(
-        taxable_income, household_members, is_partner
-    )
-    kindgebonden_budget, kindgebonden_steps = calculate_kindgebonden_budget(
-        children_count, taxable_income
-    )
-    
-    # Final calculation
-    gross_after_pension = gross_income - pension_amount
-    after_tax = gross_after_pension - income_tax
-    after_social = after_tax - aow_premium - ww_premium
-    
-    total_benefits = huurtoeslag + zorgtoeslag + kindgebonden_budget
-    net_income = after_social + total_benefits
-    
-    return {
-        "gross_income": float(gross_income),
-        "lump_sum_percentage": lump_sum_percentage,
-        "lump_sum_amount": float(lump_sum_amount),
-        "pension_contribution_pct": pension_contribution_pct,
-        "pension_amount": float(pension_amount),
-        "taxable_income": float(gross_income - pension_amount),
-        "taxable_income_before_lump_sum": float(gross_income - pension_amount),
-        "taxable_income_with_lump_sum": float(taxable_income),
-        "income_tax": float(income_tax),
-        "tax_brackets": tax_brackets,
-        "aow_premium": float(aow_premium),
-        "ww_premium": float(ww_premium),
-        "total_deductions": float(pension_amount + income_tax + aow_premium + ww_premium),
-        "huurtoeslag": float(huurtoeslag),
-        "zorgtoeslag": float(zorgtoeslag),
-        "kindgebonden_budget": float(kindgebonden_budget),
-        "total_benefits": float(total_benefits),
-        "net_income": float(net_income),
-        "effective_tax_rate": float((income_tax / taxable_income * 100)) if taxable_income > 0 else 0.0,
-        "lump_sum_impact": {
-            "tax_increase": float(income_tax - calculate_income_tax_2025(gross_income - calculate_pension_contribution(gross_income, pension_contribution_pct))[0]),
-            "benefit_impact": "May reduce housing allowance and healthcare allowance due to higher income",
-            "recommendation": _get_lump_sum_recommendation(lump_sum_percentage, income_tax, taxable_income)
-        },
-        "breakdown": {
-            "gross_income": float(gross_income),
-            "lump_sum_addition": float(lump_sum_amount),
-            "minus_pension": float(pension_amount),
-            "minus_tax": float(income_tax),
-            "minus_aow": float(aow_premium),
-            "minus_ww": float(ww_premium),
-            "plus_benefits": float(total_benefits),
-            "equals_net": float(net_income)
-        }
-    }
+    return NetIncomeResult(
+        gross_income, pension_contribution_pct, housing_costs, household_members,
+        children_count, is_partner, lump_sum_percentage, tax_year
+    ).to_dict()
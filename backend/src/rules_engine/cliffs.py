@@ -0,0 +1,214 @@
+"""
+Cliff and poverty-trap detection
+Finds income ranges with high effective marginal rates for every household type
+
+Built on the piecewise-linear income model: within a segment the effective
+marginal rate is 1 - d(net)/d(gross); at a breakpoint where net income
+jumps down (a benefit cut-off) the rate is unbounded, and everything up to
+the income that earns the drop back is a poverty trap.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import product
+import json
+
+from .memo import LRUCache
+from .piecewise import HouseholdProfile, IncomeModel, Segment, compile_income_model
+from .calculator import ruleset_version
+from .parameters import DEFAULT_TAX_YEAR
+
+HOUSEHOLD_MEMBERS = (1, 2)
+CHILDREN_COUNTS = (0, 1, 2, 3, 4)
+PARTNER_FLAGS = (False, True)
+
+DEFAULT_MARGINAL_RATE_LIMIT = 0.8
+DEFAULT_PENSION_PCT = 5.0  # Same defaults as /calculations/scenario
+DEFAULT_HOUSING_COSTS = Decimal(400)
+
+_MIN_JUMP = Decimal("0.005")  # Drops below half a cent are rounding, not cliffs
+
+# Marginal-rate contributions: deductions add to the rate, benefits that phase out add too
+_RATE_COMPONENTS = (
+    ("pension_amount", 1), ("income_tax", 1), ("aow_premium", 1), ("ww_premium", 1),
+    ("huurtoeslag", -1), ("zorgtoeslag", -1), ("kindgebonden_budget", -1)
+)
+
+
+@dataclass(frozen=True)
+class Cliff:
+    """Downward jump in net income at a breakpoint, and the income needed to earn it back"""
+    gross_income: Decimal
+    causes: Tuple[str, ...]
+    net_income_drop: Decimal
+    recovery_income: Optional[Decimal]  # None if net income never recovers
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "gross_income": float(self.gross_income),
+            "causes": list(self.causes),
+            "net_income_drop": float(self.net_income_drop),
+            "recovery_income": float(self.recovery_income) if self.recovery_income is not None else None,
+            "trap_width": float(self.recovery_income - self.gross_income)
+            if self.recovery_income is not None else None
+        }
+
+
+@dataclass(frozen=True)
+class RateInterval:
+    """Segment of the income curve with its effective marginal rate and what makes it up"""
+    start: Decimal
+    end: Optional[Decimal]
+    marginal_rate: Decimal
+    components: Dict[str, Decimal]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start": float(self.start),
+            "end": float(self.end) if self.end is not None else None,
+            "marginal_rate": float(self.marginal_rate),
+            "components": {name: float(rate) for name, rate in self.components.items() if rate}
+        }
+
+
+@dataclass(frozen=True)
+class HouseholdAnalysis:
+    """Every cliff and every segment's marginal rate for one household type"""
+    profile: HouseholdProfile
+    cliffs: Tuple[Cliff, ...]
+    intervals: Tuple[RateInterval, ...]
+
+    def report(self, limit: float) -> Dict[str, Any]:
+        """Cliffs plus the intervals whose marginal rate exceeds limit"""
+        threshold = Decimal(str(limit))
+        return {
+            "household": {
+                "household_members": self.profile.household_members,
+                "children_count": self.profile.children_count,
+                "is_partner": self.profile.is_partner
+            },
+            "cliffs": [cliff.to_dict() for cliff in self.cliffs],
+            "high_marginal_rate_intervals": [
+                interval.to_dict() for interval in self.intervals if interval.marginal_rate > threshold
+            ]
+        }
+
+
+# ============ ANALYSIS ============
+
+def analyze_household(model: IncomeModel) -> HouseholdAnalysis:
+    """Cliffs and per-segment marginal rates of one compiled income model"""
+    intervals = tuple(_rate_interval(segment) for segment in model.segments)
+
+    cliffs = []
+    for index in range(1, len(model.breakpoints)):
+        breakpoint = model.breakpoints[index]
+        gross = breakpoint.gross_income
+        before = model.segments[index - 1].evaluate(gross)["net_income"]
+        after = min(breakpoint.values["net_income"], model.segments[index].evaluate(gross)["net_income"])
+        drop = before - after
+        if drop > _MIN_JUMP:
+            cliffs.append(Cliff(
+                gross_income=gross,
+                causes=breakpoint.causes,
+                net_income_drop=drop,
+                recovery_income=_recovery_income(model, index, before)
+            ))
+
+    return HouseholdAnalysis(profile=model.profile, cliffs=tuple(cliffs), intervals=intervals)
+
+
+def _rate_interval(segment: Segment) -> RateInterval:
+    components = {
+        name: sign * segment.coefficients[name][0] for name, sign in _RATE_COMPONENTS
+    }
+    return RateInterval(
+        start=segment.start,
+        end=segment.end,
+        marginal_rate=1 - segment.coefficients["net_income"][0],
+        components=components
+    )
+
+
+def _recovery_income(model: IncomeModel, index: int, target: Decimal) -> Optional[Decimal]:
+    """Lowest gross income from breakpoint index onwards whose net income is back at target"""
+    for segment in model.segments[index:]:
+        slope, intercept = segment.coefficients["net_income"]
+        if slope <= 0:
+            continue
+        crossing = max((target - intercept) / slope, segment.start)
+        if segment.end is None or crossing < segment.end:
+            return crossing
+    return None
+
+
+# ============ PRECOMPUTED RESULTS ============
+
+_analysis_cache = LRUCache(maxsize=64)
+_report_cache = LRUCache(maxsize=256)
+
+
+def household_profiles(
+    pension_contribution_pct: float = DEFAULT_PENSION_PCT,
+    housing_costs: Decimal = DEFAULT_HOUSING_COSTS,
+    tax_year: int = DEFAULT_TAX_YEAR
+) -> List[HouseholdProfile]:
+    """Every combination of household members, children and partner flag"""
+    return [
+        HouseholdProfile(
+            pension_contribution_pct=pension_contribution_pct,
+            housing_costs=housing_costs,
+            household_members=members,
+            children_count=children,
+            is_partner=partner,
+            tax_year=tax_year
+        )
+        for members, children, partner in product(HOUSEHOLD_MEMBERS, CHILDREN_COUNTS, PARTNER_FLAGS)
+    ]
+
+
+def get_cliff_analysis(
+    pension_contribution_pct: float = DEFAULT_PENSION_PCT,
+    housing_costs: Decimal = DEFAULT_HOUSING_COSTS,
+    tax_year: int = DEFAULT_TAX_YEAR
+) -> List[HouseholdAnalysis]:
+    """Analyses of all household types, computed once per ruleset version and inputs"""
+    key = (ruleset_version(), tax_year, pension_contribution_pct, Decimal(str(housing_costs)))
+    found, analyses = _analysis_cache.lookup(key)
+    if not found:
+        analyses = [
+            analyze_household(compile_income_model(profile))
+            for profile in household_profiles(pension_contribution_pct, housing_costs, tax_year)
+        ]
+        _analysis_cache.set(key, analyses)
+    return analyses
+
+
+def cliff_report_json(
+    limit: float = DEFAULT_MARGINAL_RATE_LIMIT,
+    pension_contribution_pct: float = DEFAULT_PENSION_PCT,
+    housing_costs: Decimal = DEFAULT_HOUSING_COSTS,
+    tax_year: int = DEFAULT_TAX_YEAR
+) -> bytes:
+    """Serialized report for every household type; repeated queries are a cache lookup"""
+    key = (ruleset_version(), tax_year, pension_contribution_pct, Decimal(str(housing_costs)), limit)
+    found, body = _report_cache.lookup(key)
+    if not found:
+        analyses = get_cliff_analysis(pension_contribution_pct, housing_costs, tax_year)
+        body = json.dumps({
+            "ruleset_version": key[0],
+            "tax_year": tax_year,
+            "marginal_rate_limit": limit,
+            "pension_contribution_percentage": pension_contribution_pct,
+            "housing_costs": float(housing_costs),
+            "households": [analysis.report(limit) for analysis in analyses]
+        }).encode()
+        _report_cache.set(key, body)
+    return body
+
+
+def precompute_cliff_analysis() -> int:
+    """Warm the default report (called at startup); returns the number of household types"""
+    cliff_report_json()
+    return len(get_cliff_analysis())
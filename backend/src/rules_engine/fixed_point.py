@@ -0,0 +1,356 @@
+"""
+Fixed-point calculator - integer-cents counterpart of calculate_net_income
+
+Amounts are Python ints: whole cents for money, and 1e-7 cent units for
+taxable income (which carries the unrounded lump sum). Rates are exact
+integer ratios (basis points for the current tables). Every division rounds
+ROUND_HALF_UP exactly like the quantize(Decimal("0.01")) calls of the
+Decimal reference, so results are identical; inputs the integer path cannot
+represent exactly are handed to the reference implementation.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from bisect import bisect_left
+from decimal import Decimal
+from time import perf_counter
+
+from .calculator import (
+    calculate_net_income, calculate_huurtoeslag, _bracket_detail, LUMP_SUM_RECOMMENDATIONS
+)
+from .metrics import metrics
+from .parameters import TaxYearParameters, DEFAULT_TAX_YEAR, get_parameters
+
+UNITS_PER_CENT = 10 ** 7
+UNITS_PER_EURO = 100 * UNITS_PER_CENT
+
+# Huurtoeslag is computed in Decimal as a chain of 28-digit divisions; results
+# this close to a half cent are left to the reference to round
+_TIE_MARGIN = 10 ** 12
+
+Ratio = Tuple[int, int]
+
+# The fixed path records its own rule metrics in one batch; the reference
+# functions it falls back to are called undecorated so nothing counts twice
+_reference_net_income = calculate_net_income.__wrapped__
+_reference_huurtoeslag = calculate_huurtoeslag.__wrapped__
+
+
+# ============ INTEGER HELPERS ============
+
+def _div_half_up(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded half away from zero (denominator > 0)"""
+    quotient = (abs(numerator) * 2 + denominator) // (2 * denominator)
+    return quotient if numerator >= 0 else -quotient
+
+
+def _ratio(value: Any) -> Ratio:
+    if isinstance(value, int):
+        return value, 1
+    return value.as_integer_ratio()
+
+
+def _scaled(value: Any, scale: int) -> Optional[int]:
+    """value * scale as an int, or None if that is not a whole number"""
+    num, den = _ratio(value)
+    scaled, remainder = divmod(num * scale, den)
+    return None if remainder else scaled
+
+
+def _hundredths(percentage: Any) -> Optional[int]:
+    """Percentage in hundredths of a percent, or None beyond two decimals"""
+    if isinstance(percentage, float):
+        scaled = round(percentage * 100)
+        # Same value Decimal(str(percentage)) would give, without building it
+        return scaled if abs(percentage * 100 - scaled) < 1e-9 else None
+    return _scaled(percentage, 100)
+
+
+def _units(amount: Decimal) -> int:
+    units = _scaled(amount, UNITS_PER_EURO)
+    if units is None:
+        raise ValueError(f"Parameter {amount} is finer than the fixed-point resolution")
+    return units
+
+
+def _cents(amount: Decimal) -> int:
+    cents = _scaled(amount, 100)
+    if cents is None:
+        raise ValueError(f"Parameter {amount} is not a whole number of cents")
+    return cents
+
+
+# ============ PARAMETER TABLES ============
+
+class FixedPointTables:
+    """Integer form of one tax year's parameters, built once per parameter set"""
+
+    def __init__(self, params: TaxYearParameters):
+        self.params = params
+        self.allowance_units = _units(params.total_tax_allowance)
+        self.bracket_min_units = [_units(bracket.min) for bracket in params.brackets]
+        self.bracket_base_cents = [_cents(bracket.base_tax) for bracket in params.brackets]
+        self.bracket_rates = [_ratio(bracket.rate) for bracket in params.brackets]
+        # Details of fully used brackets never change; the top bracket is filled in per call
+        self.full_bracket_details = [
+            _bracket_detail(bracket, bracket.max - bracket.min, bracket.full_tax)
+            if bracket.max is not None else None
+            for bracket in params.brackets
+        ]
+        self.top_bracket_details = [
+            _bracket_detail(bracket, Decimal(0), Decimal(0)) for bracket in params.brackets
+        ]
+
+        self.aow_rate = _ratio(params.aow_premium_rate)
+        self.ww_rate = _ratio(params.ww_premium_rate)
+
+        self.huurtoeslag_threshold_units = {
+            key: _units(value) for key, value in params.huurtoeslag_income_thresholds.items()
+        }
+        self.huurtoeslag_max_costs_cents = {
+            key: _cents(value * 12) for key, value in params.huurtoeslag_max_housing_costs.items()
+        }
+        self.huurtoeslag_share = _ratio(params.huurtoeslag_cost_share)
+
+        self.zorgtoeslag_threshold_units = {
+            key: _units(value) for key, value in params.zorgtoeslag_income_thresholds.items()
+        }
+        self.zorgtoeslag_base_cents = {
+            key: _cents(value) for key, value in params.zorgtoeslag_base_subsidy.items()
+        }
+        self.zorgtoeslag_floor_units = _units(params.zorgtoeslag_income_floor)
+        self.zorgtoeslag_reduction = _ratio(params.zorgtoeslag_reduction_rate)
+
+        self.kindgebonden_threshold_units = _units(params.kindgebonden_income_threshold)
+        self.kindgebonden_limit_units = _units(params.kindgebonden_supplement_income_limit)
+        self.kindgebonden_budget_cents = _ratio(params.kindgebonden_budget_per_child * 100)
+        self.kindgebonden_supplement = _ratio(params.kindgebonden_supplement_rate)
+
+
+_tables: Dict[str, FixedPointTables] = {}
+
+
+def get_fixed_point_tables(params: TaxYearParameters) -> FixedPointTables:
+    tables = _tables.get(params.fingerprint)
+    if tables is None:
+        tables = _tables[params.fingerprint] = FixedPointTables(params)
+    return tables
+
+
+# ============ RULES ============
+
+def income_tax_cents(
+    tables: FixedPointTables,
+    taxable_units: int,
+    with_details: bool = True
+) -> Tuple[int, List[Dict]]:
+    """Income tax in cents with bracket details, see calculate_income_tax"""
+    taxable = max(0, taxable_units - tables.allowance_units)
+    index = bisect_left(tables.bracket_min_units, taxable) - 1
+    if index < 0:
+        return 0, []
+
+    in_top = taxable - tables.bracket_min_units[index]
+    num, den = tables.bracket_rates[index]
+    top_tax = _div_half_up(in_top * num, den * UNITS_PER_CENT)
+    total = tables.bracket_base_cents[index] + top_tax
+    if not with_details:
+        return total, []
+
+    details = [dict(detail) for detail in tables.full_bracket_details[:index]]
+    top = dict(tables.top_bracket_details[index])
+    top["taxable_amount"] = in_top / UNITS_PER_EURO
+    top["tax"] = top_tax / 100
+    details.append(top)
+    return total, details
+
+
+def _lump_sum_recommendation(lump_sum_percentage: float, income_tax: int, taxable_units: int) -> str:
+    """_get_lump_sum_recommendation on integer amounts, comparing rates exactly"""
+    if lump_sum_percentage == 0:
+        return LUMP_SUM_RECOMMENDATIONS["none"]
+    if income_tax <= 0:
+        return LUMP_SUM_RECOMMENDATIONS["untaxed"]
+    # effective rate (%) = income_tax / taxable * 100, both scaled to units
+    scaled_tax = income_tax * UNITS_PER_CENT * 100
+    if taxable_units > 0 and scaled_tax > 35 * taxable_units:
+        return LUMP_SUM_RECOMMENDATIONS["high"]
+    if taxable_units > 0 and scaled_tax > 25 * taxable_units:
+        return LUMP_SUM_RECOMMENDATIONS["moderate"]
+    return LUMP_SUM_RECOMMENDATIONS["lower"]
+
+
+def _premium_cents(taxable_units: int, rate: Ratio) -> int:
+    num, den = rate
+    return _div_half_up(taxable_units * num, den * UNITS_PER_CENT)
+
+
+def huurtoeslag_cents(
+    tables: FixedPointTables,
+    taxable_units: int,
+    household_members: int,
+    housing_costs_annual_cents: int
+) -> Optional[int]:
+    """Housing allowance in cents, or None when the reference must round it"""
+    household_type = "couple" if household_members >= 2 else "single"
+    threshold = tables.huurtoeslag_threshold_units[household_type]
+    if taxable_units > threshold:
+        return 0
+
+    eligible = min(housing_costs_annual_cents, tables.huurtoeslag_max_costs_cents[household_type])
+    share_num, share_den = tables.huurtoeslag_share
+    numerator = eligible * (threshold - taxable_units) * share_num
+    denominator = threshold * share_den
+    remainder = abs(numerator) % denominator
+    if abs(2 * remainder - denominator) * _TIE_MARGIN <= denominator:
+        return None
+    return _div_half_up(numerator, denominator)
+
+
+def zorgtoeslag_cents(tables: FixedPointTables, taxable_units: int, is_partner: bool) -> int:
+    """Healthcare subsidy in cents, see calculate_zorgtoeslag"""
+    household_type = "partner" if is_partner else "single"
+    if taxable_units > tables.zorgtoeslag_threshold_units[household_type]:
+        return 0
+    excess = max(0, taxable_units - tables.zorgtoeslag_floor_units)
+    num, den = tables.zorgtoeslag_reduction
+    reduction = _div_half_up(excess * num, den * UNITS_PER_CENT)
+    return max(0, tables.zorgtoeslag_base_cents[household_type] - reduction)
+
+
+def kindgebonden_budget_cents(tables: FixedPointTables, children_count: int, taxable_units: int) -> int:
+    """Monthly child benefit in cents, see calculate_kindgebonden_budget"""
+    if children_count == 0 or taxable_units > tables.kindgebonden_threshold_units:
+        return 0
+    budget_num, budget_den = tables.kindgebonden_budget_cents
+    numerator = children_count * budget_num
+    denominator = budget_den * 12
+    if taxable_units < tables.kindgebonden_limit_units:
+        rate_num, rate_den = tables.kindgebonden_supplement
+        numerator *= rate_den + rate_num
+        denominator *= rate_den
+    return _div_half_up(numerator, denominator)
+
+
+# ============ NET INCOME CALCULATION ============
+
+def calculate_net_income_fixed(
+    gross_income: Decimal,
+    pension_contribution_pct: float,
+    housing_costs: Decimal,
+    household_members: int,
+    children_count: int,
+    is_partner: bool = False,
+    lump_sum_percentage: float = 0,
+    tax_year: int = DEFAULT_TAX_YEAR
+) -> Dict[str, Any]:
+    """
+    calculate_net_income in integer arithmetic; same arguments, same result
+
+    Falls back to the Decimal reference for sub-cent amounts, percentages
+    with more than two decimals and huurtoeslag results on a half cent.
+    """
+    started = perf_counter()
+    params = get_parameters(tax_year)
+    tables = get_fixed_point_tables(params)
+
+    gross_cents = _scaled(gross_income, 100)
+    housing_cents = _scaled(housing_costs, 100)
+    pct = _hundredths(pension_contribution_pct)
+    lump_pct = _hundredths(lump_sum_percentage)
+    if gross_cents is None or housing_cents is None or pct is None or lump_pct is None:
+        return _net_income_fallback(
+            started, gross_income, pension_contribution_pct, housing_costs, household_members,
+            children_count, is_partner, lump_sum_percentage, tax_year
+        )
+
+    # Pension contribution (hundredths of a percent) and lump sum (divided by 10 since max is 10%)
+    pension_cents = _div_half_up(gross_cents * pct, 10000)
+    lump_units = gross_cents * pct * lump_pct
+    taxable_before_lump_cents = gross_cents - pension_cents
+    taxable_units = taxable_before_lump_cents * UNITS_PER_CENT + lump_units
+
+    rules_started = perf_counter()
+    income_tax, tax_brackets = income_tax_cents(tables, taxable_units)
+    tax_done = perf_counter()
+    aow_premium = _premium_cents(taxable_units, tables.aow_rate)
+    ww_premium = _premium_cents(taxable_units, tables.ww_rate)
+
+    premiums_done = perf_counter()
+    huurtoeslag = huurtoeslag_cents(tables, taxable_units, household_members, housing_cents * 12)
+    if huurtoeslag is None:
+        allowance, _ = _reference_huurtoeslag(
+            Decimal(taxable_units).scaleb(-9), household_members, Decimal(housing_cents * 12).scaleb(-2), params
+        )
+        huurtoeslag = _scaled(allowance, 100)
+    huurtoeslag_done = perf_counter()
+    zorgtoeslag = zorgtoeslag_cents(tables, taxable_units, is_partner)
+    zorgtoeslag_done = perf_counter()
+    kindgebonden_budget = kindgebonden_budget_cents(tables, children_count, taxable_units)
+    kindgebonden_done = perf_counter()
+
+    total_deductions = pension_cents + income_tax + aow_premium + ww_premium
+    total_benefits = huurtoeslag + zorgtoeslag + kindgebonden_budget
+    net_income = gross_cents - total_deductions + total_benefits
+
+    tax_without_lump = income_tax_cents(tables, taxable_before_lump_cents * UNITS_PER_CENT, False)[0]
+    lump_sum_amount = lump_units / UNITS_PER_EURO
+    taxable_with_lump = taxable_units / UNITS_PER_EURO
+
+    if metrics.enabled:
+        finished = perf_counter()
+        metrics.observe_rules(
+            (
+                ("income_tax", tax_done - rules_started),
+                ("huurtoeslag", huurtoeslag_done - premiums_done),
+                ("zorgtoeslag", zorgtoeslag_done - huurtoeslag_done),
+                ("kindgebonden_budget", kindgebonden_done - zorgtoeslag_done),
+                ("net_income", finished - started)
+            ),
+            {"huurtoeslag": huurtoeslag > 0, "zorgtoeslag": zorgtoeslag > 0, "kindgebonden_budget": kindgebonden_budget > 0}
+        )
+
+    return {
+        "tax_year": params.year,
+        "gross_income": gross_cents / 100,
+        "lump_sum_percentage": lump_sum_percentage,
+        "lump_sum_amount": lump_sum_amount,
+        "pension_contribution_pct": pension_contribution_pct,
+        "pension_amount": pension_cents / 100,
+        "taxable_income": taxable_before_lump_cents / 100,
+        "taxable_income_before_lump_sum": taxable_before_lump_cents / 100,
+        "taxable_income_with_lump_sum": taxable_with_lump,
+        "income_tax": income_tax / 100,
+        "tax_brackets": tax_brackets,
+        "aow_premium": aow_premium / 100,
+        "ww_premium": ww_premium / 100,
+        "total_deductions": total_deductions / 100,
+        "huurtoeslag": huurtoeslag / 100,
+        "zorgtoeslag": zorgtoeslag / 100,
+        "kindgebonden_budget": kindgebonden_budget / 100,
+        "total_benefits": total_benefits / 100,
+        "net_income": net_income / 100,
+        "effective_tax_rate": (income_tax * UNITS_PER_CENT * 100) / taxable_units if taxable_units > 0 else 0.0,
+        "lump_sum_impact": {
+            "tax_increase": (income_tax - tax_without_lump) / 100,
+            "benefit_impact": "May reduce housing allowance and healthcare allowance due to higher income",
+            "recommendation": _lump_sum_recommendation(lump_sum_percentage, income_tax, taxable_units)
+        },
+        "breakdown": {
+            "gross_income": gross_cents / 100,
+            "lump_sum_addition": lump_sum_amount,
+            "minus_pension": pension_cents / 100,
+            "minus_tax": income_tax / 100,
+            "minus_aow": aow_premium / 100,
+            "minus_ww": ww_premium / 100,
+            "plus_benefits": total_benefits / 100,
+            "equals_net": net_income / 100
+        }
+    }
+
+
+def _net_income_fallback(started: float, *args: Any) -> Dict[str, Any]:
+    """The Decimal reference, timed as net_income from the start of the fixed path"""
+    result = _reference_net_income(*args)
+    if metrics.enabled:
+        metrics.observe_rule("net_income", perf_counter() - started)
+    return result
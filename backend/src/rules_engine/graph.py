@@ -0,0 +1,128 @@
+"""
+Rule dependency index
+Topological order and levels, transitive dependencies and reverse
+dependencies (impact sets) of a rule graph, computed once when it is built
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping
+
+
+class RuleGraph:
+    """
+    Immutable index over {rule_id: [rule ids it depends on]}.
+
+    Transitive sets are stored as integer bitmasks over the topological
+    order (bit i = order[i]), so the closure of a 2000-rule graph takes a
+    few hundred KB, "does A depend on B" is one bit test, and impact sets
+    of several changed rules are a bitwise OR.
+    Raises ValueError for unknown dependencies and cycles.
+    """
+
+    def __init__(self, dependencies: Mapping[str, Iterable[str]]):
+        direct = {rule_id: list(dict.fromkeys(deps)) for rule_id, deps in dependencies.items()}
+        for rule_id, deps in direct.items():
+            for dep in deps:
+                if dep not in direct:
+                    raise ValueError(f"Rule {rule_id} depends on unknown rule {dep}")
+
+        dependents: Dict[str, List[str]] = {rule_id: [] for rule_id in direct}
+        for rule_id, deps in direct.items():
+            for dep in deps:
+                dependents[dep].append(rule_id)
+
+        # Kahn's algorithm; ties keep declaration order so the result is deterministic
+        remaining = {rule_id: len(deps) for rule_id, deps in direct.items()}
+        ready = deque(rule_id for rule_id, count in remaining.items() if count == 0)
+        order: List[str] = []
+        level: Dict[str, int] = {}
+        while ready:
+            rule_id = ready.popleft()
+            order.append(rule_id)
+            level[rule_id] = 1 + max((level[dep] for dep in direct[rule_id]), default=-1)
+            for dependent in dependents[rule_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) < len(direct):
+            raise ValueError(f"Circular rule dependency: {' -> '.join(_find_cycle(direct, set(direct) - set(order)))}")
+
+        self.order = order
+        self._index = {rule_id: i for i, rule_id in enumerate(order)}
+        self._direct = {rule_id: sorted(deps, key=self._index.__getitem__) for rule_id, deps in direct.items()}
+        self._dependents = {rule_id: sorted(rules, key=self._index.__getitem__) for rule_id, rules in dependents.items()}
+        self._level = level
+
+        # Closures in one pass each way: dependencies in topological order, dependents in reverse
+        self._closure: Dict[str, int] = {}
+        for rule_id in order:
+            mask = 0
+            for dep in self._direct[rule_id]:
+                mask |= self._closure[dep] | (1 << self._index[dep])
+            self._closure[rule_id] = mask
+        self._impact: Dict[str, int] = {}
+        for rule_id in reversed(order):
+            mask = 0
+            for dependent in self._dependents[rule_id]:
+                mask |= self._impact[dependent] | (1 << self._index[dependent])
+            self._impact[rule_id] = mask
+
+        self.levels: List[List[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for rule_id in order:
+            self.levels[level[rule_id]].append(rule_id)
+
+    def __contains__(self, rule_id: str) -> bool:
+        return rule_id in self._index
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def level(self, rule_id: str) -> int:
+        """0 for rules without dependencies, else one more than the deepest dependency"""
+        return self._level[rule_id]
+
+    def dependencies(self, rule_id: str, transitive: bool = False) -> List[str]:
+        """Rules rule_id reads (all of them, transitively, if asked), in evaluation order"""
+        if not transitive:
+            return list(self._direct[rule_id])
+        return self._members(self._closure[rule_id])
+
+    def dependents(self, rule_id: str, transitive: bool = False) -> List[str]:
+        """Rules that read rule_id (transitively: every output that changes with it), in evaluation order"""
+        if not transitive:
+            return list(self._dependents[rule_id])
+        return self._members(self._impact[rule_id])
+
+    def depends_on(self, rule_id: str, other: str) -> bool:
+        """Whether rule_id depends on other, directly or transitively"""
+        return bool(self._closure[rule_id] >> self._index[other] & 1)
+
+    def impacted(self, changed: Iterable[str]) -> List[str]:
+        """Every rule whose result can change when the changed rules do, in evaluation order"""
+        mask = 0
+        changed_mask = 0
+        for rule_id in changed:
+            mask |= self._impact[rule_id]
+            changed_mask |= 1 << self._index[rule_id]
+        return self._members(mask & ~changed_mask)
+
+    def _members(self, mask: int) -> List[str]:
+        members = []
+        while mask:
+            low = mask & -mask
+            members.append(self.order[low.bit_length() - 1])
+            mask ^= low
+        return members
+
+
+def _find_cycle(direct: Dict[str, List[str]], candidates: set) -> List[str]:
+    """A cycle among the rules Kahn's algorithm could not order"""
+    rule_id = next(rule_id for rule_id in direct if rule_id in candidates)
+    path: List[str] = []
+    seen: Dict[str, int] = {}
+    # Every unordered rule has an unordered dependency, so this walk must revisit a rule
+    while rule_id not in seen:
+        seen[rule_id] = len(path)
+        path.append(rule_id)
+        rule_id = next(dep for dep in direct[rule_id] if dep in candidates)
+    return path[seen[rule_id]:] + [rule_id]
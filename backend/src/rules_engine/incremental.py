@@ -0,0 +1,94 @@
+"""
+Incremental net income re-evaluation
+Keeps a NetIncomeResult across input changes and recomputes only the amounts
+and result fields downstream of the changed inputs
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .calculator import _RESULT_FIELD_GETTERS, NET_INCOME_DEPENDENCIES, NET_INCOME_INPUTS, NetIncomeResult
+from .graph import RuleGraph
+
+NET_INCOME_GRAPH = RuleGraph({
+    **{name: () for name in NET_INCOME_INPUTS},
+    **NET_INCOME_DEPENDENCIES
+})
+
+# Lazily computed amounts that can be carried over to the next calculation
+_AMOUNTS = frozenset(
+    name for name in NET_INCOME_DEPENDENCIES if not name.startswith("field:") and name != "params"
+)
+
+# changed inputs -> (affected amounts in evaluation order, names of affected fields)
+_affected: Dict[Tuple[str, ...], Tuple[List[str], FrozenSet[str]]] = {}
+
+
+def affected_by(changed_inputs: Tuple[str, ...]) -> Tuple[List[str], FrozenSet[str]]:
+    """Amounts (in evaluation order) and result fields downstream of the changed inputs"""
+    entry = _affected.get(changed_inputs)
+    if entry is None:
+        impacted = NET_INCOME_GRAPH.impacted(changed_inputs)
+        entry = _affected[changed_inputs] = (
+            [name for name in impacted if name in _AMOUNTS],
+            frozenset(name[len("field:"):] for name in impacted if name.startswith("field:"))
+        )
+    return entry
+
+
+class IncrementalNetIncome:
+    """
+    A net income calculation kept up to date as its inputs change.
+
+    update() starts a fresh NetIncomeResult seeded with every computed amount
+    the changed inputs cannot affect (per NET_INCOME_GRAPH), so only the
+    downstream amounts are recomputed, and returns the result fields whose
+    values changed. When every amount is affected it skips the seeding and
+    recalculates in full. Not thread-safe; callers serialize updates.
+    """
+
+    def __init__(self, household: Dict[str, Any], fields: Optional[Iterable[str]] = None, include_trace: bool = True):
+        self.household = {name: household[name] for name in NET_INCOME_INPUTS}
+        self.calculation = NetIncomeResult(**self.household)
+        self.result = self.calculation.to_dict(fields, include_trace)
+
+    def update(self, household: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str], List[str]]:
+        """
+        Apply new inputs (all of them or only the changed ones); returns
+        (changed result fields, changed inputs, recomputed amounts)
+        """
+        inputs = {**self.household, **household}
+        changed_inputs = tuple(name for name in NET_INCOME_INPUTS if inputs[name] != self.household[name])
+        if not changed_inputs:
+            return {}, [], []
+        amounts, fields = affected_by(changed_inputs)
+
+        calculation = NetIncomeResult(**inputs)
+        calculation._tax_details_wanted = self.calculation._tax_details_wanted
+        previous = self.result
+        if len(amounts) == len(_AMOUNTS):
+            # Every amount is affected (gross income): nothing to carry over, so this is a full calculation
+            result = {name: _RESULT_FIELD_GETTERS[name](calculation) for name in previous}
+            changed = {name: value for name, value in result.items() if value != previous[name]}
+            recomputed = [name for name in amounts if name in calculation.__dict__]
+            self.household, self.calculation, self.result = inputs, calculation, result
+            return changed, list(changed_inputs), recomputed
+
+        state = calculation.__dict__
+        for name, value in self.calculation.__dict__.items():
+            if name in _AMOUNTS:
+                state[name] = value
+        for name in amounts:
+            state.pop(name, None)
+
+        changed: Dict[str, Any] = {}
+        for name in previous:
+            if name in fields:
+                value = _RESULT_FIELD_GETTERS[name](calculation)
+                if value != previous[name]:
+                    changed[name] = value
+
+        # Nothing is kept until every field is computed, so a failing update leaves the state as it was
+        recomputed = [name for name in amounts if name in state]
+        self.household, self.calculation = inputs, calculation
+        self.result.update(changed)
+        return changed, list(changed_inputs), recomputed
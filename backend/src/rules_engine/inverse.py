@@ -0,0 +1,160 @@
+"""
+Inverse solver
+Gross income required for a target net income
+
+The compiled piecewise-linear model locates every crossing of the target
+analytically (one linear solve per segment, plus the jumps at benefit
+cut-offs); each crossing is then pinned to the cent with a bounded number of
+calculate_net_income evaluations. Because benefit cut-offs make net income
+non-monotone, a target can be reached, lost and reached again; every
+crossing and every qualifying income range is reported.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from decimal import Decimal, ROUND_FLOOR
+
+from .calculator import calculate_net_income
+from .piecewise import HouseholdProfile, IncomeModel, compile_income_model
+
+RISING = "rising"    # Net income reaches the target from below
+FALLING = "falling"  # Net income drops below the target (benefit cut-off or phase-out)
+
+_CENT = Decimal("0.01")
+_HALF_CENT = Decimal("0.005")
+_MAX_REFINE_STEPS = 16  # Cents walked from the analytic crossing when pinning it on the scalar path
+
+
+class InverseSolver:
+    """Solves net_income(gross) = target for one household profile"""
+
+    def __init__(self, model: IncomeModel):
+        self.model = model
+        self.profile: HouseholdProfile = model.profile
+        self.evaluations = 0
+        self._net_cache: Dict[Decimal, Decimal] = {}
+
+    def net_income(self, gross: Decimal) -> Decimal:
+        """Scalar net income at a whole-cent gross income"""
+        if gross not in self._net_cache:
+            profile = self.profile
+            result = calculate_net_income(
+                gross_income=gross,
+                pension_contribution_pct=profile.pension_contribution_pct,
+                housing_costs=profile.housing_costs,
+                household_members=profile.household_members,
+                children_count=profile.children_count,
+                is_partner=profile.is_partner,
+                lump_sum_percentage=profile.lump_sum_percentage,
+                tax_year=profile.tax_year
+            )
+            self.evaluations += 1
+            self._net_cache[gross] = Decimal(str(result["net_income"]))
+        return self._net_cache[gross]
+
+    # ============ ANALYTIC CROSSINGS ============
+
+    def crossings(self, target: Decimal) -> Tuple[List[Tuple[Decimal, str, Tuple[str, ...]]], List[Tuple[Decimal, Optional[Decimal]]]]:
+        """
+        Approximate crossings (gross, direction, causes) from the model, and
+        flat segments lying exactly on the target
+        """
+        model = self.model
+        points = []
+        flat = []
+        for index, segment in enumerate(model.segments):
+            if index > 0:
+                # Jump at the breakpoint opening this segment
+                breakpoint = model.breakpoints[index]
+                before = model.segments[index - 1].evaluate(segment.start)["net_income"] - target
+                after = segment.evaluate(segment.start)["net_income"] - target
+                if before < 0 <= after:
+                    points.append((segment.start, RISING, breakpoint.causes))
+                elif after < 0 <= before:
+                    points.append((segment.start, FALLING, breakpoint.causes))
+
+            slope, intercept = segment.coefficients["net_income"]
+            if slope == 0:
+                if abs(intercept - target) < _HALF_CENT:
+                    flat.append((segment.start, segment.end))
+                continue
+            gross = (target - intercept) / slope
+            if segment.start < gross and (segment.end is None or gross < segment.end):
+                points.append((gross, RISING if slope > 0 else FALLING, ()))
+        return points, flat
+
+    # ============ CENT-EXACT REFINEMENT ============
+
+    def refine(self, approximate: Decimal, direction: str, target: Decimal) -> Decimal:
+        """
+        Whole-cent gross income at the crossing according to calculate_net_income:
+        the first cent at or above target when rising, the last one when falling
+
+        Net income moves by less than a cent per cent of gross and each field is
+        rounded separately, so the analytic crossing is only accurate to a few
+        cents; walk from it towards the edge of the run of reaching cents.
+        """
+        gross = max(Decimal(0), approximate.quantize(_CENT, rounding=ROUND_FLOOR))
+        # Towards the edge: down for a rising crossing, up for a falling one
+        outward = -_CENT if direction == RISING else _CENT
+
+        if self.net_income(gross) >= target:
+            for _ in range(_MAX_REFINE_STEPS):
+                neighbour = gross + outward
+                if neighbour < 0 or self.net_income(neighbour) < target:
+                    break
+                gross = neighbour
+        else:
+            for _ in range(_MAX_REFINE_STEPS):
+                gross -= outward
+                if gross < 0:
+                    return Decimal(0)
+                if self.net_income(gross) >= target:
+                    break
+        return gross
+
+    def solve(self, target: Decimal) -> Dict[str, Any]:
+        points, flat = self.crossings(target)
+
+        solutions = []
+        for approximate, direction, causes in sorted(points, key=lambda point: point[0]):
+            gross = self.refine(approximate, direction, target)
+            solutions.append({
+                "gross_income": float(gross),
+                "net_income": float(self.net_income(gross)),
+                "direction": direction,
+                "causes": list(causes)
+            })
+
+        ranges = _qualifying_ranges(self.net_income(Decimal(0)) >= target, solutions)
+        return {
+            "target_net_income": float(target),
+            "tax_year": self.profile.tax_year,
+            "solutions": solutions,
+            "exact_intervals": [
+                {"start": float(start), "end": float(end) if end is not None else None}
+                for start, end in flat
+            ],
+            "qualifying_ranges": ranges,
+            "minimum_gross_income": ranges[0]["start"] if ranges else None,
+            "evaluations": self.evaluations
+        }
+
+
+def _qualifying_ranges(reached_at_zero: bool, solutions: List[Dict[str, Any]]) -> List[Dict[str, Optional[float]]]:
+    """Gross income ranges whose net income is at least the target"""
+    ranges = []
+    start: Optional[float] = 0.0 if reached_at_zero else None
+    for solution in solutions:
+        if solution["direction"] == RISING and start is None:
+            start = solution["gross_income"]
+        elif solution["direction"] == FALLING and start is not None:
+            ranges.append({"start": start, "end": solution["gross_income"]})
+            start = None
+    if start is not None:
+        ranges.append({"start": start, "end": None})
+    return ranges
+
+
+def solve_gross_income(profile: HouseholdProfile, target_net_income: Decimal) -> Dict[str, Any]:
+    """Every gross income (and income range) giving target_net_income for a household profile"""
+    return InverseSolver(compile_income_model(profile)).solve(Decimal(str(target_net_income)))
@@ -1,8 +1,27 @@
 """Rule loader and initialization"""
 
+from pathlib import Path
+from typing import List
+import json
+
+from .parameters import TaxYearParameters, register_parameters, available_years
+
+# Parameter tables, one JSON file per tax year
+PARAMETERS_DIR = Path(__file__).parent / "data"
+
+def load_parameter_tables(directory: Path = PARAMETERS_DIR) -> List[int]:
+    """Load every tax_year_*.json file in directory into the parameter registry"""
+    loaded = []
+    for path in sorted(Path(directory).glob("tax_year_*.json")):
+        with open(path, encoding="utf-8") as f:
+            parameters = TaxYearParameters.from_dict(json.load(f))
+        register_parameters(parameters)
+        loaded.append(parameters.year)
+    return loaded
+
 def load_rules():
     """Load all rules into the engine"""
     print("📋 Loading rules...")
-    # Rules are defined inline in the calculator module
-    # This function can be extended to load from database or files
-    print("✅ Rules loaded successfully")
+    # Calculation logic lives in the calculator module; parameters come from data files
+    load_parameter_tables()
+    print(f"✅ Rules loaded successfully (tax years: {', '.join(map(str, available_years()))})")
@@ -0,0 +1,120 @@
+"""
+Memoization helpers
+Size-bounded LRU cache with optional TTL and canonical cache keys
+"""
+
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import fields, is_dataclass
+from decimal import Decimal
+import threading
+import time
+
+_MISSING = object()
+_SCALARS = (str, int, float, Decimal, bool, type(None))
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+
+def canonical(value: Any) -> Hashable:
+    """
+    Hashable, order-independent representation of a value for use in cache keys.
+    Mappings compare by content regardless of insertion order, dataclasses by
+    their fields, and unhashable leaves by repr.
+    """
+    if isinstance(value, _SCALARS):
+        return value
+    names = _FIELD_NAMES.get(type(value))
+    if names is None and is_dataclass(value) and not isinstance(value, type):
+        names = _FIELD_NAMES[type(value)] = tuple(f.name for f in fields(value))
+    if names is not None:
+        return (type(value).__name__,) + tuple(canonical(getattr(value, name)) for name in names)
+    if isinstance(value, Mapping):
+        return ("map",) + tuple(sorted(
+            ((key, canonical(item)) for key, item in value.items()), key=lambda pair: repr(pair[0])
+        ))
+    if isinstance(value, (list, tuple)):
+        return ("seq",) + tuple(canonical(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return ("set", frozenset(canonical(item) for item in value))
+    try:
+        hash(value)
+    except TypeError:
+        return ("repr", repr(value))
+    return value
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with an optional time-to-live per entry.
+
+    maxsize=0 disables caching; ttl is in seconds (None keeps entries until evicted).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value), refreshing the entry's recency on a hit"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at and expires_at <= time.monotonic():
+                    del self._data[key]
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+            self.misses += 1
+            return False, None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        found, value = self.lookup(key)
+        return value if found else default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches the predicate, returning how many were removed"""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
@@ -0,0 +1,289 @@
+"""
+Runtime metrics
+Per-rule call counts and timings, benefit outcomes, per-route latency
+histograms and cache counters and latencies, rendered in the Prometheus text format
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+import threading
+
+# Route latency histogram upper bounds in seconds
+ROUTE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Histograms are flat lists: [count, sum, per-bucket counts..., +Inf count]
+_COUNT, _SUM, _FIRST_BUCKET = 0, 1, 2
+
+# Per-request rule timings ({rule_id: [calls, seconds]}), set by the HTTP middleware
+_request_rules: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_rules", default=None)
+
+Sample = Tuple[str, str, str, Dict[str, str], float]  # (name, type, help, labels, value)
+
+
+class _Shard:
+    """One thread's metrics; only that thread writes, so updates need no lock"""
+
+    __slots__ = ("rules", "rule_errors", "benefits", "routes", "cache_lookups", "cache_operations")
+
+    def __init__(self):
+        self.rules: Dict[str, List[float]] = {}  # rule_id -> [calls, seconds]
+        self.rule_errors: Dict[str, int] = {}
+        self.benefits: Dict[Tuple[str, str], int] = {}
+        self.routes: Dict[Tuple[str, str, str], List[float]] = {}
+        self.cache_lookups: Dict[Tuple[str, str], int] = {}
+        self.cache_operations: Dict[Tuple[str, str], List[float]] = {}  # (operation, result) -> [calls, seconds]
+
+
+def _observe(histogram: List[float], buckets: Tuple[float, ...], value: float) -> None:
+    histogram[_COUNT] += 1
+    histogram[_SUM] += value
+    histogram[_FIRST_BUCKET + bisect_left(buckets, value)] += 1
+
+
+class MetricsRegistry:
+    """
+    Process-wide metric store, sharded per thread: an observation is a few
+    dict and list updates on the calling thread's shard, and scrapes merge
+    the shards. With a process calculation pool, worker-side rule metrics
+    stay in the workers.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._shards: List[_Shard] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()  # guards the shard list only
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    # ---- recording ----
+
+    def observe_rules(self, durations: Iterable[Tuple[str, float]], granted: Optional[Dict[str, bool]] = None) -> None:
+        """
+        Rule timings (and benefit outcomes), also added to the current request's
+        Server-Timing. Workers of one request running at the same moment may
+        rarely lose an update to that header; the counters here are exact.
+        """
+        shard = self._shard()
+        rules = shard.rules
+        timings = _request_rules.get()
+        for rule_id, seconds in durations:
+            entry = rules.get(rule_id)
+            if entry is None:
+                rules[rule_id] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+            if timings is not None:
+                entry = timings.get(rule_id)
+                if entry is None:
+                    timings[rule_id] = [1, seconds]
+                else:
+                    entry[0] += 1
+                    entry[1] += seconds
+        if granted:
+            benefits = shard.benefits
+            for benefit, is_granted in granted.items():
+                key = (benefit, "granted" if is_granted else "rejected")
+                benefits[key] = benefits.get(key, 0) + 1
+
+    def observe_rule(self, rule_id: str, seconds: float, granted: Optional[bool] = None) -> None:
+        """observe_rules for a single rule, on the hot path of every instrumented call"""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        entry = shard.rules.get(rule_id)
+        if entry is None:
+            shard.rules[rule_id] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+        timings = _request_rules.get()
+        if timings is not None:
+            entry = timings.get(rule_id)
+            if entry is None:
+                timings[rule_id] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+        if granted is not None:
+            key = (rule_id, "granted" if granted else "rejected")
+            shard.benefits[key] = shard.benefits.get(key, 0) + 1
+
+    def rule_error(self, rule_id: str) -> None:
+        errors = self._shard().rule_errors
+        errors[rule_id] = errors.get(rule_id, 0) + 1
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        lookups = self._shard().cache_lookups
+        key = (cache, "hit" if hit else "miss")
+        lookups[key] = lookups.get(key, 0) + 1
+
+    def cache_operation(self, operation: str, seconds: float, ok: bool) -> None:
+        """One call to a cache backend (e.g. a Redis GET) and whether it succeeded"""
+        operations = self._shard().cache_operations
+        key = (operation, "ok" if ok else "error")
+        entry = operations.get(key)
+        if entry is None:
+            operations[key] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def observe_route(self, method: str, route: str, status: int, seconds: float) -> None:
+        routes = self._shard().routes
+        key = (method, route, str(status))
+        histogram = routes.get(key)
+        if histogram is None:
+            histogram = routes[key] = [0, 0.0] + [0] * (len(ROUTE_BUCKETS) + 1)
+        _observe(histogram, ROUTE_BUCKETS, seconds)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Register a callable yielding (name, type, help, labels, value) samples at scrape time"""
+        self._collectors.append(collector)
+
+    # ---- exposition ----
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """All shards merged"""
+        with self._lock:
+            shards = list(self._shards)
+        merged: Dict[str, Dict] = {name: {} for name in _Shard.__slots__}
+        for shard in shards:
+            for name in _Shard.__slots__:
+                target = merged[name]
+                for key, value in list(getattr(shard, name).items()):
+                    if isinstance(value, list):
+                        current = target.get(key)
+                        target[key] = list(value) if current is None else [a + b for a, b in zip(current, value)]
+                    else:
+                        target[key] = target.get(key, 0) + value
+        return merged
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        data = self.snapshot()
+        lines: List[str] = []
+        rules = sorted(data["rules"].items())
+        _family(lines, "rules_evaluations_total", "counter", "Rule evaluations")
+        for rule_id, (calls, _) in rules:
+            _sample(lines, "rules_evaluations_total", {"rule": rule_id}, calls)
+        _family(lines, "rules_evaluation_seconds_total", "counter", "Time spent evaluating each rule (nested rules overlap)")
+        for rule_id, (_, seconds) in rules:
+            _sample(lines, "rules_evaluation_seconds_total", {"rule": rule_id}, seconds)
+        _family(lines, "rules_errors_total", "counter", "Rule evaluations that raised")
+        for rule_id, count in sorted(data["rule_errors"].items()):
+            _sample(lines, "rules_errors_total", {"rule": rule_id}, count)
+        _family(lines, "benefit_outcomes_total", "counter", "Benefit calculations by outcome (rejected = no entitlement)")
+        for (benefit, outcome), count in sorted(data["benefits"].items()):
+            _sample(lines, "benefit_outcomes_total", {"benefit": benefit, "outcome": outcome}, count)
+        _family(lines, "http_request_duration_seconds", "histogram", "Request latency by route template")
+        for (method, route, status), histogram in sorted(data["routes"].items()):
+            labels = {"method": method, "route": route, "status": status}
+            _histogram(lines, "http_request_duration_seconds", labels, ROUTE_BUCKETS, histogram)
+        _family(lines, "cache_lookups_total", "counter", "Cache lookups by result")
+        for (cache, result), count in sorted(data["cache_lookups"].items()):
+            _sample(lines, "cache_lookups_total", {"cache": cache, "result": result}, count)
+        operations = sorted(data["cache_operations"].items())
+        _family(lines, "cache_operations_total", "counter", "Cache backend calls by result")
+        for (operation, result), (calls, _) in operations:
+            _sample(lines, "cache_operations_total", {"operation": operation, "result": result}, calls)
+        _family(lines, "cache_operation_seconds_total", "counter", "Time spent in cache backend calls")
+        for (operation, result), (_, seconds) in operations:
+            _sample(lines, "cache_operation_seconds_total", {"operation": operation, "result": result}, seconds)
+
+        declared = set()
+        for collector in self._collectors:
+            for name, kind, help_text, labels, value in collector():
+                if name not in declared:
+                    declared.add(name)
+                    _family(lines, name, kind, help_text)
+                _sample(lines, name, labels, value)
+        return "\n".join(lines) + "\n"
+
+
+def _family(lines: List[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _sample(lines: List[str], name: str, labels: Dict[str, str], value: float) -> None:
+    lines.append(f"{name}{_labels(labels)} {value}")
+
+
+def _histogram(lines: List[str], name: str, labels: Dict[str, str], buckets: Tuple[float, ...], histogram: List[float]) -> None:
+    cumulative = 0
+    for bound, count in zip([repr(bound) for bound in buckets] + ["+Inf"], histogram[_FIRST_BUCKET:]):
+        cumulative += count
+        _sample(lines, f"{name}_bucket", {**labels, "le": bound}, cumulative)
+    _sample(lines, f"{name}_sum", labels, histogram[_SUM])
+    _sample(lines, f"{name}_count", labels, histogram[_COUNT])
+
+
+metrics = MetricsRegistry()
+
+
+# ============ INSTRUMENTATION ============
+
+def timed_rule(rule_id: str, granted: Optional[Callable[[Any], bool]] = None) -> Callable:
+    """
+    Decorator recording each call of a rule function under rule_id;
+    granted(result) classifies benefit results as granted or rejected
+    """
+    def decorate(function: Callable) -> Callable:
+        @wraps(function)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            start = perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except Exception:
+                metrics.rule_error(rule_id)
+                raise
+            metrics.observe_rule(rule_id, perf_counter() - start, None if granted is None else granted(result))
+            return result
+        return timed
+    return decorate
+
+
+def begin_request() -> Tuple[Dict[str, List[float]], Any]:
+    """Start collecting rule timings for the current request; returns (timings, reset token)"""
+    timings: Dict[str, List[float]] = {}
+    return timings, _request_rules.set(timings)
+
+
+def end_request(token: Any) -> None:
+    _request_rules.reset(token)
+
+
+def server_timing(timings: Dict[str, List[float]], total_seconds: float) -> str:
+    """Server-Timing header value: time per rule (nested rules overlap) and the request total"""
+    parts = [
+        f'{rule_id};dur={seconds * 1000:.3f};desc="{int(calls)} call{"" if calls == 1 else "s"}"'
+        for rule_id, (calls, seconds) in sorted(list(timings.items()))
+    ]
+    parts.append(f"total;dur={total_seconds * 1000:.3f}")
+    return ", ".join(parts)
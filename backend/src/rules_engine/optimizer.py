@@ -0,0 +1,130 @@
+"""
+Pension contribution and lump-sum optimizer
+Searches the whole (pension %, lump-sum %) grid for one household with the batch engine
+
+Two objectives are traded off:
+- cash now: net income plus the lump sum paid out this year
+- pension retained: pension contribution minus the lump sum withdrawn
+
+Their sum is gross income minus tax and premiums plus benefits, so the
+tax-optimal point is the grid point that maximizes it.
+"""
+
+from typing import Dict, List, Any
+from decimal import Decimal
+
+import numpy as np
+
+from .batch import calculate_net_income_batch
+from .parameters import DEFAULT_TAX_YEAR
+
+MAX_LUMP_SUM_PCT = 10.0  # Dutch pension law maximum
+DEFAULT_MAX_PENSION_PCT = 25.0
+DEFAULT_GRID_STEP = 0.1
+MAX_GRID_POINTS = 500000
+DEFAULT_FRONTIER_POINTS = 250
+
+_POINT_FIELDS = (
+    "pension_contribution_pct", "lump_sum_percentage", "pension_amount", "lump_sum_amount",
+    "income_tax", "aow_premium", "ww_premium", "total_benefits", "net_income"
+)
+
+
+def _axis(maximum: float, step: float, name: str) -> np.ndarray:
+    """Grid values 0, step, ... maximum in whole hundredths of a percent"""
+    step_hundredths = round(step * 100)
+    if step_hundredths <= 0 or abs(step * 100 - step_hundredths) > 1e-9:
+        raise ValueError(f"{name} step must be a positive multiple of 0.01")
+    if maximum < 0:
+        raise ValueError(f"{name} maximum must be non-negative")
+    return np.arange(0, round(maximum * 100) + 1, step_hundredths) / 100
+
+
+def optimize_pension(
+    gross_income: Decimal,
+    housing_costs: Decimal,
+    household_members: int,
+    children_count: int,
+    is_partner: bool = False,
+    tax_year: int = DEFAULT_TAX_YEAR,
+    max_pension_pct: float = DEFAULT_MAX_PENSION_PCT,
+    pension_step: float = DEFAULT_GRID_STEP,
+    lump_sum_step: float = DEFAULT_GRID_STEP,
+    frontier_points: int = DEFAULT_FRONTIER_POINTS
+) -> Dict[str, Any]:
+    """
+    Pareto frontier of cash now versus pension retained over the feasible grid,
+    plus the tax-optimal point
+
+    Fine grids put thousands of points on the frontier; frontier_points evenly
+    samples it (always keeping both ends), 0 returns all of them.
+    """
+    pension_axis = _axis(max_pension_pct, pension_step, "Pension")
+    lump_axis = _axis(MAX_LUMP_SUM_PCT, lump_sum_step, "Lump sum")
+    grid_size = pension_axis.size * lump_axis.size
+    if grid_size > MAX_GRID_POINTS:
+        raise ValueError(f"Grid has {grid_size} points (maximum {MAX_GRID_POINTS})")
+
+    pension_pct, lump_pct = np.meshgrid(pension_axis, lump_axis, indexing="ij")
+    results = calculate_net_income_batch(
+        gross_income=float(gross_income),
+        pension_contribution_pct=pension_pct.ravel(),
+        housing_costs=float(housing_costs),
+        household_members=household_members,
+        children_count=children_count,
+        is_partner=is_partner,
+        lump_sum_percentage=lump_pct.ravel(),
+        tax_year=tax_year
+    )
+
+    # Work in whole cents so ties compare exactly
+    cash_now = np.rint((results["net_income"] + results["lump_sum_amount"]) * 100).astype(np.int64)
+    retained = np.rint((results["pension_amount"] - results["lump_sum_amount"]) * 100).astype(np.int64)
+
+    frontier = _pareto_frontier(cash_now, retained)
+    optimal = int(np.lexsort((-retained, -(cash_now + retained)))[0])
+
+    def point(index: int) -> Dict[str, float]:
+        entry = {name: float(results[name][index]) for name in _POINT_FIELDS}
+        entry["cash_now"] = int(cash_now[index]) / 100
+        entry["pension_retained"] = int(retained[index]) / 100
+        entry["tax_and_premiums"] = round(
+            entry["income_tax"] + entry["aow_premium"] + entry["ww_premium"], 2
+        )
+        return entry
+
+    return {
+        "tax_year": tax_year,
+        "grid": {
+            "pension_pct": {"min": 0.0, "max": float(pension_axis[-1]), "step": pension_step},
+            "lump_sum_pct": {"min": 0.0, "max": float(lump_axis[-1]), "step": lump_sum_step},
+            "points": grid_size
+        },
+        "tax_optimal": point(optimal),
+        "frontier_size": len(frontier),
+        "pareto_frontier": [point(index) for index in _sample(frontier, frontier_points)]
+    }
+
+
+def _sample(indices: List[int], count: int) -> List[int]:
+    """Evenly spaced subset of count indices, including the first and last"""
+    if count <= 0 or len(indices) <= count:
+        return indices
+    if count == 1:
+        return indices[:1]
+    positions = np.unique(np.rint(np.linspace(0, len(indices) - 1, count)).astype(int))
+    return [indices[position] for position in positions]
+
+
+def _pareto_frontier(cash_now: np.ndarray, retained: np.ndarray) -> List[int]:
+    """
+    Indices of points not dominated on (cash_now, retained), ordered by
+    increasing pension retained; ties keep the first grid point
+    """
+    # Best cash first, then best retained; each point is on the frontier if it
+    # retains strictly more than every point with at least as much cash
+    order = np.lexsort((-retained, -cash_now))
+    sorted_retained = retained[order]
+    best_before = np.maximum.accumulate(np.concatenate(([np.iinfo(np.int64).min], sorted_retained[:-1])))
+    frontier = order[sorted_retained > best_before]
+    return frontier[::-1].tolist()
@@ -0,0 +1,155 @@
+"""
+Tax-year parameter tables
+Year-indexed registry of tax brackets, premium rates, allowances and benefit thresholds
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
+from types import MappingProxyType
+import hashlib
+import json
+
+DEFAULT_TAX_YEAR = 2025
+
+
+@dataclass(frozen=True)
+class TaxBracket:
+    """Income tax bracket with the tax due on all lower brackets precomputed"""
+    min: Decimal
+    max: Optional[Decimal]
+    rate: Decimal
+    base_tax: Decimal  # Sum of the (per-bracket quantized) tax of every lower bracket
+
+    @property
+    def full_tax(self) -> Optional[Decimal]:
+        """Tax due on this bracket when filled completely"""
+        if self.max is None:
+            return None
+        return ((self.max - self.min) * self.rate).quantize(Decimal("0.01"), ROUND_HALF_UP)
+
+
+@dataclass(frozen=True)
+class TaxYearParameters:
+    """All rule parameters for one tax year (immutable once loaded)"""
+    year: int
+    brackets: Tuple[TaxBracket, ...]
+    general_tax_allowance: Decimal
+    labour_tax_allowance: Decimal
+    elderly_tax_allowance: Decimal
+    aow_premium_rate: Decimal
+    ww_premium_rate: Decimal
+    huurtoeslag_income_thresholds: Mapping[str, Decimal]
+    huurtoeslag_max_housing_costs: Mapping[str, Decimal]  # Monthly
+    huurtoeslag_cost_share: Decimal
+    zorgtoeslag_income_thresholds: Mapping[str, Decimal]
+    zorgtoeslag_base_subsidy: Mapping[str, Decimal]
+    zorgtoeslag_income_floor: Decimal
+    zorgtoeslag_reduction_rate: Decimal
+    kindgebonden_income_threshold: Decimal
+    kindgebonden_budget_per_child: Decimal  # Per child per year
+    kindgebonden_supplement_income_limit: Decimal
+    kindgebonden_supplement_rate: Decimal
+    fingerprint: str = ""
+    notes: str = ""
+    _bracket_mins: Tuple[Decimal, ...] = field(default=(), repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TaxYearParameters":
+        """
+        Build a parameter set from its data-file form, precomputing each
+        bracket's cumulative tax at its lower bound
+        """
+        def dec(value: Any) -> Decimal:
+            return Decimal(str(value))
+
+        def table(values: Dict[str, Any]) -> Mapping[str, Decimal]:
+            return MappingProxyType({key: dec(value) for key, value in values.items()})
+
+        brackets = []
+        base_tax = Decimal(0)
+        for raw in sorted(data["tax_brackets"], key=lambda b: dec(b["min"])):
+            bracket = TaxBracket(
+                min=dec(raw["min"]),
+                max=dec(raw["max"]) if raw.get("max") is not None else None,
+                rate=dec(raw["rate"]),
+                base_tax=base_tax
+            )
+            brackets.append(bracket)
+            if bracket.max is not None:
+                base_tax += bracket.full_tax
+
+        for lower, upper in zip(brackets, brackets[1:]):
+            if lower.max != upper.min:
+                raise ValueError(f"Tax brackets for {data['year']} are not contiguous at {lower.max}")
+
+        benefits = data["benefits"]
+        canonical_source = json.dumps(data, sort_keys=True, default=str)
+        return cls(
+            year=int(data["year"]),
+            brackets=tuple(brackets),
+            general_tax_allowance=dec(data["allowances"]["general"]),
+            labour_tax_allowance=dec(data["allowances"]["labour"]),
+            elderly_tax_allowance=dec(data["allowances"]["elderly"]),
+            aow_premium_rate=dec(data["premiums"]["aow"]),
+            ww_premium_rate=dec(data["premiums"]["ww"]),
+            huurtoeslag_income_thresholds=table(benefits["huurtoeslag"]["income_thresholds"]),
+            huurtoeslag_max_housing_costs=table(benefits["huurtoeslag"]["max_housing_costs"]),
+            huurtoeslag_cost_share=dec(benefits["huurtoeslag"]["cost_share"]),
+            zorgtoeslag_income_thresholds=table(benefits["zorgtoeslag"]["income_thresholds"]),
+            zorgtoeslag_base_subsidy=table(benefits["zorgtoeslag"]["base_subsidy"]),
+            zorgtoeslag_income_floor=dec(benefits["zorgtoeslag"]["income_floor"]),
+            zorgtoeslag_reduction_rate=dec(benefits["zorgtoeslag"]["reduction_rate"]),
+            kindgebonden_income_threshold=dec(benefits["kindgebonden_budget"]["income_threshold"]),
+            kindgebonden_budget_per_child=dec(benefits["kindgebonden_budget"]["budget_per_child"]),
+            kindgebonden_supplement_income_limit=dec(benefits["kindgebonden_budget"]["supplement_income_limit"]),
+            kindgebonden_supplement_rate=dec(benefits["kindgebonden_budget"]["supplement_rate"]),
+            fingerprint=hashlib.sha256(canonical_source.encode()).hexdigest()[:16],
+            notes=data.get("notes", ""),
+            _bracket_mins=tuple(bracket.min for bracket in brackets)
+        )
+
+    @property
+    def total_tax_allowance(self) -> Decimal:
+        return self.general_tax_allowance + self.labour_tax_allowance
+
+    def bracket_index(self, taxable_income: Decimal) -> int:
+        """Index of the highest bracket reached by taxable_income (after allowances), -1 if none"""
+        return bisect_left(self._bracket_mins, taxable_income) - 1
+
+
+# ============ REGISTRY ============
+
+_REGISTRY: Dict[int, TaxYearParameters] = {}
+_fingerprint_cache: List[str] = []
+
+
+def register_parameters(parameters: TaxYearParameters) -> None:
+    """Register (or replace) the parameter set for a tax year"""
+    _REGISTRY[parameters.year] = parameters
+    _fingerprint_cache.clear()
+
+
+def get_parameters(year: Optional[int] = None) -> TaxYearParameters:
+    """Parameter set for a tax year, loading the bundled data files on first use"""
+    if not _REGISTRY:
+        from .loader import load_parameter_tables
+        load_parameter_tables()
+
+    year = DEFAULT_TAX_YEAR if year is None else int(year)
+    if year not in _REGISTRY:
+        raise ValueError(f"No parameters for tax year {year} (available: {available_years()})")
+    return _REGISTRY[year]
+
+
+def available_years() -> List[int]:
+    return sorted(_REGISTRY)
+
+
+def parameters_fingerprint() -> str:
+    """Combined fingerprint of every registered parameter set"""
+    if not _fingerprint_cache:
+        combined = ",".join(f"{year}:{_REGISTRY[year].fingerprint}" for year in sorted(_REGISTRY))
+        _fingerprint_cache.append(hashlib.sha256(combined.encode()).hexdigest()[:16])
+    return _fingerprint_cache[0]
@@ -0,0 +1,328 @@
+"""
+Piecewise-linear income model
+Compiles calculate_net_income for one household profile into linear segments over gross income
+
+For a fixed profile every field of calculate_net_income is linear in gross
+income between breakpoints. The breakpoints are derived symbolically from the
+parameter tables: tax bracket edges (shifted by the allowances) and the
+benefit thresholds, phase-outs and supplement limits. The model is exact up
+to the per-field cent rounding of the scalar path.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from bisect import bisect_right
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+
+from .memo import LRUCache
+from .parameters import TaxYearParameters, DEFAULT_TAX_YEAR, get_parameters
+
+# Fields of calculate_net_income that the model reproduces
+MODEL_FIELDS = (
+    "gross_income", "pension_amount", "lump_sum_amount", "taxable_income_with_lump_sum",
+    "income_tax", "aow_premium", "ww_premium", "total_deductions",
+    "huurtoeslag", "zorgtoeslag", "kindgebonden_budget", "total_benefits", "net_income"
+)
+
+# Fields that depend on taxable income through the rules (the rest are proportional to gross)
+_RULE_FIELDS = ("income_tax", "aow_premium", "ww_premium", "huurtoeslag", "zorgtoeslag", "kindgebonden_budget")
+
+MAX_SWEEP_POINTS = 10000
+
+Linear = Tuple[Decimal, Decimal]  # (slope, intercept)
+
+_ZERO: Linear = (Decimal(0), Decimal(0))
+_CENT = Decimal("0.01")
+
+
+@dataclass(frozen=True)
+class HouseholdProfile:
+    """Everything calculate_net_income takes except gross income"""
+    pension_contribution_pct: float = 0.0
+    lump_sum_percentage: float = 0.0
+    housing_costs: Decimal = Decimal(0)  # Monthly
+    household_members: int = 1
+    children_count: int = 0
+    is_partner: bool = False
+    tax_year: int = DEFAULT_TAX_YEAR
+
+
+@dataclass(frozen=True)
+class Breakpoint:
+    """Gross income at which at least one rule changes regime"""
+    gross_income: Decimal
+    taxable_income: Decimal
+    causes: Tuple[str, ...]
+    values: Dict[str, Decimal]
+
+
+@dataclass(frozen=True)
+class Segment:
+    """Open gross-income interval (start, end) on which every field is linear; end None is unbounded"""
+    start: Decimal
+    end: Optional[Decimal]
+    coefficients: Dict[str, Linear]
+
+    def evaluate(self, gross_income: Decimal) -> Dict[str, Decimal]:
+        return {name: slope * gross_income + intercept for name, (slope, intercept) in self.coefficients.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start": float(self.start),
+            "end": float(self.end) if self.end is not None else None,
+            "fields": {
+                name: {"slope": float(slope), "intercept": float(intercept)}
+                for name, (slope, intercept) in self.coefficients.items()
+            }
+        }
+
+
+class IncomeModel:
+    """
+    Compiled net-income curve of one household profile
+
+    breakpoints[i] is evaluated exactly (regimes flip at thresholds, so the
+    curve may jump there); segments[i] covers the open interval between
+    breakpoints[i] and breakpoints[i + 1].
+    """
+
+    def __init__(self, profile: HouseholdProfile, params: TaxYearParameters):
+        self.profile = profile
+        self.params = params
+        pct = Decimal(str(profile.pension_contribution_pct)) / Decimal(100)
+        lump = Decimal(str(profile.lump_sum_percentage)) / Decimal(10)
+        self._pension_rate = pct
+        self._lump_rate = pct * lump
+        # taxable income = gross - pension + lump sum = gross * taxable_rate
+        self.taxable_rate = 1 - pct + pct * lump
+        if self.taxable_rate <= 0:
+            raise ValueError("Pension contribution leaves no taxable income")
+
+        self.breakpoints: List[Breakpoint] = []
+        self.segments: List[Segment] = []
+        self._compile()
+        self._starts = [breakpoint.gross_income for breakpoint in self.breakpoints]
+        self._taxable_starts = [breakpoint.taxable_income for breakpoint in self.breakpoints]
+
+    # ============ COMPILATION ============
+
+    def _taxable_breakpoints(self) -> Dict[Decimal, List[str]]:
+        """Taxable incomes at which a rule changes regime, with the rules responsible"""
+        p = self.params
+        profile = self.profile
+        found: Dict[Decimal, List[str]] = {}
+
+        def add(taxable: Decimal, cause: str) -> None:
+            if taxable > 0:
+                found.setdefault(taxable, []).append(cause)
+
+        for index, bracket in enumerate(p.brackets):
+            add(p.total_tax_allowance + bracket.min, f"income_tax_bracket_{index + 1}")
+
+        if self._eligible_housing_costs() > 0:
+            add(p.huurtoeslag_income_thresholds[self._huurtoeslag_type()], "huurtoeslag_threshold")
+
+        zorg_type = self._zorgtoeslag_type()
+        add(p.zorgtoeslag_income_floor, "zorgtoeslag_phase_out_start")
+        add(
+            p.zorgtoeslag_income_floor + p.zorgtoeslag_base_subsidy[zorg_type] / p.zorgtoeslag_reduction_rate,
+            "zorgtoeslag_phase_out_end"
+        )
+        add(p.zorgtoeslag_income_thresholds[zorg_type], "zorgtoeslag_threshold")
+
+        if profile.children_count != 0:
+            add(p.kindgebonden_supplement_income_limit, "kindgebonden_supplement_limit")
+            add(p.kindgebonden_income_threshold, "kindgebonden_threshold")
+        return found
+
+    def _compile(self) -> None:
+        taxable_points = self._taxable_breakpoints()
+        points = [(Decimal(0), Decimal(0), ("start",))] + [
+            (taxable / self.taxable_rate, taxable, tuple(causes))
+            for taxable, causes in sorted(taxable_points.items())
+        ]
+
+        for index, (gross, taxable, causes) in enumerate(points):
+            self.breakpoints.append(Breakpoint(
+                gross_income=gross,
+                taxable_income=taxable,
+                causes=causes,
+                values=self._values_at(gross, taxable)
+            ))
+
+            end = points[index + 1][0] if index + 1 < len(points) else None
+            # Any interior point identifies the regime of the whole interval
+            probe = (taxable + points[index + 1][1]) / 2 if end is not None else taxable + 1
+            self.segments.append(Segment(start=gross, end=end, coefficients=self._coefficients(probe)))
+
+    def _coefficients(self, taxable_probe: Decimal) -> Dict[str, Linear]:
+        """Per-field (slope, intercept) in gross income for the regime active at taxable_probe"""
+        k = self.taxable_rate
+        in_gross = {
+            name: (slope * k, intercept)
+            for name, (slope, intercept) in self._rule_terms(taxable_probe).items()
+        }
+        in_gross["gross_income"] = (Decimal(1), Decimal(0))
+        in_gross["pension_amount"] = (self._pension_rate, Decimal(0))
+        in_gross["lump_sum_amount"] = (self._lump_rate, Decimal(0))
+        in_gross["taxable_income_with_lump_sum"] = (k, Decimal(0))
+
+        def combine(*terms: Tuple[int, str]) -> Linear:
+            return (
+                sum(sign * in_gross[name][0] for sign, name in terms),
+                sum(sign * in_gross[name][1] for sign, name in terms)
+            )
+
+        in_gross["total_deductions"] = combine(
+            (1, "pension_amount"), (1, "income_tax"), (1, "aow_premium"), (1, "ww_premium")
+        )
+        in_gross["total_benefits"] = combine(
+            (1, "huurtoeslag"), (1, "zorgtoeslag"), (1, "kindgebonden_budget")
+        )
+        in_gross["net_income"] = combine(
+            (1, "gross_income"), (-1, "total_deductions"), (1, "total_benefits")
+        )
+        return {name: in_gross[name] for name in MODEL_FIELDS}
+
+    def _values_at(self, gross: Decimal, taxable: Decimal) -> Dict[str, Decimal]:
+        """Exact field values at one point, using the regime active at exactly that taxable income"""
+        return {
+            name: slope * gross + intercept
+            for name, (slope, intercept) in self._coefficients(taxable).items()
+        }
+
+    # ============ RULES AS LINEAR TERMS OF TAXABLE INCOME ============
+
+    def _rule_terms(self, taxable: Decimal) -> Dict[str, Linear]:
+        """Per-rule (slope, intercept) in taxable income, mirroring the branches of calculator.py"""
+        p = self.params
+        profile = self.profile
+        terms = {name: _ZERO for name in _RULE_FIELDS}
+
+        # Income tax: precomputed lower-bracket tax plus the top bracket
+        index = p.bracket_index(max(Decimal(0), taxable - p.total_tax_allowance))
+        if index >= 0 and taxable > p.total_tax_allowance:
+            bracket = p.brackets[index]
+            terms["income_tax"] = (
+                bracket.rate,
+                bracket.base_tax - bracket.rate * (p.total_tax_allowance + bracket.min)
+            )
+
+        terms["aow_premium"] = (p.aow_premium_rate, Decimal(0))
+        terms["ww_premium"] = (p.ww_premium_rate, Decimal(0))
+
+        # Huurtoeslag: eligible costs * (threshold - income) / threshold * share
+        threshold = p.huurtoeslag_income_thresholds[self._huurtoeslag_type()]
+        if taxable <= threshold:
+            scale = self._eligible_housing_costs() * p.huurtoeslag_cost_share
+            terms["huurtoeslag"] = (-scale / threshold, scale)
+
+        # Zorgtoeslag: base subsidy, reduced above the income floor, floored at zero
+        zorg_type = self._zorgtoeslag_type()
+        if taxable <= p.zorgtoeslag_income_thresholds[zorg_type]:
+            base = p.zorgtoeslag_base_subsidy[zorg_type]
+            rate = p.zorgtoeslag_reduction_rate
+            if taxable <= p.zorgtoeslag_income_floor:
+                terms["zorgtoeslag"] = (Decimal(0), base)
+            elif base - rate * (taxable - p.zorgtoeslag_income_floor) > 0:
+                terms["zorgtoeslag"] = (-rate, base + rate * p.zorgtoeslag_income_floor)
+
+        # Kindgebonden budget: constant per regime
+        if profile.children_count != 0 and taxable <= p.kindgebonden_income_threshold:
+            total = Decimal(profile.children_count) * p.kindgebonden_budget_per_child
+            if taxable < p.kindgebonden_supplement_income_limit:
+                total += total * p.kindgebonden_supplement_rate
+            terms["kindgebonden_budget"] = (Decimal(0), total / Decimal(12))
+
+        return terms
+
+    def _huurtoeslag_type(self) -> str:
+        return "couple" if self.profile.household_members >= 2 else "single"
+
+    def _zorgtoeslag_type(self) -> str:
+        return "partner" if self.profile.is_partner else "single"
+
+    def _eligible_housing_costs(self) -> Decimal:
+        annual_costs = Decimal(str(self.profile.housing_costs)) * 12
+        return min(annual_costs, self.params.huurtoeslag_max_housing_costs[self._huurtoeslag_type()] * 12)
+
+    # ============ EVALUATION ============
+
+    def taxable_income(self, gross_income: Decimal) -> Decimal:
+        """Taxable income exactly as calculate_net_income derives it (rounded pension, unrounded lump sum)"""
+        pension = (gross_income * self._pension_rate).quantize(_CENT, ROUND_HALF_UP)
+        return gross_income - pension + gross_income * self._lump_rate
+
+    def _locate(self, gross_income: Decimal) -> Tuple[int, bool]:
+        """(index, exact) of the breakpoint or segment containing gross_income"""
+        if gross_income < 0:
+            raise ValueError("Gross income must be non-negative")
+        # Select the regime from the scalar path's taxable income so thresholds
+        # flip at the same cent; the linear terms then apply to gross income.
+        taxable = self.taxable_income(gross_income)
+        index = max(0, bisect_right(self._taxable_starts, taxable) - 1)
+        return index, self._taxable_starts[index] == taxable
+
+    def evaluate(self, gross_income: Decimal) -> Dict[str, Decimal]:
+        """All model fields at one gross income, rounded to cents"""
+        gross_income = Decimal(str(gross_income))
+        index, exact = self._locate(gross_income)
+        if exact:
+            values = self.breakpoints[index].values
+        else:
+            values = self.segments[index].evaluate(gross_income)
+        return {name: value.quantize(_CENT, ROUND_HALF_UP) for name, value in values.items()}
+
+    def segments_between(self, low: Decimal, high: Decimal) -> List[Segment]:
+        """Segments overlapping [low, high]"""
+        first = max(0, bisect_right(self._starts, low) - 1)
+        last = bisect_right(self._starts, high)
+        return self.segments[first:last]
+
+    def breakpoints_between(self, low: Decimal, high: Decimal) -> List[Breakpoint]:
+        return [b for b in self.breakpoints if low <= b.gross_income <= high]
+
+    def sweep(self, low: Decimal, high: Decimal, step: Decimal) -> List[Dict[str, float]]:
+        """Model fields at low, low + step, ... up to high"""
+        if step <= 0:
+            raise ValueError("Step must be positive")
+        if high < low:
+            raise ValueError("max_income must not be below min_income")
+        count = int((high - low) / step) + 1
+        if count > MAX_SWEEP_POINTS:
+            raise ValueError(f"Sweep would produce {count} points (maximum {MAX_SWEEP_POINTS})")
+
+        # Float coefficients per segment: the regime is still chosen exactly,
+        # only the final multiply-add runs in binary floating point
+        float_segments = [
+            [(name, float(slope), float(intercept)) for name, (slope, intercept) in segment.coefficients.items()]
+            for segment in self.segments
+        ]
+        points = []
+        for i in range(count):
+            gross = low + step * i
+            index, exact = self._locate(gross)
+            if exact:
+                point = {name: float(value.quantize(_CENT, ROUND_HALF_UP))
+                         for name, value in self.breakpoints[index].values.items()}
+            else:
+                x = float(gross)
+                point = {name: round(slope * x + intercept, 2) for name, slope, intercept in float_segments[index]}
+            points.append(point)
+        return points
+
+
+# ============ COMPILED MODEL CACHE ============
+
+_model_cache = LRUCache(maxsize=256)
+
+
+def compile_income_model(profile: HouseholdProfile) -> IncomeModel:
+    """Compiled model for a household profile, reused across calls"""
+    params = get_parameters(profile.tax_year)
+    key = (profile, params.fingerprint)
+    found, model = _model_cache.lookup(key)
+    if not found:
+        model = IncomeModel(profile, params)
+        _model_cache.set(key, model)
+    return model
@@ -0,0 +1,169 @@
+"""
+Rule evaluation tracing
+Fixed-capacity, optionally sampled trace buffer for the RulesEngine
+"""
+
+from typing import Any, Dict, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+from collections import deque
+from dataclasses import dataclass, is_dataclass
+from itertools import count
+
+TRACE_OFF = "off"
+TRACE_SAMPLED = "sampled"
+TRACE_FULL = "full"
+TRACE_MODES = (TRACE_OFF, TRACE_SAMPLED, TRACE_FULL)
+
+
+@dataclass(frozen=True)
+class TraceEntry:
+    """Immutable snapshot of one rule evaluation"""
+    rule_id: str
+    inputs: Tuple[Tuple[str, Any], ...]  # Only the context keys the rule actually read
+    result: Any
+    timestamp_ns: int  # time.monotonic_ns() at the start of the evaluation
+    duration_ns: int
+    writes: Tuple[Tuple[str, Any], ...] = ()  # Context keys the rule assigned, with their new values
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rule_id": self.rule_id,
+            "inputs": dict(self.inputs),
+            "writes": dict(self.writes),
+            "result": self.result,
+            "timestamp_ns": self.timestamp_ns,
+            "duration_ns": self.duration_ns
+        }
+
+
+class RecordingContext(MutableMapping):
+    """
+    Pass-through view of an evaluation context that records every key read
+    and written; writes reach the context exactly as they would untraced.
+    Membership tests are not recorded as reads.
+    """
+
+    __slots__ = ("_data", "reads", "writes")
+
+    def __init__(self, data: MutableMapping, reads: Dict[str, Any], writes: Dict[str, Any]):
+        self._data = data
+        self.reads = reads
+        self.writes = writes
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._data[key]
+        self.reads[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self.writes[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._data[key]
+        self.writes.pop(key, None)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def freeze(value: Any) -> Any:
+    """Compact immutable copy of a traced value (rule results collapse to their value)"""
+    if is_dataclass(value) and hasattr(value, "value"):
+        return freeze(value.value)
+    if isinstance(value, Mapping):
+        return tuple((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class TraceBuffer:
+    """
+    Ring buffer of TraceEntry snapshots
+
+    mode: "off" records nothing, "sampled" records one in every `sample_rate`
+    evaluations, "full" records all of them. Once `capacity` entries are held
+    the oldest are dropped.
+    """
+
+    def __init__(self, mode: str = TRACE_FULL, sample_rate: int = 1, capacity: int = 1024):
+        if mode not in TRACE_MODES:
+            raise ValueError(f"Unknown trace mode {mode!r}, expected one of {TRACE_MODES}")
+        if sample_rate < 1 or capacity < 1:
+            raise ValueError("sample_rate and capacity must be at least 1")
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.capacity = capacity
+        self.dropped = 0
+        self._entries: deque = deque(maxlen=capacity)
+        self._counter = count()
+
+    def should_trace(self) -> bool:
+        """Decide whether the next evaluation is recorded"""
+        if self.mode == TRACE_FULL:
+            return True
+        if self.mode == TRACE_OFF:
+            return False
+        return next(self._counter) % self.sample_rate == 0
+
+    def record(
+        self, rule_id: str, reads: Dict[str, Any], result: Any, start_ns: int, end_ns: int,
+        writes: Optional[Mapping[str, Any]] = None
+    ) -> None:
+        if len(self._entries) == self.capacity:
+            self.dropped += 1
+        self._entries.append(TraceEntry(
+            rule_id=rule_id,
+            inputs=tuple((key, freeze(value)) for key, value in reads.items()),
+            result=freeze(result),
+            timestamp_ns=start_ns,
+            duration_ns=end_ns - start_ns,
+            writes=tuple((key, freeze(value)) for key, value in writes.items()) if writes else ()
+        ))
+
+    def drain(self) -> List[TraceEntry]:
+        """Remove and return all buffered entries, oldest first"""
+        entries = []
+        while self._entries:
+            entries.append(self._entries.popleft())
+        return entries
+
+    def export(self) -> List[Dict[str, Any]]:
+        """Buffered entries as plain dicts, without clearing the buffer"""
+        return [entry.to_dict() for entry in list(self._entries)]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TraceView(Sequence):
+    """Live read-only view of a TraceBuffer, entries as dicts, oldest first"""
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self, buffer: TraceBuffer):
+        self._buffer = buffer
+
+    def __getitem__(self, index):
+        entries = self._buffer._entries
+        if isinstance(index, slice):
+            return [entry.to_dict() for entry in list(entries)[index]]
+        return entries[index].to_dict()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (entry.to_dict() for entry in list(self._buffer._entries))
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def __repr__(self) -> str:
+        return f"TraceView({list(self)!r})"
@@ -0,0 +1,161 @@
+"""
+External backends (database, Redis) connected in the background
+
+Startup does not wait for them: each backend connects in its own task,
+retrying with capped exponential backoff, and the readiness probe reports
+their state. The app serves requests meanwhile (the result cache runs
+L1-only until Redis is up).
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .cache import connect_cache, close_cache
+from .database import init_db, close_db
+
+DISABLED = "disabled"      # Not configured (empty URL)
+CONNECTING = "connecting"  # First attempt in progress
+RETRYING = "retrying"      # An attempt failed; waiting for or running the next one
+READY = "ready"
+
+
+class Backend:
+    """One external dependency, connected by a background task"""
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Awaitable[None]],
+        close: Callable[[], Awaitable[None]],
+        enabled: bool = True,
+        required: bool = False
+    ):
+        self.name = name
+        self.required = required
+        self.state = CONNECTING if enabled else DISABLED
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+        self.connected_after: Optional[float] = None  # seconds from start() to READY
+        self.next_attempt_in: Optional[float] = None
+        self._connect = connect
+        self._close = close
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state in (READY, DISABLED)
+
+    def start(self) -> None:
+        if self.state != DISABLED and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(time.monotonic()))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.state == READY:
+            await self._close()
+
+    async def _run(self, started: float) -> None:
+        delay = settings.backend_retry_initial_delay
+        while True:
+            self.attempts += 1
+            self.next_attempt_in = None
+            try:
+                await asyncio.wait_for(self._connect(), settings.backend_connect_timeout)
+            except Exception as e:
+                self.state = RETRYING
+                self.last_error = str(e) or type(e).__name__
+                # Full delay scaled by 0.5-1.0 so restarted replicas don't retry in lockstep
+                self.next_attempt_in = delay * (0.5 + random.random() / 2)
+                if self.attempts == 1:
+                    print(f"⚠️ {self.name} unavailable ({self.last_error}), retrying in the background")
+                await asyncio.sleep(self.next_attempt_in)
+                delay = min(delay * 2, settings.backend_retry_max_delay)
+                continue
+            self.state = READY
+            self.last_error = None
+            self.connected_after = round(time.monotonic() - started, 3)
+            return
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "connected_after_seconds": self.connected_after,
+            "next_attempt_in_seconds": round(self.next_attempt_in, 3) if self.next_attempt_in is not None else None
+        }
+
+
+def _required_backends() -> List[str]:
+    return [name.strip() for name in settings.readiness_backends.split(",") if name.strip()]
+
+
+backends: Dict[str, Backend] = {
+    "database": Backend(
+        "database", init_db, close_db,
+        enabled=bool(settings.database_url), required="database" in _required_backends()
+    ),
+    "redis": Backend(
+        "redis", connect_cache, close_cache,
+        enabled=bool(settings.redis_url), required="redis" in _required_backends()
+    ),
+}
+
+_started_at = time.monotonic()
+_startup_seconds: Optional[float] = None
+_stopping = False
+
+
+def start_backends() -> None:
+    """Begin connecting every configured backend; returns immediately"""
+    global _stopping
+    _stopping = False
+    for backend in backends.values():
+        backend.start()
+
+
+async def stop_backends() -> None:
+    await asyncio.gather(*(backend.stop() for backend in backends.values()))
+
+
+def mark_started() -> None:
+    """The app finished its own startup work (rules loaded, pools running)"""
+    global _startup_seconds
+    _startup_seconds = round(time.monotonic() - _started_at, 3)
+
+
+def mark_stopping() -> None:
+    """Fail readiness while shutting down so load balancers drain the instance"""
+    global _stopping
+    _stopping = True
+
+
+def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """(ready, report): started, not stopping, and every required backend connected"""
+    if _stopping:
+        status = "stopping"
+    elif _startup_seconds is None:
+        status = "starting"
+    elif not all(backend.ready for backend in backends.values() if backend.required):
+        status = "waiting_for_backends"
+    else:
+        status = "ready"
+    return status == "ready", {
+        "status": status,
+        "startup_seconds": _startup_seconds,
+        "backends": {name: backend.to_dict() for name, backend in backends.items()}
+    }
+
+
+def liveness() -> Dict[str, Any]:
+    return {"status": "alive", "uptime_seconds": round(time.monotonic() - _started_at, 3)}
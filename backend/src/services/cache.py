@@ -1,45 +1,321 @@
-"""Cache service using Redis"""
+"""
+Cache service using Redis
+
+Redis is reached through one bounded connection pool and guarded by a
+circuit breaker, so an unreachable instance costs requests nothing once the
+breaker has opened. Failures and latencies are counted in the metrics
+registry rather than logged per call.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from time import perf_counter
+import asyncio
+import importlib
+from decimal import Decimal
+import hashlib
+import json
+import time
+import zlib
 
-import redis.asyncio as redis
 from ..config import settings
+from ..rules_engine.calculator import ruleset_version
+from ..rules_engine.memo import LRUCache
+from ..rules_engine.metrics import metrics
 
 cache = None
+_pool = None
+
+# In-process L1 tier for calculation results; Redis is the shared L2 tier
+result_cache = LRUCache(settings.result_cache_l1_size, settings.result_cache_l1_ttl)
+
+# ============ CIRCUIT BREAKER ============
+
+CLOSED = "closed"        # Calls go through
+OPEN = "open"            # Calls are skipped until reset_timeout has passed
+HALF_OPEN = "half_open"  # One probe call is in flight
+
+class CircuitBreaker:
+    """
+    Stops calling a failing backend: after `threshold` consecutive failures
+    calls are skipped for `reset_timeout` seconds, then a single probe is let
+    through. The probe's success closes the breaker, its failure reopens it.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0       # Outages: closed -> open transitions
+        self.skipped = 0      # Calls not made while open
+        self.last_error: Optional[str] = None
+        self._clock = clock
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may be made now; while half-open only the probe may"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            return True
+        self.skipped += 1
+        return False
+
+    def success(self) -> None:
+        if self.state != CLOSED:
+            print("✅ Redis reachable again, resuming cache calls")
+        self.state = CLOSED
+        self.failures = 0
+
+    def failure(self, error: Exception) -> None:
+        self.failures += 1
+        self.last_error = str(error) or type(error).__name__
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            if self.state == CLOSED:
+                # Logged once per outage rather than per failed call
+                print(f"⚠️ Redis failing ({self.last_error}), skipping it for {self.reset_timeout}s at a time")
+                self.opened += 1
+            self.state = OPEN
+            self._opened_at = self._clock()
+
+    def abandoned(self) -> None:
+        """A call was cancelled before finishing; if it was the probe, let the next call probe"""
+        if self.state == HALF_OPEN:
+            self.state = OPEN
 
-async def init_cache():
-    """Initialize Redis cache"""
-    global cache
+    def reset(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened,
+            "skipped_calls": self.skipped,
+            "last_error": self.last_error
+        }
+
+breaker = CircuitBreaker(settings.redis_breaker_threshold, settings.redis_breaker_reset_timeout)
+
+# ============ CONNECTION ============
+
+async def connect_cache(client=None):
+    """
+    Connect to Redis and start using it as the L2 tier; raises if it cannot be reached.
+    redis is imported here, so deployments without Redis never load it.
+    """
+    global cache, _pool
     
+    pool = None
+    if client is None:
+        redis = await asyncio.to_thread(importlib.import_module, "redis.asyncio")
+        # Callers beyond max_connections wait up to the socket timeout for a free connection
+        pool = redis.BlockingConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.backend_connect_timeout,
+            socket_timeout=settings.redis_socket_timeout
+        )
+        client = redis.Redis(connection_pool=pool)
+    try:
+        await client.ping()
+    except BaseException:
+        # Also on cancellation (a connect timeout), so a failed attempt never leaks its pool
+        await _close(client, pool)
+        raise
+    cache, _pool = client, pool
+    breaker.reset()
+    print("✅ Redis cache initialized")
+
+async def init_cache(client=None):
+    """Initialize Redis cache (pass a client, e.g. a local fake, to skip connecting)"""
     try:
-        cache = await redis.from_url(settings.redis_url)
-        await cache.ping()
-        print("✅ Redis cache initialized")
+        await connect_cache(client)
     except Exception as e:
         print(f"⚠️ Redis initialization failed: {e}")
-        cache = None
 
-async def get_cached(key: str):
-    """Get value from cache"""
-    if not cache:
-        return None
-    
+async def close_cache():
+    """Stop using Redis and close its connections"""
+    global cache, _pool
+    client, pool = cache, _pool
+    cache = _pool = None
+    if client is not None:
+        await _close(client, pool)
+
+async def _close(client, pool=None) -> None:
+    close = getattr(client, "aclose", None) or getattr(client, "close", None)
+    try:
+        if close is not None:
+            await close()
+        if pool is not None:
+            await pool.disconnect()
+    except Exception:
+        pass
+
+async def _call(operation: str, action: Callable[[Any], Awaitable[Any]]) -> Tuple[bool, Any]:
+    """
+    Run action(client) against Redis unless it is unavailable or the breaker
+    is open; returns (done, result). Failures are counted, not raised.
+    """
+    client = cache
+    if client is None or not breaker.allow():
+        return False, None
+    started = perf_counter()
     try:
-        value = await cache.get(key)
-        if value:
-            return value.decode()
+        result = await action(client)
+    except asyncio.CancelledError:
+        breaker.abandoned()
+        raise
     except Exception as e:
-        print(f"Cache read error: {e}")
-    
+        metrics.cache_operation(operation, perf_counter() - started, False)
+        breaker.failure(e)
+        return False, None
+    metrics.cache_operation(operation, perf_counter() - started, True)
+    breaker.success()
+    return True, result
+
+def get_redis_stats() -> Dict[str, Any]:
+    pool = None
+    if _pool is not None:
+        pool = {
+            "max_connections": _pool.max_connections,
+            "open_connections": len(getattr(_pool, "_connections", ()))
+        }
+    return {"connected": cache is not None, "circuit": breaker.stats(), "pool": pool}
+
+# ============ KEY/VALUE ACCESS ============
+
+async def get_cached(key: str):
+    """Get value from cache"""
+    done, value = await _call("get", lambda client: client.get(key))
+    if done and value:
+        return value.decode()
     return None
 
 async def set_cached(key: str, value: str, ttl: int = 3600):
     """Set value in cache with TTL"""
-    if not cache:
-        return False
+    done, _ = await _call("set", lambda client: client.setex(key, ttl, value))
+    return done
+
+async def get_many(keys: List[str]) -> List[Optional[bytes]]:
+    """Raw values for several keys in one round trip (None where missing or unavailable)"""
+    if not keys:
+        return []
+    done, values = await _call("mget", lambda client: client.mget(keys))
+    return list(values) if done else [None] * len(keys)
+
+async def set_many(values: Dict[str, bytes], ttl: int = 3600) -> bool:
+    """Store several raw values with one TTL in a single pipelined round trip"""
+    if not values:
+        return True
+    
+    async def write(client) -> Any:
+        pipeline = client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipeline.setex(key, ttl, value)
+        return await pipeline.execute()
     
+    done, _ = await _call("set_many", write)
+    return done
+
+# ============ PAYLOAD ENCODING ============
+
+# Stored values start with a format byte. Entries written before the header
+# existed are plain JSON text and still decode.
+_COMPACT = b"\x01"  # Compact UTF-8 JSON
+_ZLIB = b"\x02"     # zlib-compressed compact JSON (payloads above the threshold, i.e. traces)
+
+def encode_payload(value: Any) -> bytes:
+    data = json.dumps(value, separators=(",", ":"), default=str).encode()
+    threshold = settings.redis_compress_threshold
+    if 0 < threshold <= len(data):
+        return _ZLIB + zlib.compress(data, 1)
+    return _COMPACT + data
+
+def decode_payload(raw: bytes) -> Any:
+    """Inverse of encode_payload; raises ValueError for unreadable payloads"""
+    header, data = raw[:1], raw[1:]
     try:
-        await cache.setex(key, ttl, value)
-        return True
-    except Exception as e:
-        print(f"Cache write error: {e}")
+        if header == _COMPACT:
+            return json.loads(data)
+        if header == _ZLIB:
+            return json.loads(zlib.decompress(data))
+        return json.loads(raw)
+    except zlib.error as e:
+        raise ValueError(f"Corrupt cache payload: {e}")
+
+# ============ CALCULATION RESULT CACHE ============
+
+def result_cache_key(namespace: str, inputs: Dict[str, Any]) -> str:
+    """
+    Canonical key for a calculation result: a hash of the normalized inputs
+    and the rule-set version, so a rules change never serves stale results
+    """
+    payload = json.dumps(
+        {"ruleset": ruleset_version(), "inputs": inputs},
+        sort_keys=True, separators=(",", ":"), default=_normalize_key_value
+    )
+    return f"result:{namespace}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+def _normalize_key_value(value: Any) -> str:
+    # Decimal("50000") and Decimal("50000.0") calculate identically
+    if isinstance(value, Decimal):
+        return str(value.normalize())
+    return str(value)
+
+async def get_cached_result(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a calculation result in L1, then Redis (promoting hits into L1).
+    Returned dicts are shared with the cache and must be treated as read-only.
+    """
+    return (await get_cached_results([key])).get(key)
+
+async def get_cached_results(keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    """get_cached_result for many keys, with one Redis round trip for all L1 misses"""
+    found: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for key in keys:
+        hit, value = result_cache.lookup(key)
+        metrics.cache_lookup("result_l1", hit)
+        if hit:
+            found[key] = value
+        elif key not in missing:
+            missing.append(key)
+    if not missing or cache is None:
+        return found
     
-    return False
+    done, raws = await _call("mget", lambda client: client.mget(missing))
+    if not done:
+        return found
+    for key, raw in zip(missing, raws):
+        value = None
+        if raw is not None:
+            try:
+                value = decode_payload(raw)
+            except ValueError:
+                metrics.cache_operation("decode", 0.0, False)
+        metrics.cache_lookup("result_l2", value is not None)
+        if value is not None:
+            result_cache.set(key, value)
+            found[key] = value
+    return found
+
+async def set_cached_result(key: str, value: Dict[str, Any]) -> None:
+    """Store a calculation result in both tiers"""
+    await set_cached_results({key: value})
+
+async def set_cached_results(values: Dict[str, Dict[str, Any]]) -> None:
+    """Store several calculation results in both tiers (one pipelined Redis write)"""
+    for key, value in values.items():
+        result_cache.set(key, value)
+    if cache is None:
+        return
+    if len(values) == 1:
+        (key, value), = values.items()
+        payload = encode_payload(value)
+        await _call("set", lambda client: client.setex(key, settings.result_cache_ttl, payload))
+    else:
+        await set_many({key: encode_payload(value) for key, value in values.items()}, settings.result_cache_ttl)
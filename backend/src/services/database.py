@@ -1,28 +1,47 @@
 """Database initialization and utilities"""
 
-import asyncpg
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import importlib
+
 from ..config import settings
 
 engine = None
 async_session_maker = None
 
 async def init_db():
-    """Initialize database connection"""
+    """
+    Create the engine and check that a connection can be opened (raises if not).
+    sqlalchemy and asyncpg are imported here, so deployments without a
+    database never load them.
+    """
     global engine, async_session_maker
-    
-    engine = create_async_engine(
-        settings.database_url.replace("postgresql", "postgresql+asyncpg"),
-        echo=settings.debug,
-    )
-    
-    async_session_maker = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
-    
+    # Loading sqlalchemy takes a few hundred ms; do it off the event loop
+    await asyncio.to_thread(importlib.import_module, "sqlalchemy.ext.asyncio")
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+    from sqlalchemy.orm import sessionmaker
+
+    if engine is None:
+        engine = create_async_engine(
+            settings.database_url.replace("postgresql", "postgresql+asyncpg"),
+            echo=settings.debug,
+            connect_args={"timeout": settings.backend_connect_timeout},
+        )
+        async_session_maker = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
     print("✅ Database initialized")
 
+async def close_db():
+    """Dispose of the connection pool"""
+    global engine, async_session_maker
+    if engine is not None:
+        await engine.dispose()
+        engine = async_session_maker = None
+
 async def get_session():
     """Get database session"""
     async with async_session_maker() as session:
@@ -0,0 +1,189 @@
+"""Execution layer: CPU-bound calculations run in a worker pool, off the event loop"""
+
+import asyncio
+import contextvars
+import math
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+
+POOL_THREAD = "thread"    # Keeps the loop responsive; calculations share the GIL and in-process caches
+POOL_PROCESS = "process"  # True parallelism; arguments and results are pickled
+POOL_INLINE = "inline"    # Runs on the event loop (debugging, single-request tools)
+POOL_MODES = (POOL_THREAD, POOL_PROCESS, POOL_INLINE)
+
+
+class PoolSaturated(HTTPException):
+    """503 returned immediately when the calculation queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail="Calculation capacity exhausted, retry later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class CalculationPool:
+    """
+    Bounded worker pool for CPU-bound calculations.
+
+    At most workers calculations run and max_queue wait; anything beyond
+    that is rejected with PoolSaturated instead of queueing without bound,
+    so latency stays flat under overload. A slot is held until the worker
+    finishes, even when the waiting request has gone away.
+    """
+
+    def __init__(self, mode: str, workers: int, max_queue: int):
+        if mode not in POOL_MODES:
+            raise ValueError(f"Unknown calculation pool '{mode}' (expected one of {POOL_MODES})")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_queue_depth = 0
+        self._pending = 0
+        self._mean_seconds = 0.0  # EWMA of time in the pool, for Retry-After
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        """Create the executor (done lazily on first use otherwise)"""
+        if self._executor is not None or self.mode == POOL_INLINE:
+            return
+        if self.mode == POOL_PROCESS:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="calculation")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._pending - self.workers)
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead of a new request has likely drained"""
+        backlog = self._pending * self._mean_seconds / self.workers
+        return max(1, math.ceil(backlog))
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) in the pool; raises PoolSaturated when full"""
+        if self._pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PoolSaturated(self.retry_after())
+        if self.mode == POOL_INLINE:
+            return fn(*args, **kwargs)
+
+        self.start()
+        self.submitted += 1
+        self._pending += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        started = time.perf_counter()
+
+        def release(_: asyncio.Future) -> None:
+            self._pending -= 1
+            self.completed += 1
+            self._mean_seconds += (time.perf_counter() - started - self._mean_seconds) * 0.1
+
+        call = partial(fn, *args, **kwargs)
+        if self.mode == POOL_THREAD:
+            # Run in the request's context so per-request state (e.g. Server-Timing) sees the work
+            call = partial(contextvars.copy_context().run, call)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+        future.add_done_callback(release)
+        # shield: a disconnected client must not free the slot while its worker still runs
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": min(self._pending, self.workers),
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "mean_run_ms": round(self._mean_seconds * 1000, 3)
+        }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a periodic sleeper (time it spent blocked)"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.samples = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.mean_lag = 0.0  # EWMA
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled)
+            self.samples += 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.mean_lag += (lag - self.mean_lag) * 0.1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "last_ms": round(self.last_lag * 1000, 3),
+            "mean_ms": round(self.mean_lag * 1000, 3),
+            "max_ms": round(self.max_lag * 1000, 3)
+        }
+
+
+calculation_pool = CalculationPool(
+    settings.calculation_pool,
+    settings.calculation_workers or os.cpu_count() or 1,
+    settings.calculation_queue_size
+)
+loop_lag = LoopLagMonitor()
+
+
+async def start_execution() -> None:
+    """Create the calculation pool and start sampling event-loop lag"""
+    calculation_pool.start()
+    loop_lag.start()
+
+
+async def stop_execution() -> None:
+    await loop_lag.stop()
+    calculation_pool.shutdown()
+
+
+def get_execution_stats() -> Dict[str, Any]:
+    return {"calculation_pool": calculation_pool.stats(), "event_loop_lag": loop_lag.stats()}
@@ -0,0 +1,350 @@
+"""
+Streaming household ingestion: CSV rows with ScenarioRequest fields in,
+enriched rows (inputs plus calculated results) out
+
+Rows are handled a chunk at a time, so memory use is bounded by the chunk
+size whatever the file size. Each chunk is validated in bulk against
+ScenarioRequest and calculated with the batch engine; rows that cannot be
+parsed, validated or calculated go to the reject stream with their row
+number and reasons instead of aborting the run.
+"""
+
+import codecs
+import csv
+import re
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+
+from ..config import settings
+from ..models.schemas import ScenarioRequest
+from ..rules_engine.batch import calculate_net_income_batch
+from ..rules_engine.calculator import net_income_calculator
+from ..rules_engine.parameters import available_years
+
+RESULT_FIELDS = (
+    "pension_amount", "taxable_income", "income_tax", "aow_premium", "ww_premium",
+    "total_deductions", "huurtoeslag", "zorgtoeslag", "kindgebonden_budget",
+    "total_benefits", "net_income", "effective_tax_rate"
+)
+REQUIRED_COLUMNS = tuple(
+    name for name, field in ScenarioRequest.model_fields.items() if field.is_required()
+)
+
+# (row number, raw CSV values)
+Record = Tuple[int, List[str]]
+
+_scenario_list = TypeAdapter(List[ScenarioRequest])
+_calculate_net_income = net_income_calculator(settings.calculation_arithmetic)
+
+
+class IngestError(ValueError):
+    """The upload as a whole is unusable (e.g. no header or missing required columns)"""
+
+
+# ============ PARSING ============
+
+def check_header(header: List[str]) -> List[str]:
+    header = [name.strip() for name in header]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise IngestError(f"CSV header is missing required column(s): {', '.join(missing)}")
+    return header
+
+
+_UNQUOTED_SPECIAL = re.compile(r"[,\n]")
+
+# Quote states of CsvRecordSplitter, as in the csv module's parser
+_FIELD_START, _IN_FIELD, _IN_QUOTES, _QUOTE_IN_QUOTES, _SKIPPING = range(5)
+
+
+class CsvRecordSplitter:
+    """
+    Splits streamed CSV text into complete records
+
+    Quotes are tracked the way csv.reader (non-strict) reads them: a quote
+    opens a quoted field only at the start of a field, so a stray quote
+    inside a field (O"Brien) is plain text. A newline ends a record only
+    outside a quoted field, so quoted fields may contain newlines. The quote
+    state carries over between feeds and each character is looked at once.
+
+    A record longer than csv.field_size_limit() is not kept: it is emitted
+    as a csv.Error and the splitter resyncs at the next newline.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._size = 0
+        self._state = _FIELD_START
+        self._limit = csv.field_size_limit()
+
+    def feed(self, text: str) -> List[Union[str, csv.Error]]:
+        records: List[Union[str, csv.Error]] = []
+        pos, end = 0, len(text)
+        while pos < end:
+            state = self._state
+            if state == _SKIPPING:
+                newline = text.find("\n", pos)
+                if newline < 0:
+                    return records
+                self._state = _FIELD_START
+                pos = newline + 1
+            elif state == _FIELD_START:
+                if text[pos] == '"':
+                    self._state = _IN_QUOTES
+                    pos = self._take(text, pos, pos + 1, records)
+                else:
+                    self._state = _IN_FIELD
+            elif state == _IN_FIELD:
+                match = _UNQUOTED_SPECIAL.search(text, pos)
+                if match is None:
+                    pos = self._take(text, pos, end, records)
+                elif match.group() == ",":
+                    self._state = _FIELD_START
+                    pos = self._take(text, pos, match.end(), records)
+                else:
+                    pos = self._end_record(text, pos, match.start(), records)
+            elif state == _IN_QUOTES:
+                closing = text.find('"', pos)
+                if closing < 0:
+                    pos = self._take(text, pos, end, records)
+                else:
+                    self._state = _QUOTE_IN_QUOTES
+                    pos = self._take(text, pos, closing + 1, records)
+            else:  # _QUOTE_IN_QUOTES: a doubled quote, the end of the field or (non-strict) more text
+                char = text[pos]
+                if char == "\n":
+                    pos = self._end_record(text, pos, pos, records)
+                else:
+                    self._state = {'"': _IN_QUOTES, ",": _FIELD_START}.get(char, _IN_FIELD)
+                    pos = self._take(text, pos, pos + 1, records)
+        return records
+
+    def finish(self) -> List[Union[str, csv.Error]]:
+        remainder = "".join(self._parts)
+        skipping = self._state == _SKIPPING
+        self._parts, self._size, self._state = [], 0, _FIELD_START
+        return [remainder] if not skipping and remainder.strip() else []
+
+    def _take(self, text: str, start: int, end: int, records: List[Union[str, csv.Error]]) -> int:
+        """Add text[start:end] to the pending record; returns end"""
+        self._size += end - start
+        if self._size > self._limit:
+            records.append(csv.Error(f"record larger than field limit ({self._limit})"))
+            self._parts, self._size, self._state = [], 0, _SKIPPING
+        else:
+            self._parts.append(text[start:end])
+        return end
+
+    def _end_record(self, text: str, start: int, newline: int, records: List[Union[str, csv.Error]]) -> int:
+        """Complete the pending record with text[start:newline]; returns the position after the newline"""
+        self._take(text, start, newline, records)
+        if self._state != _SKIPPING:
+            records.append("".join(self._parts))
+            self._parts, self._size = [], 0
+        self._state = _FIELD_START
+        return newline + 1
+
+
+def _parse_record(text: str) -> List[str]:
+    return next(csv.reader([text.rstrip("\r")]), [])
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[Optional[List[str]], Record]]:
+    """
+    Yield (header, record) for every data row of a streamed CSV body;
+    blank lines are skipped and rows are numbered from 1
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    splitter = CsvRecordSplitter()
+    header: Optional[List[str]] = None
+    row = 0
+
+    async def records_from(texts: List[Union[str, csv.Error]]):
+        nonlocal header, row
+        for text in texts:
+            if isinstance(text, csv.Error):
+                if header is None:
+                    raise IngestError(f"Malformed CSV header: {text}")
+                row += 1
+                yield header, (row, [f"\0{text}"])
+                continue
+            if not text.strip():
+                continue
+            if header is None:
+                try:
+                    header = check_header(_parse_record(text))
+                except csv.Error as e:
+                    raise IngestError(f"Malformed CSV header: {e}")
+                continue
+            row += 1
+            try:
+                yield header, (row, _parse_record(text))
+            except csv.Error as e:
+                yield header, (row, [f"\0{e}"])
+
+    async for chunk in chunks:
+        async for item in records_from(splitter.feed(utf8.decode(chunk))):
+            yield item
+    async for item in records_from(splitter.feed(utf8.decode(b"", final=True)) + splitter.finish()):
+        yield item
+    if header is None:
+        raise IngestError("CSV body has no header row")
+
+
+def iter_csv_file(handle: Iterable[str]) -> Tuple[List[str], Iterator[Record]]:
+    """Header and numbered data rows of an open CSV file (opened with newline="")"""
+    reader = csv.reader(handle)
+    header = next((values for values in reader if any(value.strip() for value in values)), None)
+    if header is None:
+        raise IngestError("CSV file has no header row")
+    header = check_header(header)
+
+    def records() -> Iterator[Record]:
+        row = 0
+        while True:
+            try:
+                values = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                values = [f"\0{e}"]
+            if not any(value.strip() for value in values):
+                continue
+            row += 1
+            yield row, values
+
+    return header, records()
+
+
+def chunked(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ============ VALIDATION AND CALCULATION ============
+
+def _reject(row: int, raw: Dict[str, Any], errors: List[str]) -> Dict[str, Any]:
+    return {"row": row, "errors": errors, "raw": raw}
+
+
+def process_chunk(header: List[str], records: List[Record]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Validate and calculate one chunk of rows
+    Returns (enriched rows, rejects), each in row order
+    """
+    rejects: Dict[int, Dict[str, Any]] = {}
+    candidates: List[Tuple[int, Dict[str, str]]] = []
+    for row, values in records:
+        if len(values) == 1 and values[0].startswith("\0"):
+            rejects[row] = _reject(row, {}, [f"Malformed CSV: {values[0][1:]}"])
+        elif len(values) != len(header):
+            raw = dict(zip(header, values))
+            rejects[row] = _reject(row, raw, [f"Expected {len(header)} fields, got {len(values)}"])
+        else:
+            candidates.append((row, dict(zip(header, values))))
+
+    # Empty cells fall back to the schema defaults
+    inputs = [{name: value for name, value in raw.items() if value.strip()} for _, raw in candidates]
+    errors: Dict[int, List[str]] = {}
+    try:
+        requests = _scenario_list.validate_python(inputs)
+    except ValidationError as e:
+        for error in e.errors():
+            position = error["loc"][0]
+            field = ".".join(str(part) for part in error["loc"][1:])
+            errors.setdefault(position, []).append(f"{field}: {error['msg']}" if field else error["msg"])
+        valid_positions = [position for position in range(len(inputs)) if position not in errors]
+        requests = _scenario_list.validate_python([inputs[position] for position in valid_positions])
+        requests = dict(zip(valid_positions, requests))
+    else:
+        requests = dict(enumerate(requests))
+
+    years = set(available_years())
+    for position, request in list(requests.items()):
+        if request.tax_year not in years:
+            errors.setdefault(position, []).append(f"tax_year: no parameters for {request.tax_year}")
+            del requests[position]
+    for position, messages in errors.items():
+        row, raw = candidates[position]
+        rejects[row] = _reject(row, raw, messages)
+
+    results = _calculate(requests)
+    enriched = []
+    for position, (row, raw) in enumerate(candidates):
+        if position not in requests:
+            continue
+        result = results.get(position)
+        if isinstance(result, str):
+            rejects[row] = _reject(row, raw, [f"Calculation error: {result}"])
+            continue
+        enriched.append({"row": row, **raw, **result})
+    return enriched, [rejects[row] for row in sorted(rejects)]
+
+
+def _calculate(requests: Dict[int, ScenarioRequest]) -> Dict[int, Any]:
+    """
+    Result fields per position (or an error message), with the same household
+    mapping as POST /scenarios; vectorized per tax year, row by row for
+    values too precise for the batch engine
+    """
+    results: Dict[int, Any] = {}
+    by_year: Dict[int, List[int]] = {}
+    for position, request in requests.items():
+        if _batchable(request):
+            by_year.setdefault(request.tax_year, []).append(position)
+        else:
+            results[position] = _calculate_one(request)
+
+    for year, positions in by_year.items():
+        chunk = [requests[position] for position in positions]
+        try:
+            batch = calculate_net_income_batch(
+                gross_income=np.array([float(request.base_income) for request in chunk]),
+                pension_contribution_pct=np.array([request.pension_contribution_percentage for request in chunk]),
+                housing_costs=np.array([float(request.housing_costs) for request in chunk]),
+                household_members=1,
+                children_count=np.array([request.children_count for request in chunk]),
+                is_partner=np.array([request.marital_status != "single" for request in chunk]),
+                tax_year=year
+            )
+        except ValueError:
+            for position in positions:
+                results[position] = _calculate_one(requests[position])
+            continue
+        columns = {name: batch[name].tolist() for name in RESULT_FIELDS}
+        for offset, position in enumerate(positions):
+            results[position] = {name: columns[name][offset] for name in RESULT_FIELDS}
+    return results
+
+
+def _batchable(request: ScenarioRequest) -> bool:
+    """Whole cents and hundredths of a percent, as the batch engine requires"""
+    return (
+        request.base_income == round(request.base_income, 2)
+        and request.housing_costs == round(request.housing_costs, 2)
+        and abs(request.pension_contribution_percentage * 100 - round(request.pension_contribution_percentage * 100)) < 1e-9
+    )
+
+
+def _calculate_one(request: ScenarioRequest) -> Any:
+    try:
+        result = _calculate_net_income(
+            gross_income=request.base_income,
+            pension_contribution_pct=request.pension_contribution_percentage,
+            housing_costs=request.housing_costs,
+            household_members=1,
+            children_count=request.children_count,
+            is_partner=request.marital_status != "single",
+            tax_year=request.tax_year
+        )
+    except Exception as e:
+        return str(e)
+    return {name: result[name] for name in RESULT_FIELDS}
@@ -0,0 +1,355 @@
+"""
+Population run jobs: millions of synthetic households, calculated in chunks
+
+A job is a population spec plus a seed. Chunk i of the population is drawn
+from its own seeded generator, calculated with the batch engine and written
+as one .npy file per column (memory-mappable with np.load(mmap_mode="r")).
+A chunk directory appears by atomic rename only once all its columns are on
+disk, and job.json is replaced atomically after every chunk, so a restart
+loses at most the chunk in progress; unfinished jobs resume where they
+stopped. The API process never holds more than one chunk per running job.
+
+Layout:
+    <jobs_dir>/<job_id>/job.json
+    <jobs_dir>/<job_id>/chunks/000000/<column>.npy
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..config import settings
+from ..rules_engine.batch import BATCH_FIELDS, calculate_net_income_batch
+from ..rules_engine.parameters import DEFAULT_TAX_YEAR, get_parameters
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+MAX_RESULT_PAGE = 10000
+
+# Household inputs stored next to the batch result fields
+INPUT_COLUMNS = ("household_members", "children_count", "is_partner", "housing_costs")
+RESULT_COLUMNS = INPUT_COLUMNS + BATCH_FIELDS
+
+# Population spec fields: name -> (default, decimals for drawn values)
+_POPULATION_FIELDS = {
+    "gross_income": ({"min": 0, "max": 150000}, 2),
+    "pension_contribution_percentage": (5.0, 2),
+    "lump_sum_percentage": (0, 2),
+    "housing_costs": ({"min": 0, "max": 1500}, 2),
+    "household_members": ([1, 2], 0),
+    "children_count": ([0, 1, 2, 3], 0),
+    "is_partner": ([False, True], 0)
+}
+
+
+# ============ POPULATION ============
+
+def normalize_spec(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Validated population spec with defaults applied"""
+    households = int(spec.get("households", 0))
+    if not 0 < households <= settings.job_max_households:
+        raise ValueError(f"households must be between 1 and {settings.job_max_households}")
+    chunk_size = int(spec.get("chunk_size", settings.job_chunk_size))
+    if not 0 < chunk_size <= settings.job_chunk_size:
+        raise ValueError(f"chunk_size must be between 1 and {settings.job_chunk_size}")
+
+    normalized = {
+        "households": households,
+        "chunk_size": chunk_size,
+        "seed": int(spec.get("seed", 0)),
+        "tax_year": get_parameters(spec.get("tax_year", DEFAULT_TAX_YEAR)).year
+    }
+    for name, (default, _) in _POPULATION_FIELDS.items():
+        value = spec.get(name, default)
+        if isinstance(value, dict):
+            if set(value) != {"min", "max"} or not float(value["min"]) <= float(value["max"]):
+                raise ValueError(f"{name} range must be {{\"min\": a, \"max\": b}} with a <= b")
+        elif isinstance(value, list):
+            if not value:
+                raise ValueError(f"{name} choices must not be empty")
+        elif not isinstance(value, (int, float)):
+            raise ValueError(f"{name} must be a number, a list of choices or a min/max range")
+        normalized[name] = value
+    return normalized
+
+
+def _draw(rng: np.random.Generator, value: Any, decimals: int, size: int) -> np.ndarray:
+    if isinstance(value, dict):
+        drawn = rng.uniform(float(value["min"]), float(value["max"]), size)
+        return np.round(drawn, decimals) if decimals else np.rint(drawn).astype(np.int64)
+    if isinstance(value, list):
+        return rng.choice(np.asarray(value), size)
+    return np.full(size, value)
+
+
+def chunk_count(spec: Dict[str, Any]) -> int:
+    return -(-spec["households"] // spec["chunk_size"])
+
+
+def generate_chunk(spec: Dict[str, Any], index: int) -> Dict[str, np.ndarray]:
+    """Households of chunk index; the same spec and index always give the same households"""
+    start = index * spec["chunk_size"]
+    size = min(spec["chunk_size"], spec["households"] - start)
+    rng = np.random.default_rng([spec["seed"], index])
+    return {
+        name: _draw(rng, spec[name], decimals, size)
+        for name, (_, decimals) in _POPULATION_FIELDS.items()
+    }
+
+
+def calculate_chunk(spec: Dict[str, Any], index: int) -> Dict[str, np.ndarray]:
+    """Generated inputs and batch results of one chunk, as columns"""
+    households = generate_chunk(spec, index)
+    results = calculate_net_income_batch(
+        gross_income=households["gross_income"],
+        pension_contribution_pct=households["pension_contribution_percentage"],
+        housing_costs=households["housing_costs"],
+        household_members=households["household_members"],
+        children_count=households["children_count"],
+        is_partner=households["is_partner"],
+        lump_sum_percentage=households["lump_sum_percentage"],
+        tax_year=spec["tax_year"]
+    )
+    columns = {
+        "household_members": households["household_members"].astype(np.int8),
+        "children_count": households["children_count"].astype(np.int8),
+        "is_partner": households["is_partner"].astype(bool),
+        "housing_costs": households["housing_costs"].astype(np.float64)
+    }
+    columns.update(results)
+    return columns
+
+
+# ============ STORAGE ============
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(data, handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+
+
+class Job:
+    """One population run and its on-disk chunks"""
+
+    def __init__(self, directory: str, state: Dict[str, Any]):
+        self.directory = directory
+        self.state = state
+        self.cancel_requested = False
+
+    @property
+    def id(self) -> str:
+        return self.state["id"]
+
+    @property
+    def spec(self) -> Dict[str, Any]:
+        return self.state["spec"]
+
+    def chunk_dir(self, index: int) -> str:
+        return os.path.join(self.directory, "chunks", f"{index:06d}")
+
+    def chunk_path(self, index: int, column: str) -> str:
+        return os.path.join(self.chunk_dir(index), f"{column}.npy")
+
+    def finished_chunks(self) -> int:
+        """Leading run of chunks fully on disk (chunks are written in order)"""
+        count = 0
+        while count < self.state["chunks_total"] and os.path.isdir(self.chunk_dir(count)):
+            count += 1
+        return count
+
+    def rows_available(self) -> int:
+        return min(self.state["chunks_done"] * self.spec["chunk_size"], self.spec["households"])
+
+    def save(self) -> None:
+        self.state["updated_at"] = datetime.now().isoformat()
+        _write_json(os.path.join(self.directory, "job.json"), self.state)
+
+    def write_chunk(self, index: int) -> None:
+        """Calculate chunk index and publish it with one atomic rename"""
+        columns = calculate_chunk(self.spec, index)
+        final = self.chunk_dir(index)
+        staging = f"{final}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for name, values in columns.items():
+            np.save(os.path.join(staging, f"{name}.npy"), values)
+        os.rename(staging, final)
+
+    def read_rows(self, offset: int, limit: int, columns: List[str]) -> Dict[str, List[Any]]:
+        """Column slices for rows [offset, offset + limit), read through memory maps"""
+        chunk_size = self.spec["chunk_size"]
+        end = min(offset + limit, self.rows_available())
+        result: Dict[str, List[Any]] = {name: [] for name in columns}
+        position = offset
+        while position < end:
+            index, start = divmod(position, chunk_size)
+            stop = min(chunk_size, start + end - position)
+            for name in columns:
+                values = np.load(self.chunk_path(index, name), mmap_mode="r")
+                result[name].extend(values[start:stop].tolist())
+            position += stop - start
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            **state,
+            "cancel_requested": self.cancel_requested,
+            "progress": state["chunks_done"] / state["chunks_total"],
+            "rows_available": self.rows_available(),
+            "columns": list(RESULT_COLUMNS)
+        }
+
+
+# ============ JOB MANAGER ============
+
+class JobManager:
+    """
+    Runs queued jobs in the background, at most concurrency at a time
+
+    Chunk calculations run on a dedicated thread pool so population runs
+    never take slots from interactive requests.
+    """
+
+    def __init__(self, directory: str, concurrency: int = 1):
+        self.directory = directory
+        self.concurrency = max(1, concurrency)
+        self.jobs: Dict[str, Job] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def start(self) -> int:
+        """Load jobs from disk and resume unfinished ones; returns how many resumed"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job")
+        self._slots = asyncio.Semaphore(self.concurrency)
+        resumed = 0
+        for job_id in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, job_id, "job.json")
+            if not os.path.exists(path):
+                continue
+            with open(path) as handle:
+                job = Job(os.path.dirname(path), json.load(handle))
+            self.jobs[job.id] = job
+            if job.state["status"] in ACTIVE_STATUSES:
+                # Chunks published before the restart are kept; staging leftovers are redone
+                job.state["chunks_done"] = job.finished_chunks()
+                job.state["status"] = QUEUED
+                job.save()
+                self._schedule(job)
+                resumed += 1
+        return resumed
+
+    async def stop(self) -> None:
+        """Stop running jobs; they stay queued on disk and resume on the next start"""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        for task in list(self._tasks.values()):
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def submit(self, spec: Dict[str, Any]) -> Job:
+        if self._executor is None:
+            raise RuntimeError("Job manager is not running")
+        spec = normalize_spec(spec)
+        job_id = str(uuid.uuid4())
+        directory = os.path.join(self.directory, job_id)
+        os.makedirs(os.path.join(directory, "chunks"))
+        now = datetime.now().isoformat()
+        job = Job(directory, {
+            "id": job_id,
+            "status": QUEUED,
+            "spec": spec,
+            "chunks_total": chunk_count(spec),
+            "chunks_done": 0,
+            "created_at": now,
+            "updated_at": now,
+            "error": None
+        })
+        job.save()
+        self.jobs[job_id] = job
+        self._schedule(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job:
+        """Stop after the chunk in progress; finished chunks stay readable"""
+        job = self.jobs[job_id]
+        if job.state["status"] in ACTIVE_STATUSES:
+            job.cancel_requested = True
+            if job.state["status"] == QUEUED:
+                job.state["status"] = CANCELLED
+                job.save()
+        return job
+
+    async def delete(self, job_id: str) -> None:
+        job = self.jobs.pop(job_id)
+        job.cancel_requested = True
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.wait([task])
+        shutil.rmtree(job.directory, ignore_errors=True)
+
+    def _schedule(self, job: Job) -> None:
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+
+    async def _run(self, job: Job) -> None:
+        async with self._slots:
+            if job.cancel_requested or job.state["status"] != QUEUED:
+                return
+            job.state["status"] = RUNNING
+            job.save()
+            loop = asyncio.get_running_loop()
+            try:
+                while job.state["chunks_done"] < job.state["chunks_total"]:
+                    if job.cancel_requested:
+                        job.state["status"] = CANCELLED
+                        break
+                    await loop.run_in_executor(self._executor, job.write_chunk, job.state["chunks_done"])
+                    job.state["chunks_done"] += 1
+                    job.save()
+                else:
+                    job.state["status"] = COMPLETED
+            except asyncio.CancelledError:
+                # Shutdown: leave the job running on disk so the next start resumes it
+                raise
+            except Exception as e:
+                job.state["status"] = FAILED
+                job.state["error"] = str(e)
+                print(f"❌ Job {job.id} failed: {e}")
+            if job.id in self.jobs:
+                job.save()
+
+    def stats(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.state["status"]] = counts.get(job.state["status"], 0) + 1
+        return counts
+
+
+job_manager = JobManager(settings.jobs_dir, settings.job_concurrency)
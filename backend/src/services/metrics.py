@@ -0,0 +1,67 @@
+"""HTTP request metrics, Server-Timing headers and the Prometheus exposition"""
+
+from time import perf_counter
+from typing import Any, Dict, Iterable, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from ..config import settings
+from ..rules_engine.metrics import metrics, begin_request, end_request, server_timing
+from .executor import calculation_pool, loop_lag
+from .cache import breaker, OPEN
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+UNMATCHED_ROUTE = "unmatched"  # Keeps unknown paths from creating a label value each
+
+metrics.enabled = settings.metrics_enabled
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by route template and adding a
+    Server-Timing header with the time spent in each rule. Streaming responses
+    send their headers first, so their header only covers the work before that.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        timings, token = begin_request()
+        status = 500
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", server_timing(timings, perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            metrics.observe_route(scope["method"], route, status, perf_counter() - started)
+
+
+def _execution_samples() -> Iterable[Tuple[str, str, str, Dict[str, str], float]]:
+    pool = calculation_pool.stats()
+    yield "calculation_pool_running", "gauge", "Calculations running in the pool", {}, pool["running"]
+    yield "calculation_pool_queue_depth", "gauge", "Calculations waiting for a worker", {}, pool["queue_depth"]
+    yield "calculation_pool_rejected_total", "counter", "Calculations rejected with 503 (pool full)", {}, pool["rejected"]
+    yield "event_loop_lag_seconds", "gauge", "Mean event loop lag (EWMA)", {}, loop_lag.mean_lag
+    yield "redis_circuit_open", "gauge", "1 while Redis calls are skipped after repeated failures", {}, int(breaker.state == OPEN)
+    yield "redis_circuit_skipped_total", "counter", "Redis calls skipped by the open circuit breaker", {}, breaker.skipped
+
+
+metrics.add_collector(_execution_samples)
+
+
+def render_metrics() -> str:
+    return metrics.render()
@@ -0,0 +1,119 @@
+"""
+Precomputed responses for static catalog endpoints
+
+Catalog data only changes with the rule set, so each response is encoded
+once per ruleset version (plain and gzip) and served as bytes with a strong
+ETag and Cache-Control; conditional requests get 304 without a body.
+"""
+
+from typing import Any, Callable, Dict, Optional
+import gzip
+import hashlib
+import json
+import threading
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from ..config import settings
+from ..rules_engine.calculator import ruleset_version
+
+
+class PrecomputedResponse:
+    """One JSON body, pre-encoded and pre-compressed, with an ETag per encoding"""
+
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag")
+
+    def __init__(self, payload: Any):
+        self.body = json.dumps(payload, separators=(",", ":"), default=str).encode()
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        # The encodings are different byte sequences, so they get different strong validators
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+    def matches(self, if_none_match: str, etag: str) -> bool:
+        """
+        If-None-Match check against the ETag of the representation being
+        served (weak comparison, as RFC 9110 requires for this header)
+        """
+        if if_none_match.strip() == "*":
+            return True
+        return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+    def respond(self, request: Request) -> Response:
+        use_gzip = _accepts_gzip(request.headers.get("accept-encoding", ""))
+        etag = self.gzip_etag if use_gzip else self.etag
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={settings.catalog_max_age}",
+            "Vary": "Accept-Encoding"
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and self.matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type="application/json", headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip() in ("gzip", "*"):
+            quality = params.strip().removeprefix("q=")
+            try:
+                return not params or float(quality) > 0
+            except ValueError:
+                return False
+    return False
+
+
+class ResponseCatalog:
+    """
+    Named builders of static JSON payloads; each payload is built and encoded
+    once per ruleset version and rebuilt after the rule set changes
+    """
+
+    def __init__(self):
+        self._builders: Dict[str, Callable[[], Any]] = {}
+        self._responses: Dict[str, PrecomputedResponse] = {}
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def register(self, name: str, build: Callable[[], Any]) -> None:
+        self._builders[name] = build
+
+    def get(self, name: str) -> PrecomputedResponse:
+        version = ruleset_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._responses = {}
+                    self._version = version
+        response = self._responses.get(name)
+        if response is None:
+            response = self._responses[name] = PrecomputedResponse(self._builders[name]())
+        return response
+
+    def respond(self, name: str, request: Request) -> Response:
+        return self.get(name).respond(request)
+
+    def precompute(self) -> int:
+        """Build every registered response for the current rule set; returns how many"""
+        for name in self._builders:
+            self.get(name)
+        return len(self._builders)
+
+    def stats(self) -> Dict[str, Any]:
+        responses = list(self._responses.values())
+        return {
+            "ruleset_version": self._version,
+            "responses": len(responses),
+            "bytes": sum(len(response.body) for response in responses),
+            "gzip_bytes": sum(len(response.gzip_body) for response in responses)
+        }
+
+
+catalog_responses = ResponseCatalog()
@@ -0,0 +1,122 @@
+"""
+Calculation sessions: server-side state for incremental re-evaluation
+
+A session keeps one household's calculation so that a changed input only
+recomputes what depends on it. Sessions expire after SESSION_IDLE_TIMEOUT
+seconds without use; beyond SESSION_MAX_COUNT the least recently used one
+is evicted, which bounds their memory.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import time
+import uuid
+
+from ..config import settings
+from ..rules_engine.incremental import IncrementalNetIncome
+
+
+class CalculationSession:
+    """Scenario params as submitted plus the incremental calculation built from them"""
+
+    __slots__ = ("id", "params", "state", "last_used", "updates")
+
+    def __init__(self, params: Dict[str, Any], state: IncrementalNetIncome, now: float):
+        self.id = str(uuid.uuid4())
+        self.params = params
+        self.state = state
+        self.last_used = now
+        self.updates = 0
+
+
+class SessionStore:
+    """
+    Sessions in least-recently-used order. Expired sessions are dropped from
+    the old end whenever the store is used, so no sweeper task is needed.
+    """
+
+    def __init__(self, max_sessions: int, idle_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self._clock = clock
+        self._sessions: "OrderedDict[str, CalculationSession]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, params: Dict[str, Any], state: IncrementalNetIncome) -> CalculationSession:
+        now = self._clock()
+        self._expire(now)
+        session = CalculationSession(params, state, now)
+        self._sessions[session.id] = session
+        self.created += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+        return session
+
+    def get(self, session_id: str) -> Optional[CalculationSession]:
+        """The session (marked as used), or None if unknown or expired"""
+        now = self._clock()
+        self._expire(now)
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def expires_in(self, session: CalculationSession) -> float:
+        return max(0.0, round(session.last_used + self.idle_timeout - self._clock(), 3))
+
+    def _expire(self, now: float) -> None:
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used < self.idle_timeout:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire(self._clock())
+        return {
+            "active": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_timeout_seconds": self.idle_timeout,
+            "created": self.created,
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
+
+
+session_store = SessionStore(settings.session_max_count, settings.session_idle_timeout)
+
+
+class LiveChannelStats:
+    """Counters of the live recalculation WebSocket channel"""
+
+    def __init__(self):
+        self.active = 0
+        self.connections = 0
+        self.received = 0     # Update messages from clients
+        self.coalesced = 0    # Updates merged into a newer one before being calculated
+        self.pushed = 0       # Results and deltas sent
+        self.dropped = 0      # Connections closed because the client stopped reading
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "connections": self.connections,
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "pushed": self.pushed,
+            "dropped_slow_clients": self.dropped
+        }
+
+
+live_channels = LiveChannelStats()
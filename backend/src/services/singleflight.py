@@ -0,0 +1,77 @@
+"""Request coalescing: concurrent identical calculations share one in-flight computation"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Flight:
+    """One in-flight computation and the number of callers awaiting it"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Run at most one computation per key at a time.
+
+    Callers arriving while a computation for the same key is in flight await
+    its outcome (result or exception) instead of starting their own. The
+    computation runs in its own task, owned by no caller: a cancelled caller
+    (e.g. a disconnected client) leaves it running for the others, and it is
+    cancelled only once every caller has gone. Nothing is kept once the
+    computation finishes; pair with a cache for reuse.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+        self.abandoned = 0
+        self._inflight: Dict[str, _Flight] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = self._inflight[key] = _Flight(asyncio.get_running_loop().create_task(fn()))
+            flight.task.add_done_callback(lambda _: self._finished(key, flight))
+            self.executions += 1
+
+        flight.waiters += 1
+        try:
+            # shield: a cancelled caller must not cancel the shared computation
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller has gone; later ones start a fresh computation
+                self._finished(key, flight)
+                flight.task.cancel()
+                self.abandoned += 1
+
+    def _finished(self, key: str, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        coalesced = self.calls - self.executions
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": coalesced,
+            "in_flight": len(self._inflight),
+            "abandoned": self.abandoned,
+            "coalescing_ratio": coalesced / self.calls if self.calls else 0.0
+        }
+
+
+scenario_flights = SingleFlight("scenario")
+comparison_flights = SingleFlight("compare")
+
+
+def get_coalescing_stats() -> Dict[str, Dict[str, Any]]:
+    return {flights.name: flights.stats() for flights in (scenario_flights, comparison_flights)}
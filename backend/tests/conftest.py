@@ -0,0 +1,77 @@
+"""Shared fixtures: an in-process fake of the Redis client the cache service uses"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.services import cache as cache_service
+
+
+class FakeRedis:
+    """The subset of redis.asyncio.Redis the cache uses; counts round trips, can be taken down"""
+
+    def __init__(self):
+        self.data: Dict[str, bytes] = {}
+        self.ttls: Dict[str, int] = {}
+        self.round_trips = 0
+        self.down = False
+        self.closed = False
+
+    def _trip(self) -> None:
+        self.round_trips += 1
+        if self.down:
+            raise ConnectionError("fake Redis is down")
+
+    async def ping(self) -> bool:
+        self._trip()
+        return True
+
+    async def get(self, key: str) -> Optional[bytes]:
+        self._trip()
+        return self.data.get(key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        self._trip()
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key: str, ttl: int, value: Any) -> bool:
+        self._trip()
+        self._store(key, ttl, value)
+        return True
+
+    def _store(self, key: str, ttl: int, value: Any) -> None:
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        self.ttls[key] = ttl
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands: List[tuple] = []
+
+    def setex(self, key: str, ttl: int, value: Any) -> "FakePipeline":
+        self.commands.append((key, ttl, value))
+        return self
+
+    async def execute(self) -> List[bool]:
+        self.redis._trip()
+        for command in self.commands:
+            self.redis._store(*command)
+        return [True] * len(self.commands)
+
+
+@pytest.fixture
+def fake_redis():
+    """A FakeRedis; the cache service is disconnected and its L1 tier and breaker reset afterwards"""
+    redis = FakeRedis()
+    yield redis
+    asyncio.run(cache_service.close_cache())
+    cache_service.result_cache.clear()
+    cache_service.breaker.reset()
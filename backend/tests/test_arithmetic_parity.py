@@ -0,0 +1,70 @@
+"""
+Parity of the fixed-point and batch calculators with the Decimal reference
+
+Randomized households come from benchmarks.check_fixed_point, which keeps
+the timing comparison; these tests only require identical results.
+"""
+
+import random
+from decimal import Decimal
+
+import pytest
+
+from benchmarks.check_fixed_point import compare, random_case
+from src.rules_engine.batch import BATCH_FIELDS, calculate_net_income_batch
+from src.rules_engine.calculator import ARITHMETIC_DECIMAL, ARITHMETIC_FIXED, calculate_net_income, net_income_calculator
+from src.rules_engine.parameters import available_years, get_parameters
+
+
+@pytest.fixture(scope="module")
+def years():
+    get_parameters()
+    return available_years()
+
+
+def test_fixed_point_matches_decimal(years):
+    rng = random.Random(2025)
+    cases = [random_case(rng, years) for _ in range(5000)]
+    assert compare(cases) == []
+
+
+def test_net_income_calculator_selects_arithmetic():
+    case = (Decimal("45000"), 5, Decimal("800"), 2, 1, True, 2.5, 2025)
+    assert net_income_calculator(ARITHMETIC_DECIMAL)(*case) == net_income_calculator(ARITHMETIC_FIXED)(*case)
+    with pytest.raises(ValueError):
+        net_income_calculator("float")
+
+
+@pytest.mark.parametrize("gross", [0, 12345.67, 45000, 50000.005, 1e10, 1e16, -5])
+def test_batch_matches_decimal(gross):
+    household = dict(
+        pension_contribution_pct=7.5, housing_costs=800, household_members=2,
+        children_count=2, is_partner=True, lump_sum_percentage=10
+    )
+    batch = calculate_net_income_batch(gross_income=[gross], **household)
+    expected = calculate_net_income(
+        Decimal(str(gross)), household["pension_contribution_pct"], Decimal(household["housing_costs"]),
+        household["household_members"], household["children_count"], household["is_partner"],
+        household["lump_sum_percentage"]
+    )
+    assert {field: batch[field][0] for field in BATCH_FIELDS} == {field: expected[field] for field in BATCH_FIELDS}
+
+
+def test_batch_matches_decimal_on_random_households(years):
+    rng = random.Random(7)
+    cases = [random_case(rng, years) for _ in range(2000)]
+    columns = list(zip(*cases))
+    batch = calculate_net_income_batch(
+        gross_income=[float(value) for value in columns[0]], pension_contribution_pct=columns[1],
+        housing_costs=[float(value) for value in columns[2]], household_members=columns[3],
+        children_count=columns[4], is_partner=columns[5], lump_sum_percentage=columns[6],
+        tax_year=years[0]
+    )
+    for i, case in enumerate(cases):
+        expected = calculate_net_income(*case[:7], years[0])
+        assert {field: batch[field][i] for field in BATCH_FIELDS} == {field: expected[field] for field in BATCH_FIELDS}, case
+
+
+def test_batch_rejects_non_finite_amounts():
+    with pytest.raises(ValueError):
+        calculate_net_income_batch(float("inf"), 5, 800, 1, 0)
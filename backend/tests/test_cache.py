@@ -0,0 +1,136 @@
+"""Redis cache service against an in-process fake: payloads, multi-key access, circuit breaker"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.config import settings
+from src.rules_engine.metrics import metrics
+from src.services import cache as cache_service
+from src.services.cache import (
+    CLOSED, OPEN, breaker, decode_payload, encode_payload, result_cache,
+    get_cached_result, get_cached_results, set_cached_results, get_many, set_many
+)
+
+
+def run_with_cache(redis, scenario) -> None:
+    """Run scenario() with redis connected as the L2 tier"""
+    async def main():
+        await cache_service.init_cache(redis)
+        assert cache_service.cache is redis
+        await scenario()
+    asyncio.run(main())
+
+
+def operation_count(operation: str, result: str) -> int:
+    calls = metrics.snapshot()["cache_operations"].get((operation, result))
+    return int(calls[0]) if calls else 0
+
+
+# ============ PAYLOADS ============
+
+def test_small_payload_uses_compact_format():
+    small = {"net_income": 29651.0, "income_tax": 8257}
+    encoded = encode_payload(small)
+    assert encoded[:1] == b"\x01"
+    assert decode_payload(encoded) == small
+
+
+def test_large_payload_is_compressed():
+    large = {"trace": {"calculation_steps": [{"step": i, "description": "Gross income", "amount": 50000.0} for i in range(60)]}}
+    encoded = encode_payload(large)
+    assert encoded[:1] == b"\x02"
+    assert decode_payload(encoded) == large
+    assert len(encoded) < len(json.dumps(large).encode()) / 3
+
+
+def test_plain_json_entries_still_decode():
+    small = {"net_income": 29651.0}
+    assert decode_payload(json.dumps(small).encode()) == small
+
+
+def test_corrupt_payload_raises():
+    with pytest.raises(ValueError):
+        decode_payload(b"\x02not zlib")
+
+
+# ============ MULTI-KEY ACCESS ============
+
+def test_results_are_written_and_read_in_one_round_trip(fake_redis):
+    values = {f"result:test:{i}": {"value": i} for i in range(10)}
+
+    async def scenario():
+        trips = fake_redis.round_trips
+        await set_cached_results(values)
+        assert fake_redis.round_trips == trips + 1
+        assert set(fake_redis.ttls.values()) == {settings.result_cache_ttl}
+
+        result_cache.clear()
+        trips = fake_redis.round_trips
+        found = await get_cached_results(list(values) + ["result:test:missing", "result:test:0"])
+        assert fake_redis.round_trips == trips + 1
+        assert found == values
+
+    run_with_cache(fake_redis, scenario)
+
+
+def test_l2_hits_are_promoted_into_l1(fake_redis):
+    async def scenario():
+        await set_cached_results({"result:test:3": {"value": 3}})
+        result_cache.clear()
+        assert await get_cached_result("result:test:3") == {"value": 3}
+        trips = fake_redis.round_trips
+        assert await get_cached_result("result:test:3") == {"value": 3}
+        assert fake_redis.round_trips == trips
+
+    run_with_cache(fake_redis, scenario)
+
+
+def test_raw_multi_key_access_keeps_key_order(fake_redis):
+    async def scenario():
+        await set_many({"raw:a": b"1", "raw:b": b"2"}, ttl=60)
+        assert await get_many(["raw:a", "raw:missing", "raw:b"]) == [b"1", None, b"2"]
+
+    run_with_cache(fake_redis, scenario)
+
+
+# ============ CIRCUIT BREAKER ============
+
+def test_breaker_opens_skips_and_recovers(fake_redis, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(breaker, "_clock", lambda: clock[0])
+
+    async def scenario():
+        await set_cached_results({"result:test:1": {"value": 1}})
+        errors_before = operation_count("mget", "error")
+
+        fake_redis.down = True
+        for _ in range(settings.redis_breaker_threshold):
+            result_cache.clear()
+            assert await get_cached_result("result:test:1") is None
+        assert breaker.state == OPEN
+        assert operation_count("mget", "error") == errors_before + settings.redis_breaker_threshold
+
+        trips, skipped = fake_redis.round_trips, breaker.skipped
+        for _ in range(20):
+            result_cache.clear()
+            await get_cached_result("result:test:1")
+        assert fake_redis.round_trips == trips
+        assert breaker.skipped >= skipped + 20
+
+        # A failed probe after the reset timeout reopens the breaker
+        clock[0] += settings.redis_breaker_reset_timeout
+        result_cache.clear()
+        await get_cached_result("result:test:1")
+        assert fake_redis.round_trips == trips + 1 and breaker.state == OPEN
+
+        fake_redis.down = False
+        clock[0] += settings.redis_breaker_reset_timeout
+        result_cache.clear()
+        assert await get_cached_result("result:test:1") == {"value": 1}
+        assert breaker.state == CLOSED
+        assert operation_count("mget", "ok") > 0
+
+    run_with_cache(fake_redis, scenario)
+    assert 'cache_operations_total{operation="mget",result="error"}' in metrics.render()
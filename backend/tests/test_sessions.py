@@ -0,0 +1,15 @@
+"""Incremental session updates against full recalculation, and the session store"""
+
+import random
+
+from benchmarks.check_sessions import check_parity, check_store
+from src.rules_engine.parameters import get_parameters
+
+
+def test_session_updates_match_full_recalculation():
+    get_parameters()
+    assert check_parity(300, 5, random.Random(2025)) == 0
+
+
+def test_session_store_expiry_and_cap():
+    assert check_store()
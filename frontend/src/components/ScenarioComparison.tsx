@@ -108,23 +108,30 @@ export default function ScenarioComparison({ baseParams }: ScenarioComparisonPro
     setError(null);
     try {
       const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
-      // Calculate all three scenarios
-      const calculationPromises = scenarios.map(scenario =>
-        fetch(`${apiUrl}/api/v1/calculations/scenario`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({
+      // Calculate all three scenarios in one batch request (NDJSON response, one line per scenario)
+      const response = await fetch(`${apiUrl}/api/v1/calculations/batch`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(
+          scenarios.map(scenario => ({
             gross_income: scenario.grossIncome,
             pension_contribution_percentage: scenario.pensionPct,
             lump_sum_percentage: scenario.lumpSumPct,
             housing_costs: scenario.housingCosts,
             children_count: scenario.children,
             marital_status: 'single',
-          }),
-        }).then(r => r.json())
-      );
+          }))
+        ),
+      });
+      if (!response.ok) throw new Error(t('error'));
 
-      const calculatedResults = await Promise.all(calculationPromises);
+      const calculatedResults: any[] = new Array(scenarios.length);
+      for (const line of (await response.text()).split('\n')) {
+        if (!line.trim()) continue;
+        const item = JSON.parse(line);
+        if (item.status !== 'ok') throw new Error(item.error || t('error'));
+        calculatedResults[item.index] = item.result;
+      }
       setResults(calculatedResults);
     } catch (err: any) {
       setError(err.message || t('error'));